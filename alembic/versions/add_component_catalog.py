@@ -0,0 +1,109 @@
+"""Share SBOM components across projects through a link table
+
+Revision ID: add_component_catalog
+Revises: add_component_osv_checked
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "add_component_catalog"
+down_revision: Union[str, Sequence[str], None] = "add_component_osv_checked"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+# SQLite keeps these constraints unnamed; batch mode needs a name to drop them.
+NAMING = {
+    "uq": "uq_%(table_name)s_%(column_0_name)s",
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+}
+
+
+def _is_sqlite() -> bool:
+    return op.get_bind().dialect.name == "sqlite"
+
+
+def _constraint_names() -> tuple[str, str]:
+    """(sbomcomponent project FK, componentvulnerability osv_id unique) names."""
+    if _is_sqlite():
+        return "fk_sbomcomponent_project_id_project", "uq_componentvulnerability_osv_id"
+    return "sbomcomponent_project_id_fkey", "componentvulnerability_osv_id_key"
+
+
+def upgrade() -> None:
+    """Turn sbomcomponent into a per-purl catalog linked to projects."""
+    op.create_table(
+        "projectcomponent",
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("component_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["project_id"], ["project.id"]),
+        sa.ForeignKeyConstraint(["component_id"], ["sbomcomponent.id"]),
+        sa.PrimaryKeyConstraint("project_id", "component_id"),
+    )
+    op.create_index(
+        op.f("ix_projectcomponent_component_id"),
+        "projectcomponent",
+        ["component_id"],
+        unique=False,
+    )
+    op.execute(
+        "INSERT INTO projectcomponent (project_id, component_id) "
+        "SELECT project_id, id FROM sbomcomponent"
+    )
+    project_fk, osv_id_unique = _constraint_names()
+    if _is_sqlite():
+        with op.batch_alter_table("sbomcomponent", naming_convention=NAMING) as batch:
+            batch.drop_constraint(project_fk, type_="foreignkey")
+            batch.drop_column("project_id")
+        with op.batch_alter_table(
+            "componentvulnerability", naming_convention=NAMING
+        ) as batch:
+            batch.drop_constraint(osv_id_unique, type_="unique")
+    else:
+        op.drop_column("sbomcomponent", "project_id")
+        op.drop_constraint(osv_id_unique, "componentvulnerability", type_="unique")
+    op.create_index(
+        op.f("ix_componentvulnerability_osv_id"),
+        "componentvulnerability",
+        ["osv_id"],
+        unique=False,
+    )
+    with op.batch_alter_table("componentvulnerability") as batch:
+        batch.create_unique_constraint(
+            "uq_componentvulnerability_component_osv", ["component_id", "osv_id"]
+        )
+
+
+def downgrade() -> None:
+    """Restore project-scoped components (each keeps its first linked project)."""
+    project_fk, osv_id_unique = _constraint_names()
+    with op.batch_alter_table("componentvulnerability") as batch:
+        batch.drop_constraint("uq_componentvulnerability_component_osv", type_="unique")
+    op.drop_index(
+        op.f("ix_componentvulnerability_osv_id"), table_name="componentvulnerability"
+    )
+    op.execute(
+        "DELETE FROM componentvulnerability WHERE id NOT IN "
+        "(SELECT MIN(id) FROM componentvulnerability GROUP BY osv_id)"
+    )
+    with op.batch_alter_table("componentvulnerability") as batch:
+        batch.create_unique_constraint(osv_id_unique, ["osv_id"])
+    op.add_column("sbomcomponent", sa.Column("project_id", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE sbomcomponent SET project_id = (SELECT MIN(project_id) "
+        "FROM projectcomponent WHERE component_id = sbomcomponent.id)"
+    )
+    op.execute(
+        "DELETE FROM componentvulnerability WHERE component_id IN "
+        "(SELECT id FROM sbomcomponent WHERE project_id IS NULL)"
+    )
+    op.execute("DELETE FROM sbomcomponent WHERE project_id IS NULL")
+    op.drop_index(
+        op.f("ix_projectcomponent_component_id"), table_name="projectcomponent"
+    )
+    op.drop_table("projectcomponent")
+    with op.batch_alter_table("sbomcomponent") as batch:
+        batch.alter_column("project_id", existing_type=sa.Integer(), nullable=False)
+        batch.create_foreign_key(project_fk, "project", ["project_id"], ["id"])
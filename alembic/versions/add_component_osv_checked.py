@@ -0,0 +1,28 @@
+"""Add osv_checked_at to sbomcomponent for incremental OSV lookups
+
+Revision ID: add_component_osv_checked
+Revises: add_finding_fingerprint
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "add_component_osv_checked"
+down_revision: Union[str, Sequence[str], None] = "add_finding_fingerprint"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Track when each component version was last checked against OSV."""
+    op.add_column(
+        "sbomcomponent", sa.Column("osv_checked_at", sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Remove the OSV check timestamp."""
+    op.drop_column("sbomcomponent", "osv_checked_at")
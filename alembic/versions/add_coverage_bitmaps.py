@@ -0,0 +1,33 @@
+"""Add line coverage bitmaps
+
+Revision ID: add_coverage_bitmaps
+Revises: add_coverage_run_index
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "add_coverage_bitmaps"
+down_revision: Union[str, Sequence[str], None] = "add_coverage_run_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Keep executed and statement lines per file, not just their counts."""
+    op.add_column(
+        "coverage", sa.Column("executed_bitmap", sa.LargeBinary(), nullable=True)
+    )
+    op.add_column(
+        "coverage", sa.Column("statement_bitmap", sa.LargeBinary(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Drop line coverage bitmaps."""
+    with op.batch_alter_table("coverage") as batch_op:
+        batch_op.drop_column("statement_bitmap")
+        batch_op.drop_column("executed_bitmap")
@@ -0,0 +1,69 @@
+"""Add coverage deltas against a baseline run
+
+Revision ID: add_coverage_delta
+Revises: add_coverage_bitmaps
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision: str = "add_coverage_delta"
+down_revision: Union[str, Sequence[str], None] = "add_coverage_bitmaps"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Track run branches and baselines; store per-file coverage deltas."""
+    op.add_column(
+        "repository",
+        sa.Column(
+            "default_branch",
+            sqlmodel.sql.sqltypes.AutoString(),
+            nullable=False,
+            server_default="main",
+        ),
+    )
+    with op.batch_alter_table("run") as batch_op:
+        batch_op.add_column(
+            sa.Column("branch", sqlmodel.sql.sqltypes.AutoString(), nullable=True)
+        )
+        batch_op.add_column(sa.Column("baseline_run_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_run_baseline_run_id_run",
+            "run",
+            ["baseline_run_id"],
+            ["id"],
+            ondelete="SET NULL",
+        )
+    op.create_index(
+        "ix_run_baseline", "run", ["test_plan_id", "status", "id"], unique=False
+    )
+    op.add_column("coverage", sa.Column("coverage_delta", sa.Float(), nullable=True))
+    op.add_column(
+        "coverage",
+        sa.Column("lines_gained", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "coverage",
+        sa.Column("lines_lost", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    """Drop coverage deltas and run baselines."""
+    with op.batch_alter_table("coverage") as batch_op:
+        batch_op.drop_column("lines_lost")
+        batch_op.drop_column("lines_gained")
+        batch_op.drop_column("coverage_delta")
+    op.drop_index("ix_run_baseline", table_name="run")
+    with op.batch_alter_table("run") as batch_op:
+        batch_op.drop_constraint("fk_run_baseline_run_id_run", type_="foreignkey")
+        batch_op.drop_column("baseline_run_id")
+        batch_op.drop_column("branch")
+    with op.batch_alter_table("repository") as batch_op:
+        batch_op.drop_column("default_branch")
@@ -0,0 +1,25 @@
+"""Index coverage rows by run
+
+Revision ID: add_coverage_run_index
+Revises: add_reachability
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "add_coverage_run_index"
+down_revision: Union[str, Sequence[str], None] = "add_reachability"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Ingested reports hold a row per file, read and replaced by run."""
+    op.create_index(op.f("ix_coverage_run_id"), "coverage", ["run_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the coverage run index."""
+    op.drop_index(op.f("ix_coverage_run_id"), table_name="coverage")
@@ -0,0 +1,37 @@
+"""Add fingerprint to securityfinding for scan reconciliation
+
+Revision ID: add_finding_fingerprint
+Revises: add_scanned_file_cost
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision: str = "add_finding_fingerprint"
+down_revision: Union[str, Sequence[str], None] = "add_scanned_file_cost"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the stable finding fingerprint."""
+    op.add_column(
+        "securityfinding",
+        sa.Column("fingerprint", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_securityfinding_fingerprint"),
+        "securityfinding",
+        ["fingerprint"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Remove the stable finding fingerprint."""
+    op.drop_index(op.f("ix_securityfinding_fingerprint"), table_name="securityfinding")
+    op.drop_column("securityfinding", "fingerprint")
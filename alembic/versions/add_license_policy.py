@@ -0,0 +1,60 @@
+"""Add component licenses and per-project license policy
+
+Revision ID: add_license_policy
+Revises: add_process_run
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision: str = "add_license_policy"
+down_revision: Union[str, Sequence[str], None] = "add_process_run"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store declared licenses, policy allow/deny lists and per-project verdicts."""
+    op.add_column(
+        "sbomcomponent",
+        sa.Column(
+            "license_expression", sqlmodel.sql.sqltypes.AutoString(), nullable=True
+        ),
+    )
+    op.add_column(
+        "projectcomponent",
+        sa.Column("license_status", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    )
+    op.add_column(
+        "projectpolicy",
+        sa.Column(
+            "license_allow",
+            sqlmodel.sql.sqltypes.AutoString(),
+            nullable=False,
+            server_default="",
+        ),
+    )
+    op.add_column(
+        "projectpolicy",
+        sa.Column(
+            "license_deny",
+            sqlmodel.sql.sqltypes.AutoString(),
+            nullable=False,
+            server_default="",
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Remove license tracking."""
+    with op.batch_alter_table("projectpolicy") as batch_op:
+        batch_op.drop_column("license_deny")
+        batch_op.drop_column("license_allow")
+    with op.batch_alter_table("projectcomponent") as batch_op:
+        batch_op.drop_column("license_status")
+    with op.batch_alter_table("sbomcomponent") as batch_op:
+        batch_op.drop_column("license_expression")
@@ -0,0 +1,41 @@
+"""Add processrun table for subprocess resource accounting
+
+Revision ID: add_process_run
+Revises: add_component_catalog
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision: str = "add_process_run"
+down_revision: Union[str, Sequence[str], None] = "add_component_catalog"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Record CPU, peak RSS and exit status per scanner invocation."""
+    op.create_table(
+        "processrun",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("label", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("command", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("exit_code", sa.Integer(), nullable=True),
+        sa.Column("timed_out", sa.Boolean(), nullable=False),
+        sa.Column("wall_seconds", sa.Float(), nullable=False),
+        sa.Column("cpu_seconds", sa.Float(), nullable=False),
+        sa.Column("peak_rss_kb", sa.Integer(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_processrun_label"), "processrun", ["label"], unique=False)
+
+
+def downgrade() -> None:
+    """Drop subprocess resource accounting."""
+    op.drop_index(op.f("ix_processrun_label"), table_name="processrun")
+    op.drop_table("processrun")
@@ -0,0 +1,63 @@
+"""Add materialized quality trend rollups
+
+Revision ID: add_quality_rollup
+Revises: add_coverage_delta
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "add_quality_rollup"
+down_revision: Union[str, Sequence[str], None] = "add_coverage_delta"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Per-run and daily quality scores per test plan, kept up to date on write."""
+    op.create_table(
+        "qualityrollup",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("test_plan_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("run_id", sa.Integer(), nullable=True),
+        sa.Column("runs", sa.Integer(), nullable=False),
+        sa.Column("static_issues_score", sa.Float(), nullable=False),
+        sa.Column("test_pass_rate", sa.Float(), nullable=False),
+        sa.Column("coverage_delta", sa.Float(), nullable=False),
+        sa.Column("performance_score", sa.Float(), nullable=False),
+        sa.Column("accessibility_score", sa.Float(), nullable=False),
+        sa.Column("security_score", sa.Float(), nullable=False),
+        sa.Column("composite_score", sa.Float(), nullable=False),
+        sa.Column("composite_min", sa.Float(), nullable=False),
+        sa.Column("composite_max", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["run_id"], ["run.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["test_plan_id"], ["testplan.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("run_id"),
+    )
+    op.create_index(
+        "ix_qualityrollup_plan_day",
+        "qualityrollup",
+        ["test_plan_id", "day"],
+        unique=False,
+    )
+    op.create_index(
+        "uq_qualityrollup_plan_day_daily",
+        "qualityrollup",
+        ["test_plan_id", "day"],
+        unique=True,
+        sqlite_where=sa.text("run_id IS NULL"),
+        postgresql_where=sa.text("run_id IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Drop quality trend rollups."""
+    op.drop_index("uq_qualityrollup_plan_day_daily", table_name="qualityrollup")
+    op.drop_index("ix_qualityrollup_plan_day", table_name="qualityrollup")
+    op.drop_table("qualityrollup")
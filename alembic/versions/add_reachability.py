@@ -0,0 +1,52 @@
+"""Add dependency graph cache, file import cache and component reachability
+
+Revision ID: add_reachability
+Revises: add_license_policy
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision: str = "add_reachability"
+down_revision: Union[str, Sequence[str], None] = "add_license_policy"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Cache graphs per lockfile and imports per file; flag reachable components."""
+    op.create_table(
+        "dependencygraph",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("lockfile_sha", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("graph", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("lockfile_sha"),
+    )
+    op.create_table(
+        "fileimports",
+        sa.Column("sha256", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("modules", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.PrimaryKeyConstraint("sha256"),
+    )
+    op.add_column(
+        "projectcomponent", sa.Column("reachable", sa.Boolean(), nullable=True)
+    )
+    op.add_column(
+        "projectcomponent",
+        sa.Column("reachability_depth", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Drop reachability analysis."""
+    with op.batch_alter_table("projectcomponent") as batch_op:
+        batch_op.drop_column("reachability_depth")
+        batch_op.drop_column("reachable")
+    op.drop_table("fileimports")
+    op.drop_table("dependencygraph")
@@ -0,0 +1,29 @@
+"""Add scan_cost to scannedfile for cost-balanced sharding
+
+Revision ID: add_scanned_file_cost
+Revises: add_scanned_file_index
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "add_scanned_file_cost"
+down_revision: Union[str, Sequence[str], None] = "add_scanned_file_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add per-file scan cost."""
+    op.add_column(
+        "scannedfile",
+        sa.Column("scan_cost", sa.Float(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    """Remove per-file scan cost."""
+    op.drop_column("scannedfile", "scan_cost")
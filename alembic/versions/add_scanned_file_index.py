@@ -0,0 +1,45 @@
+"""Add scannedfile table for incremental scanning
+
+Revision ID: add_scanned_file_index
+Revises: ce8df88099a4
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision: str = "add_scanned_file_index"
+down_revision: Union[str, Sequence[str], None] = "ce8df88099a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the scanned file hash index."""
+    op.create_table(
+        "scannedfile",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("scanner", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("file_path", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("sha256", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column(
+            "scanner_version", sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column("config_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("scanned_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["project_id"], ["project.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_scannedfile_project_id"), "scannedfile", ["project_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Drop the scanned file hash index."""
+    op.drop_index(op.f("ix_scannedfile_project_id"), table_name="scannedfile")
+    op.drop_table("scannedfile")
@@ -0,0 +1,162 @@
+import contextlib
+import heapq
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+from app.adapters.json_stream import has_key, iter_json_array
+from app.orchestrator.process_runner import run_process
+
+logger = logging.getLogger(__name__)
+BANDIT_ARGS = ["-f", "json"]
+# 0: no issues, 1: issues found. Anything else (e.g. 2 for bad arguments)
+# means the report cannot be trusted.
+BANDIT_OK_RETURNCODES = (0, 1)
+BANDIT_CONFIG_FILES = [".bandit", "bandit.yaml", ".bandit.yaml", "pyproject.toml"]
+MAX_SHARD_FILES = 500
+DEFAULT_SECONDS_PER_BYTE = 2e-6
+
+
+def default_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+def estimate_costs(
+    repo_path: str, files: list[str], history: dict[str, float]
+) -> dict[str, float]:
+    """Uses the last observed scan cost per file, falling back to a size estimate."""
+    costs = {}
+    for path in files:
+        if history.get(path):
+            costs[path] = history[path]
+            continue
+        try:
+            size = os.path.getsize(repo_path + path)
+        except OSError:
+            size = 0
+        costs[path] = max(size, 1) * DEFAULT_SECONDS_PER_BYTE
+    return costs
+
+
+def plan_shards(
+    costs: dict[str, float], workers: int, max_files: int = MAX_SHARD_FILES
+) -> list[list[str]]:
+    """
+    Longest-processing-time-first packing: the most expensive files are placed
+    first, each onto the currently lightest shard, so large files don't end up
+    queued behind each other.
+    """
+    if not costs:
+        return []
+    count = max(workers, -(-len(costs) // max_files))
+    count = min(count, len(costs))
+    heap = [(0.0, i) for i in range(count)]
+    shards: list[list[str]] = [[] for _ in range(count)]
+    for path in sorted(costs, key=costs.get, reverse=True):
+        load, i = heapq.heappop(heap)
+        shards[i].append(path)
+        heapq.heappush(heap, (load + costs[path], i))
+    return [shard for shard in shards if shard]
+
+
+def check_report(result, report_file: str, files: int):
+    """
+    Raises unless bandit finished and wrote a complete report. A crashed
+    bandit (e.g. MemoryError under RLIMIT_AS exits with 1) can leave an
+    empty report, which would otherwise read as "no findings" and resolve
+    every finding in the shard.
+    """
+    problem = None
+    if result.killed:
+        problem = "killed"
+    elif result.returncode not in BANDIT_OK_RETURNCODES:
+        problem = f"exit status {result.returncode}"
+    elif "Traceback (most recent call last)" in result.stderr:
+        problem = "crashed"
+    else:
+        try:
+            with open(report_file, "r") as f:
+                complete = has_key(f, "results")
+        except (OSError, ValueError):
+            complete = False
+        if not complete:
+            problem = "wrote no complete report"
+    if problem:
+        raise RuntimeError(
+            f"bandit shard of {files} files {problem}: {result!r} "
+            f"{result.stderr.strip()[-2000:]}"
+        )
+
+
+def _scan_shard(repo_path: str, shard: list[str]) -> tuple[str, float]:
+    """Runs bandit over `shard`; returns the report file (caller deletes it)."""
+    # bandit draws its progress bar on stdout, so the report goes to a file.
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as outf:
+        report_file = outf.name
+    try:
+        result = run_process(
+            ["bandit", *BANDIT_ARGS, "-o", report_file]
+            + [repo_path + path for path in shard],
+            label="bandit",
+            capture_output=True,
+        )
+        check_report(result, report_file, len(shard))
+        return report_file, result.wall_seconds
+    except BaseException:
+        os.unlink(report_file)
+        raise
+
+
+def _remove(paths: list[str]):
+    for path in paths:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+
+def iter_report_results(report_files: list[str]) -> Iterator[dict]:
+    """Streams `results` out of each bandit report, deleting files as it goes."""
+    try:
+        for report_file in report_files:
+            with open(report_file, "r") as f:
+                yield from iter_json_array(f, "results")
+            os.unlink(report_file)
+    finally:
+        _remove(report_files)
+
+
+def run_bandit_sharded(
+    repo_path: str,
+    files: list[str],
+    history: dict[str, float],
+    workers: int | None = None,
+) -> tuple[Iterator[dict], dict[str, float]] | None:
+    """
+    Scans `files` with one bandit process per shard, at most `workers` at a
+    time. Returns a lazy stream of the merged results and the observed
+    per-file cost, or None if any shard failed. Results stay on disk until
+    consumed; each shard's findings arrive grouped by file.
+    """
+    workers = workers or default_workers()
+    costs = estimate_costs(repo_path, files, history)
+    shards = plan_shards(costs, workers)
+    report_files: list[str] = []
+    observed: dict[str, float] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_scan_shard, repo_path, shard) for shard in shards]
+        failed = False
+        for shard, future in zip(shards, futures):
+            try:
+                report_file, elapsed = future.result()
+            except Exception as e:
+                logger.exception(f"Bandit scan error: {e}")
+                failed = True
+                continue
+            report_files.append(report_file)
+            estimated = sum(costs[path] for path in shard) or 1.0
+            for path in shard:
+                observed[path] = elapsed * costs[path] / estimated
+    if failed:
+        _remove(report_files)
+        return None
+    return iter_report_results(report_files), observed
@@ -0,0 +1,227 @@
+import logging
+import os
+from typing import NamedTuple
+import numpy as np
+import sqlmodel
+from sqlalchemy import bindparam
+from app.adapters import line_bitmap
+from app.adapters.file_index import chunked
+from app.core.models import Coverage, Repository, Run, TestPlan
+
+logger = logging.getLogger(__name__)
+DEFAULT_BRANCH = "main"
+GREEN_RUN_STATUSES = ("completed", "passed")
+UPDATE_BATCH = 5000
+
+
+class RunCoverage(NamedTuple):
+    """One run's per-file coverage as parallel arrays, bitmaps decoded."""
+
+    ids: np.ndarray
+    paths: list[str]
+    covered: np.ndarray
+    total: np.ndarray
+    executed: list[np.ndarray]
+    # Only loaded for the head run.
+    statements: list[np.ndarray] | None
+
+    @property
+    def percentage(self) -> float:
+        total = int(self.total.sum())
+        return float(self.covered.sum()) / total * 100 if total else 100.0
+
+
+class CoverageDeltas(NamedTuple):
+    """Per-file deltas aligned with the head run's rows, plus the aggregate."""
+
+    ids: np.ndarray
+    # Percentage points; NaN where the baseline run has no such file.
+    delta: np.ndarray
+    gained: np.ndarray
+    lost: np.ndarray
+    aggregate: float
+
+
+def checkout_branch(repo_path: str) -> str | None:
+    """The branch checked out at `repo_path`, read from .git/HEAD; None if detached."""
+    git_path = os.path.join(repo_path, ".git")
+    try:
+        if os.path.isfile(git_path):
+            # A worktree or submodule: .git points at the real git dir.
+            with open(git_path) as f:
+                git_dir = f.read().strip().removeprefix("gitdir:").strip()
+            git_path = os.path.join(repo_path, git_dir)
+        with open(os.path.join(git_path, "HEAD")) as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref: refs/heads/"):
+        return None
+    return head.removeprefix("ref: refs/heads/")
+
+
+def default_branch(session, test_plan_id: int) -> str:
+    branch = session.exec(
+        sqlmodel.select(Repository.default_branch)
+        .join(TestPlan, TestPlan.project_id == Repository.project_id)
+        .where(TestPlan.id == test_plan_id)
+        .order_by(Repository.id)
+    ).first()
+    return branch or DEFAULT_BRANCH
+
+
+def baseline_run(session, run: Run) -> Run | None:
+    """
+    The last green run of the same test plan on the default branch before
+    `run` that has coverage: runs without a coverage report would make
+    every file look new. Walks ix_run_baseline backwards, probing the
+    coverage run_id index for each candidate.
+    """
+    branch = default_branch(session, run.test_plan_id)
+    return session.exec(
+        sqlmodel.select(Run)
+        .where(
+            Run.test_plan_id == run.test_plan_id,
+            Run.status.in_(GREEN_RUN_STATUSES),
+            Run.id < run.id,
+            sqlmodel.or_(Run.branch == branch, Run.branch.is_(None)),
+            sqlmodel.exists().where(Coverage.run_id == Run.id),
+        )
+        .order_by(Run.id.desc())
+        .limit(1)
+    ).first()
+
+
+def load_run_coverage(session, run_id: int, statements: bool = True) -> RunCoverage:
+    # Core rows: ORM row processing would cost more than the diff itself.
+    table = Coverage.__table__
+    columns = [
+        table.c.id,
+        table.c.file_path,
+        table.c.covered_lines,
+        table.c.total_lines,
+        table.c.executed_bitmap,
+    ]
+    if statements:
+        columns.append(table.c.statement_bitmap)
+    rows = (
+        session.connection()
+        .execute(sqlmodel.select(*columns).where(table.c.run_id == run_id))
+        .all()
+    )
+    return RunCoverage(
+        ids=np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows)),
+        paths=[r[1] for r in rows],
+        covered=np.fromiter((r[2] for r in rows), dtype=np.int64, count=len(rows)),
+        total=np.fromiter((r[3] for r in rows), dtype=np.int64, count=len(rows)),
+        executed=[line_bitmap.decode(r[4]) for r in rows],
+        statements=[line_bitmap.decode(r[5]) for r in rows] if statements else None,
+    )
+
+
+def _percentages(covered: np.ndarray, total: np.ndarray) -> np.ndarray:
+    return np.divide(
+        covered * 100.0,
+        total,
+        out=np.full(len(total), 100.0),
+        where=total > 0,
+    )
+
+
+def compute_deltas(base: RunCoverage | None, head: RunCoverage) -> CoverageDeltas:
+    """
+    Per-file percentage deltas and lines newly covered (`gained`) or no
+    longer covered (`lost`, among lines still statements) in one vectorized
+    pass over both runs. Lines are compared by number.
+    """
+    if base is None or not base.paths:
+        count = len(head.paths)
+        return CoverageDeltas(
+            ids=head.ids,
+            delta=np.full(count, np.nan),
+            gained=np.zeros(count, dtype=np.int64),
+            lost=np.zeros(count, dtype=np.int64),
+            aggregate=0.0,
+        )
+    index = {path: i for i, path in enumerate(base.paths)}
+    position = np.fromiter(
+        (index.get(path, -1) for path in head.paths),
+        dtype=np.int64,
+        count=len(head.paths),
+    )
+    matched = position >= 0
+    base_percentage = _percentages(base.covered, base.total)
+    delta = np.full(len(head.paths), np.nan)
+    delta[matched] = (
+        _percentages(head.covered, head.total)[matched]
+        - base_percentage[position[matched]]
+    )
+    pairs = line_bitmap.BitmapPairs(
+        head.executed,
+        [base.executed[i] if i >= 0 else line_bitmap.EMPTY for i in position.tolist()],
+    )
+    lost = pairs.right & ~pairs.left & pairs.flatten(head.statements)
+    return CoverageDeltas(
+        ids=head.ids,
+        delta=delta,
+        gained=pairs.counts(pairs.difference()),
+        lost=pairs.counts(lost),
+        aggregate=head.percentage - base.percentage,
+    )
+
+
+def save_deltas(session, deltas: CoverageDeltas):
+    """Writes per-file deltas with batched executemany UPDATEs. Does not commit."""
+    table = Coverage.__table__
+    statement = (
+        table.update()
+        .where(table.c.id == bindparam("row_id"))
+        .values(
+            coverage_delta=bindparam("delta"),
+            lines_gained=bindparam("gained"),
+            lines_lost=bindparam("lost"),
+        )
+    )
+    rows = [
+        {
+            "row_id": row_id,
+            "delta": None if np.isnan(delta) else round(delta, 2),
+            "gained": gained,
+            "lost": lost,
+        }
+        for row_id, delta, gained, lost in zip(
+            deltas.ids.tolist(),
+            deltas.delta.tolist(),
+            deltas.gained.tolist(),
+            deltas.lost.tolist(),
+        )
+    ]
+    connection = session.connection()
+    for batch in chunked(rows, UPDATE_BATCH):
+        connection.execute(statement, batch)
+
+
+def update_coverage_deltas(session, run_id: int) -> float:
+    """
+    Computes and stores the run's coverage deltas against its baseline run,
+    recording the baseline on the run. Reads only the two runs' rows. Does
+    not commit. Returns the aggregate delta in percentage points (0 without
+    a baseline).
+    """
+    run = session.get(Run, run_id)
+    if run is None:
+        raise ValueError(f"Run {run_id} not found")
+    baseline = baseline_run(session, run)
+    run.baseline_run_id = baseline.id if baseline else None
+    session.add(run)
+    head = load_run_coverage(session, run_id)
+    base = load_run_coverage(session, baseline.id, False) if baseline else None
+    deltas = compute_deltas(base, head)
+    save_deltas(session, deltas)
+    logger.info(
+        f"Coverage delta for run {run_id} against "
+        f"{f'run {baseline.id}' if baseline else 'no baseline'}: "
+        f"{deltas.aggregate:+.2f} points, {int(deltas.gained.sum())} lines "
+        f"gained, {int(deltas.lost.sum())} lost"
+    )
+    return deltas.aggregate
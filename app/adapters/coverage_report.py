@@ -0,0 +1,287 @@
+import ast
+import logging
+import os
+import sqlite3
+from typing import Iterator
+import numpy as np
+import sqlmodel
+from lxml import etree
+from app.adapters import line_bitmap
+from app.adapters.json_stream import iter_json_object
+from app.core.bulk import bulk_insert
+from app.core.models import Coverage
+
+logger = logging.getLogger(__name__)
+COBERTURA = "cobertura"
+COVERAGE_JSON = "coverage.py-json"
+COVERAGE_SQLITE = "coverage.py-sqlite"
+# Artifact names recognised as coverage reports.
+COVERAGE_ARTIFACTS = ("coverage.xml", "cobertura.xml", "coverage.json", ".coverage")
+SQLITE_MAGIC = b"SQLite format 3\0"
+
+# (file_path, executed line bitmap, statement line bitmap)
+FileCoverage = tuple[str, np.ndarray, np.ndarray]
+
+
+def detect_format(path: str) -> str:
+    with open(path, "rb") as f:
+        head = f.read(512)
+    if head.startswith(SQLITE_MAGIC):
+        return COVERAGE_SQLITE
+    stripped = head.lstrip(b"\xef\xbb\xbf \t\r\n")
+    if stripped.startswith(b"{"):
+        return COVERAGE_JSON
+    if stripped.startswith(b"<"):
+        return COBERTURA
+    raise ValueError(f"Unrecognised coverage report: {path}")
+
+
+def relative_path(path: str, repo_path: str | None) -> str:
+    """Repository-relative form of a reported path, where it can be made so."""
+    if repo_path and os.path.isabs(path):
+        relative = os.path.relpath(path, repo_path)
+        if not relative.startswith(".."):
+            path = relative
+    return path.replace("\\", "/").removeprefix("./")
+
+
+class CheckoutPaths:
+    """
+    Maps reported paths onto the checkout at `repo_path`. Reports made on CI
+    carry that machine's absolute paths; the prefix they were measured under
+    is found once, as the part before the longest suffix that exists in the
+    checkout, and reused for the files that follow.
+    """
+
+    def __init__(self, repo_path: str | None):
+        self.repo_path = repo_path
+        self.roots: list[str] = []
+
+    def _exists(self, relative: str) -> bool:
+        return os.path.isfile(os.path.join(self.repo_path, relative))
+
+    def locate(self, path: str) -> str | None:
+        """Repository-relative path of the reported file in the checkout, if there."""
+        if not self.repo_path:
+            return path if os.path.isfile(path) else None
+        path = path.replace("\\", "/")
+        relative = relative_path(path, self.repo_path)
+        if not os.path.isabs(relative):
+            return relative if self._exists(relative) else None
+        for root in self.roots:
+            if path.startswith(root) and self._exists(path[len(root) :]):
+                return path[len(root) :]
+        parts = path.strip("/").split("/")
+        for i in range(1, len(parts)):
+            relative = "/".join(parts[i:])
+            if self._exists(relative):
+                self.roots.append(path[: len(path) - len(relative)])
+                return relative
+        return None
+
+
+def _log_unmapped(unmapped: list[str], total: int, repo_path: str | None, outcome: str):
+    """Reports files that are not in the checkout; a warning if most are not."""
+    if not unmapped:
+        return
+    message = (
+        f"{len(unmapped)} of {total} measured files have no source under "
+        f"{repo_path or 'their recorded paths'} (e.g. {unmapped[0]}) and were "
+        f"{outcome}"
+    )
+    if len(unmapped) * 2 > total:
+        logger.warning(f"{message}; is the report from another checkout?")
+    else:
+        logger.info(message)
+
+
+def iter_cobertura(path: str) -> Iterator[FileCoverage]:
+    """
+    Streams a Cobertura report class by class, clearing each element once
+    read, so memory grows with the number of files (as bitmaps) rather than
+    the size of the document. Classes sharing a file (e.g. inner classes)
+    are merged.
+    """
+    files: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+    for _, elem in etree.iterparse(path, events=("end",), tag="class", huge_tree=True):
+        executed, statements = [], []
+        # Only the class's own <lines>: <methods> repeats the same lines.
+        lines = elem.find("lines")
+        for line in lines if lines is not None else ():
+            number = int(line.get("number", "0"))
+            statements.append(number)
+            if line.get("hits", "0") != "0":
+                executed.append(number)
+        bitmaps = line_bitmap.pack(executed), line_bitmap.pack(statements)
+        file_path = elem.get("filename", "")
+        if file_path in files:
+            bitmaps = tuple(map(line_bitmap.union, files[file_path], bitmaps))
+        files[file_path] = bitmaps
+        elem.clear(keep_tail=False)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+    for file_path, (executed, statements) in files.items():
+        yield file_path, executed, statements
+
+
+def iter_coverage_json(path: str) -> Iterator[FileCoverage]:
+    """Streams `coverage json` output one file entry at a time."""
+    with open(path, "r", encoding="utf-8") as fp:
+        for file_path, data in iter_json_object(fp, "files"):
+            executed = data.get("executed_lines", ())
+            missing = data.get("missing_lines", ())
+            yield (
+                file_path,
+                line_bitmap.pack(executed),
+                line_bitmap.pack([*executed, *missing]),
+            )
+
+
+def statement_lines(source: str) -> set[int]:
+    """First lines of the statements in `source`, docstrings excluded."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+    docstrings = set()
+    for node in ast.walk(tree):
+        if isinstance(
+            node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+        ):
+            body = node.body
+            if (
+                body
+                and isinstance(body[0], ast.Expr)
+                and isinstance(body[0].value, ast.Constant)
+                and isinstance(body[0].value.value, str)
+            ):
+                docstrings.add(id(body[0]))
+    return {
+        node.lineno
+        for node in ast.walk(tree)
+        if isinstance(node, ast.stmt) and id(node) not in docstrings
+    }
+
+
+def _sqlite_executed(
+    connection: sqlite3.Connection,
+) -> Iterator[tuple[str, np.ndarray]]:
+    """(path, executed line bitmap) per measured file, merged across contexts."""
+    has_arcs = connection.execute(
+        "SELECT value FROM meta WHERE key = 'has_arcs'"
+    ).fetchone()
+    if has_arcs and has_arcs[0] in ("1", "True", "true"):
+        rows = connection.execute(
+            "SELECT file.path, arc.fromno, arc.tono FROM arc"
+            " JOIN file ON file.id = arc.file_id ORDER BY arc.file_id"
+        )
+        current, lines = None, set()
+        for file_path, start, end in rows:
+            if file_path != current:
+                if current is not None:
+                    yield current, line_bitmap.pack(lines)
+                current, lines = file_path, set()
+            lines.update(n for n in (start, end) if n > 0)
+        if current is not None:
+            yield current, line_bitmap.pack(lines)
+        return
+    # numbits use the same layout as line bitmaps.
+    rows = connection.execute(
+        "SELECT file.path, line_bits.numbits FROM line_bits"
+        " JOIN file ON file.id = line_bits.file_id ORDER BY line_bits.file_id"
+    )
+    current, executed = None, line_bitmap.EMPTY
+    for file_path, numbits in rows:
+        if file_path != current:
+            if current is not None:
+                yield current, executed
+            current, executed = file_path, line_bitmap.EMPTY
+        executed = line_bitmap.union(executed, np.frombuffer(numbits, dtype=np.uint8))
+    if current is not None:
+        yield current, executed
+
+
+def iter_coverage_sqlite(path: str, repo_path: str | None) -> Iterator[FileCoverage]:
+    """
+    Reads a `.coverage` data file. It records executed lines only, so the
+    statements come from parsing each measured source file in the checkout
+    at `repo_path` (or, without one, where it was measured). Files whose
+    source is not there are skipped: their totals cannot be known.
+    """
+    paths = CheckoutPaths(repo_path)
+    skipped, total = [], 0
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        for file_path, executed in _sqlite_executed(connection):
+            total += 1
+            located = paths.locate(file_path)
+            try:
+                if located is None:
+                    raise FileNotFoundError(file_path)
+                source = os.path.join(repo_path, located) if repo_path else located
+                with open(source, "r", errors="replace") as f:
+                    statements = line_bitmap.pack(statement_lines(f.read()))
+            except OSError:
+                skipped.append(file_path)
+                continue
+            yield located, line_bitmap.intersection(executed, statements), statements
+    finally:
+        connection.close()
+    _log_unmapped(skipped, total, repo_path, "skipped")
+
+
+def iter_coverage(path: str, repo_path: str | None = None) -> Iterator[FileCoverage]:
+    """
+    Per-file coverage from a Cobertura XML or coverage.py JSON/SQLite report,
+    with paths relative to the checkout at `repo_path` where they map onto it.
+    """
+    kind = detect_format(path)
+    if kind == COVERAGE_SQLITE:
+        for file_path, executed, statements in iter_coverage_sqlite(path, repo_path):
+            yield relative_path(file_path, repo_path), executed, statements
+        return
+    parse = iter_cobertura if kind == COBERTURA else iter_coverage_json
+    paths = CheckoutPaths(repo_path)
+    unmapped, total = [], 0
+    for file_path, executed, statements in parse(path):
+        total += 1
+        located = paths.locate(file_path) if repo_path else None
+        if repo_path and located is None:
+            unmapped.append(file_path)
+        yield located or relative_path(file_path, repo_path), executed, statements
+    _log_unmapped(unmapped, total, repo_path, "kept as reported")
+
+
+def coverage_row(
+    run_id: int, file_path: str, executed: np.ndarray, statements: np.ndarray
+) -> dict:
+    executed = line_bitmap.intersection(executed, statements)
+    covered = line_bitmap.count(executed)
+    total = line_bitmap.count(statements)
+    return {
+        "run_id": run_id,
+        "file_path": file_path,
+        "covered_lines": covered,
+        "total_lines": total,
+        "coverage_percentage": round(covered / total * 100, 2) if total else 100.0,
+        "executed_bitmap": line_bitmap.encode(executed),
+        "statement_bitmap": line_bitmap.encode(statements),
+    }
+
+
+def ingest_coverage(
+    session, run_id: int, path: str, repo_path: str | None = None
+) -> int:
+    """
+    Replaces the run's per-file coverage with the report at `path`,
+    streaming rows into bulk inserts. Does not commit. Returns the number
+    of files ingested.
+    """
+    session.exec(sqlmodel.delete(Coverage).where(Coverage.run_id == run_id))
+    count = bulk_insert(
+        session,
+        Coverage,
+        (coverage_row(run_id, *entry) for entry in iter_coverage(path, repo_path)),
+    )
+    logger.info(f"Ingested coverage for {count} files into run {run_id} from {path}")
+    return count
@@ -0,0 +1,431 @@
+import ast
+import json
+import logging
+import sys
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from importlib import metadata
+from itertools import chain
+from typing import IO, Iterable
+import networkx as nx
+import sqlmodel
+from cachetools import LRUCache
+from packaging.requirements import InvalidRequirement, Requirement
+from app.adapters.file_index import chunked
+from app.adapters.json_stream import iter_json_array
+from app.adapters.osv_mirror import normalize_package
+from app.adapters.package_metadata import release_key, release_metadata
+from app.core.bulk import insert_ignore
+from app.core.models import (
+    DependencyGraph,
+    FileImports,
+    ProjectComponent,
+    SBOMComponent,
+)
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+# Decoded graphs by lockfile hash, so rescans skip the JSON round trip.
+_graphs: LRUCache = LRUCache(maxsize=64)
+_graphs_lock = threading.Lock()
+# Part of a stored graph's key: bumped when graphs are built differently, so
+# graphs stored before are rebuilt.
+GRAPH_REVISION = "release-metadata"
+# Import names that differ from the package providing them, for packages
+# whose own files are not available here. Values are package nodes.
+IMPORT_PACKAGES: dict[str, tuple[str, ...]] = {
+    "attr": ("attrs",),
+    "bs4": ("beautifulsoup4",),
+    "cv2": (
+        "opencv-python",
+        "opencv-python-headless",
+        "opencv-contrib-python",
+        "opencv-contrib-python-headless",
+    ),
+    "Crypto": ("pycryptodome", "pycrypto"),
+    "Cryptodome": ("pycryptodomex",),
+    "dateutil": ("python-dateutil",),
+    "docx": ("python-docx",),
+    "dotenv": ("python-dotenv",),
+    "fitz": ("pymupdf",),
+    "git": ("gitpython",),
+    "github": ("pygithub",),
+    "google": ("protobuf", "google-api-core", "google-cloud-storage"),
+    "jose": ("python-jose",),
+    "jwt": ("pyjwt",),
+    "ldap": ("python-ldap",),
+    "magic": ("python-magic",),
+    "multipart": ("python-multipart",),
+    "MySQLdb": ("mysqlclient",),
+    "nacl": ("pynacl",),
+    "OpenSSL": ("pyopenssl",),
+    "PIL": ("pillow",),
+    "pkg_resources": ("setuptools",),
+    "psycopg2": ("psycopg2-binary", "psycopg2"),
+    "serial": ("pyserial",),
+    "skimage": ("scikit-image",),
+    "sklearn": ("scikit-learn",),
+    "slugify": ("python-slugify",),
+    "socks": ("pysocks",),
+    "usb": ("pyusb",),
+    "win32api": ("pywin32",),
+    "yaml": ("pyyaml",),
+    "zmq": ("pyzmq",),
+}
+
+
+def package_node(name: str) -> str:
+    return normalize_package("PyPI", name)
+
+
+def unconditional_requires(specs: Iterable[str]) -> tuple[str, ...]:
+    """Package nodes of the Requires-Dist entries that apply without extras."""
+    requires = []
+    for spec in specs:
+        try:
+            requirement = Requirement(spec)
+        except InvalidRequirement:
+            continue
+        if requirement.marker and not requirement.marker.evaluate({"extra": ""}):
+            continue
+        requires.append(package_node(requirement.name))
+    return tuple(requires)
+
+
+@lru_cache(maxsize=None)
+def installed_requires(node: str) -> tuple[str, ...]:
+    """
+    Unconditional requirements of `node` as installed in this environment,
+    whatever its version. Only a fallback for releases whose own metadata
+    could not be resolved (see REACHABILITY_HOST_FALLBACK).
+    """
+    try:
+        return unconditional_requires(metadata.requires(node) or [])
+    except metadata.PackageNotFoundError:
+        return ()
+
+
+def pinned_requires(nodes: dict[str, str]) -> dict[str, tuple[str, ...]]:
+    """
+    Unconditional requirements of each {node: pinned version}, from that
+    release's metadata. Nodes it could not be resolved for are left out.
+    """
+    releases = release_metadata(nodes.items())
+    return {
+        node: unconditional_requires(releases[key].requires_dist)
+        for node, version in nodes.items()
+        if (key := release_key(node, version)) in releases
+    }
+
+
+def sbom_edges(fp: IO[str]) -> list[tuple[str, str]]:
+    """Package-to-package edges from a CycloneDX document's `dependencies`."""
+    fp.seek(0)
+    refs = {
+        comp["bom-ref"]: package_node(comp.get("name", ""))
+        for comp in iter_json_array(fp, "components")
+        if comp.get("bom-ref")
+    }
+    fp.seek(0)
+    edges = []
+    for dependency in iter_json_array(fp, "dependencies"):
+        # Refs outside `components` are the project itself.
+        source = refs.get(dependency.get("ref"))
+        if source is not None:
+            edges.extend(
+                (source, refs[ref])
+                for ref in dependency.get("dependsOn", [])
+                if ref in refs
+            )
+    return edges
+
+
+def build_graph(
+    rows: Iterable[dict],
+    edges: Iterable[tuple[str, str]] = (),
+    previous: nx.DiGraph | None = None,
+) -> nx.DiGraph:
+    """
+    Builds the dependency graph of a lockfile's packages (`name`/`version`
+    rows) from the pinned releases' own requirements, plus any `edges` the
+    SBOM declared (`cyclonedx-py requirements` declares none). Packages
+    whose version is unchanged since `previous` keep their requirements;
+    only new and bumped ones, and ones not resolved last time, are looked
+    up. Packages that still cannot be resolved use the requirements
+    installed here when REACHABILITY_HOST_FALLBACK is on.
+    """
+    graph = nx.DiGraph()
+    for row in rows:
+        graph.add_node(package_node(row["name"]), version=row["version"])
+    lookups = {}
+    for node, data in graph.nodes(data=True):
+        if (
+            previous is not None
+            and node in previous
+            and previous.nodes[node].get("version") == data["version"]
+            and previous.nodes[node].get("resolved", False)
+        ):
+            data["requires"] = previous.nodes[node].get("requires", [])
+            data["resolved"] = True
+        else:
+            lookups[node] = data["version"]
+    resolved = pinned_requires(lookups)
+    fallback = 0
+    for node in lookups:
+        data = graph.nodes[node]
+        data["resolved"] = node in resolved
+        if data["resolved"]:
+            data["requires"] = list(resolved[node])
+        elif settings.REACHABILITY_HOST_FALLBACK:
+            data["requires"] = list(installed_requires(node))
+            fallback += 1
+        else:
+            data["requires"] = []
+    requires = [
+        (node, dep)
+        for node, data in graph.nodes(data=True)
+        for dep in data["requires"]
+        if dep in graph and dep != node
+    ]
+    graph.add_edges_from(requires)
+    graph.add_edges_from((a, b) for a, b in edges if a in graph and b in graph)
+    logger.info(
+        f"Dependency graph: {graph.number_of_nodes()} packages, "
+        f"{graph.number_of_edges()} edges, {len(lookups)} looked up"
+    )
+    if len(lookups) > len(resolved):
+        logger.warning(
+            f"Dependency graph: no release metadata for "
+            f"{len(lookups) - len(resolved)} packages; "
+            + (
+                f"{fallback} use this environment's installed requirements"
+                if fallback
+                else "their requirements are left out"
+            )
+        )
+    return graph
+
+
+def graph_key(lockfile_sha: str) -> str:
+    return f"{lockfile_sha}:{GRAPH_REVISION}"
+
+
+def load_graph(session, lockfile_sha: str) -> nx.DiGraph | None:
+    key = graph_key(lockfile_sha)
+    with _graphs_lock:
+        graph = _graphs.get(key)
+    if graph is not None:
+        return graph
+    raw = session.exec(
+        sqlmodel.select(DependencyGraph.graph).where(
+            DependencyGraph.lockfile_sha == key
+        )
+    ).first()
+    if raw is None:
+        return None
+    graph = nx.node_link_graph(json.loads(raw), edges="edges")
+    with _graphs_lock:
+        _graphs[key] = graph
+    return graph
+
+
+def save_graph(session, lockfile_sha: str, graph: nx.DiGraph):
+    """Stores the graph for `lockfile_sha` unless already there. Does not commit."""
+    insert_ignore(
+        session,
+        DependencyGraph,
+        [
+            {
+                "lockfile_sha": graph_key(lockfile_sha),
+                "graph": json.dumps(nx.node_link_data(graph, edges="edges")),
+            }
+        ],
+        conflict=("lockfile_sha",),
+    )
+    with _graphs_lock:
+        _graphs[graph_key(lockfile_sha)] = graph
+
+
+def linked_packages(session, project_id: int) -> list[dict]:
+    return [
+        {"name": name, "version": version}
+        for name, version in session.exec(
+            sqlmodel.select(SBOMComponent.name, SBOMComponent.version)
+            .join(ProjectComponent, ProjectComponent.component_id == SBOMComponent.id)
+            .where(ProjectComponent.project_id == project_id)
+        ).all()
+    ]
+
+
+def module_imports(source: str) -> set[str]:
+    """Top-level names of the absolute imports in `source`."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.add(node.module.split(".")[0])
+    return modules
+
+
+def first_party_modules(paths: Iterable[str]) -> set[str]:
+    """Top-level modules and packages of the repository itself (or its src/)."""
+    names = set()
+    for path in paths:
+        parts = path.strip("/").split("/")
+        if parts[0] == "src" and len(parts) > 1:
+            parts = parts[1:]
+        if len(parts) == 1:
+            names.add(parts[0].removesuffix(".py"))
+        elif len(parts) == 2 and parts[1] == "__init__.py":
+            names.add(parts[0])
+    return names
+
+
+def repo_imports(session, repo_path: str, hashes: dict[str, str]) -> set[str]:
+    """
+    Third-party modules imported anywhere in the repository. Imports are
+    cached per file content hash, so only new or edited files are parsed.
+    Does not commit.
+    """
+    known: dict[str, str] = {}
+    for batch in chunked(list(set(hashes.values())), 900):
+        known.update(
+            session.exec(
+                sqlmodel.select(FileImports.sha256, FileImports.modules).where(
+                    FileImports.sha256.in_(batch)
+                )
+            ).all()
+        )
+    parsed: dict[str, str] = {}
+    for path, sha in hashes.items():
+        if sha in known or sha in parsed:
+            continue
+        try:
+            with open(repo_path + path, "r", errors="replace") as f:
+                source = f.read()
+        except OSError:
+            continue
+        parsed[sha] = " ".join(sorted(module_imports(source)))
+    if parsed:
+        insert_ignore(
+            session,
+            FileImports,
+            ({"sha256": sha, "modules": modules} for sha, modules in parsed.items()),
+            conflict=("sha256",),
+        )
+    logger.info(f"Imports: parsed {len(parsed)} of {len(hashes)} files")
+    modules = set()
+    for value in chain(known.values(), parsed.values()):
+        modules.update(value.split())
+    return modules - first_party_modules(hashes)
+
+
+@lru_cache(maxsize=None)
+def top_level_modules(node: str, version: str) -> frozenset[str]:
+    """
+    Import names the pinned release provides: its own top_level.txt or
+    RECORD when exactly that version is installed here, else just the
+    package name (see IMPORT_PACKAGES for the ones that differ).
+    """
+    modules = {node.replace("-", "_")}
+    try:
+        dist = metadata.distribution(node)
+    except metadata.PackageNotFoundError:
+        return frozenset(modules)
+    if dist.version != version:
+        return frozenset(modules)
+    top_level = dist.read_text("top_level.txt")
+    if top_level:
+        modules.update(top_level.split())
+    else:
+        modules.update(
+            path.parts[0].removesuffix(".py")
+            for path in dist.files or ()
+            if path.suffix == ".py" and not path.parts[0].startswith(".")
+        )
+    return frozenset(modules)
+
+
+def imported_packages(modules: Iterable[str], graph: nx.DiGraph) -> set[str]:
+    """
+    Maps import names onto graph packages (e.g. `yaml` onto `pyyaml`).
+    Third-party imports that match no package are logged: whatever they
+    pull in cannot be marked reachable.
+    """
+    by_module: dict[str, str] = {}
+    for node, data in graph.nodes(data=True):
+        for module in top_level_modules(node, data.get("version", "")):
+            by_module.setdefault(module, node)
+    for module, packages in IMPORT_PACKAGES.items():
+        for package in packages:
+            if package in graph:
+                by_module.setdefault(module, package)
+                break
+    imported, unmapped = set(), []
+    for module in modules:
+        if module in by_module:
+            imported.add(by_module[module])
+        elif module not in sys.stdlib_module_names:
+            unmapped.append(module)
+    if unmapped:
+        logger.info(
+            f"Reachability: {len(unmapped)} imports match no locked package: "
+            + ", ".join(sorted(unmapped)[:20])
+        )
+    return imported
+
+
+def reachability(graph: nx.DiGraph, imported: set[str]) -> dict[str, int]:
+    """Depth of every package reachable from the imported ones (imported = 1)."""
+    if not imported:
+        return {}
+    lengths = nx.multi_source_dijkstra_path_length(graph, imported)
+    return {node: length + 1 for node, length in lengths.items()}
+
+
+def update_reachability(
+    session, project_id: int, depths: dict[str, int]
+) -> tuple[int, int]:
+    """
+    Writes the reachability of every linked component with one UPDATE per
+    distinct (reachable, depth), touching only links that changed. Does not
+    commit. Returns (reachable, total).
+    """
+    links = session.exec(
+        sqlmodel.select(
+            ProjectComponent.component_id,
+            ProjectComponent.reachable,
+            ProjectComponent.reachability_depth,
+            SBOMComponent.name,
+        )
+        .join(SBOMComponent, SBOMComponent.id == ProjectComponent.component_id)
+        .where(ProjectComponent.project_id == project_id)
+    ).all()
+    changed: dict[tuple[bool, int | None], list[int]] = defaultdict(list)
+    reachable = 0
+    for component_id, was_reachable, was_depth, name in links:
+        depth = depths.get(package_node(name))
+        reachable += depth is not None
+        if (was_reachable, was_depth) != (depth is not None, depth):
+            changed[(depth is not None, depth)].append(component_id)
+    for (is_reachable, depth), component_ids in changed.items():
+        for batch in chunked(component_ids, 900):
+            session.exec(
+                sqlmodel.update(ProjectComponent)
+                .where(
+                    ProjectComponent.project_id == project_id,
+                    ProjectComponent.component_id.in_(batch),
+                )
+                .values(reachable=is_reachable, reachability_depth=depth)
+            )
+    logger.info(
+        f"Reachability for project {project_id}: {reachable} of {len(links)} "
+        f"components reachable, {sum(map(len, changed.values()))} changed"
+    )
+    return reachable, len(links)
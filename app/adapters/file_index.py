@@ -0,0 +1,226 @@
+import hashlib
+import logging
+import os
+from importlib import metadata
+from typing import Iterable, Iterator
+import sqlmodel
+from app.core.bulk import bulk_insert
+from app.core.models import ScannedFile
+
+logger = logging.getLogger(__name__)
+EXCLUDED_DIRS = {
+    ".git",
+    ".hg",
+    ".svn",
+    "CVS",
+    ".bzr",
+    "__pycache__",
+    ".tox",
+    ".nox",
+    ".eggs",
+    ".venv",
+    "venv",
+    "node_modules",
+    ".web",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+}
+
+
+def chunked(items: list, size: int) -> Iterator[list]:
+    """Yields consecutive slices of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def relative_key(repo_path: str, path: str) -> str:
+    """Key used for both the index and `SecurityFinding.file_path`."""
+    return path.replace(repo_path, "")
+
+
+def iter_source_files(
+    repo_path: str, extensions: tuple[str, ...] | None = (".py",)
+) -> Iterator[str]:
+    """
+    Walks the repository, skipping VCS, cache and virtualenv directories.
+    `extensions=None` yields every file.
+    """
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [
+            d for d in dirs if d not in EXCLUDED_DIRS and not d.endswith(".egg-info")
+        ]
+        for name in files:
+            if extensions is None or name.endswith(extensions):
+                yield os.path.join(root, name)
+
+
+def hash_file(path: str) -> str | None:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                digest.update(block)
+    except OSError as e:
+        logger.warning(f"Could not hash {path}: {e}")
+        return None
+    return digest.hexdigest()
+
+
+def hash_paths(repo_path: str, paths: Iterable[str]) -> dict[str, str]:
+    """Returns {relative_key: sha256} for the given absolute paths."""
+    hashes = {}
+    for path in paths:
+        sha = hash_file(path)
+        if sha:
+            hashes[relative_key(repo_path, path)] = sha
+    return hashes
+
+
+def hash_tree(repo_path: str, extensions: tuple[str, ...] = (".py",)) -> dict[str, str]:
+    """Returns {relative_key: sha256} for every source file in the repository."""
+    return hash_paths(repo_path, iter_source_files(repo_path, extensions))
+
+
+def scanner_version(package: str) -> str:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def config_hash(
+    repo_path: str, config_files: Iterable[str], args: Iterable[str]
+) -> str:
+    """Hashes the scanner arguments and any config files present in the repo."""
+    digest = hashlib.sha256(" ".join(args).encode())
+    for name in config_files:
+        path = os.path.join(repo_path, name)
+        if os.path.isfile(path):
+            digest.update(name.encode())
+            digest.update((hash_file(path) or "").encode())
+    return digest.hexdigest()
+
+
+def diff_index(
+    session,
+    project_id: int,
+    scanner: str,
+    current: dict[str, str],
+    version: str,
+    cfg_hash: str,
+) -> tuple[list[str], list[str], bool]:
+    """
+    Compares the current file hashes with the stored index.
+    Returns (changed, removed, full_rescan); a full rescan is needed when the
+    project has never been indexed or the scanner version/config changed.
+    """
+    rows = session.exec(
+        sqlmodel.select(
+            ScannedFile.file_path,
+            ScannedFile.sha256,
+            ScannedFile.scanner_version,
+            ScannedFile.config_hash,
+        ).where(ScannedFile.project_id == project_id, ScannedFile.scanner == scanner)
+    ).all()
+    if not rows or any(r[2] != version or r[3] != cfg_hash for r in rows):
+        return list(current), [], True
+    indexed = {r[0]: r[1] for r in rows}
+    changed = [path for path, sha in current.items() if indexed.get(path) != sha]
+    removed = [path for path in indexed if path not in current]
+    return changed, removed, False
+
+
+def diff_paths(
+    session,
+    project_id: int,
+    scanner: str,
+    current: dict[str, str],
+    missing: list[str],
+    version: str,
+    cfg_hash: str,
+) -> tuple[list[str], list[str], bool] | None:
+    """
+    `diff_index` restricted to the paths a file watcher reported: `current`
+    hashes of the ones that exist and `missing` keys of deleted ones. Returns
+    None when only a full diff will do (never indexed, or the scanner
+    version/config changed).
+    """
+    scope = ScannedFile.project_id == project_id, ScannedFile.scanner == scanner
+    first = session.exec(
+        sqlmodel.select(ScannedFile.scanner_version, ScannedFile.config_hash)
+        .where(*scope)
+        .limit(1)
+    ).first()
+    if first is None or tuple(first) != (version, cfg_hash):
+        return None
+    indexed = {}
+    for batch in chunked(list(current) + list(missing), 500):
+        indexed.update(
+            session.exec(
+                sqlmodel.select(ScannedFile.file_path, ScannedFile.sha256).where(
+                    *scope, ScannedFile.file_path.in_(batch)
+                )
+            ).all()
+        )
+    changed = [path for path, sha in current.items() if indexed.get(path) != sha]
+    removed = [path for path in missing if path in indexed]
+    return changed, removed, False
+
+
+def load_costs(session, project_id: int, scanner: str) -> dict[str, float]:
+    """Last observed scan cost (seconds) per indexed file."""
+    rows = session.exec(
+        sqlmodel.select(ScannedFile.file_path, ScannedFile.scan_cost).where(
+            ScannedFile.project_id == project_id, ScannedFile.scanner == scanner
+        )
+    ).all()
+    return {path: cost for path, cost in rows}
+
+
+def load_hashes(session, project_id: int, scanner: str) -> dict[str, str]:
+    """Indexed sha256 per file as of the last scan."""
+    rows = session.exec(
+        sqlmodel.select(ScannedFile.file_path, ScannedFile.sha256).where(
+            ScannedFile.project_id == project_id, ScannedFile.scanner == scanner
+        )
+    ).all()
+    return {path: sha for path, sha in rows}
+
+
+def update_index(
+    session,
+    project_id: int,
+    scanner: str,
+    hashes: dict[str, str],
+    removed: list[str],
+    version: str,
+    cfg_hash: str,
+    full_rescan: bool = False,
+    costs: dict[str, float] | None = None,
+):
+    """Replaces index rows for the rescanned and removed paths. Does not commit."""
+    base = sqlmodel.delete(ScannedFile).where(
+        ScannedFile.project_id == project_id, ScannedFile.scanner == scanner
+    )
+    if full_rescan:
+        session.exec(base)
+    else:
+        for batch in chunked(list(hashes) + list(removed), 500):
+            session.exec(base.where(ScannedFile.file_path.in_(batch)))
+    bulk_insert(
+        session,
+        ScannedFile,
+        (
+            {
+                "project_id": project_id,
+                "scanner": scanner,
+                "file_path": path,
+                "sha256": sha,
+                "scanner_version": version,
+                "config_hash": cfg_hash,
+                "scan_cost": (costs or {}).get(path, 0.0),
+            }
+            for path, sha in hashes.items()
+        ),
+    )
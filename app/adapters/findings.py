@@ -0,0 +1,149 @@
+import hashlib
+import logging
+from collections import defaultdict
+from itertools import groupby
+from typing import Collection, Iterable, Iterator
+import sqlmodel
+from app.adapters.file_index import chunked
+from app.core.bulk import BATCH_SIZE, bulk_insert
+from app.core.models import SecurityFinding
+
+logger = logging.getLogger(__name__)
+RESOLVED = "resolved"
+
+
+def normalize_path(path: str) -> str:
+    return path.replace("\\", "/").lstrip("/")
+
+
+def _context_line(lines: list[str], line_number: int) -> str:
+    if 0 < line_number <= len(lines):
+        return " ".join(lines[line_number - 1].split())
+    return ""
+
+
+def _read_lines(path: str) -> list[str]:
+    try:
+        with open(path, "r", errors="replace") as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
+def fingerprint_findings(repo_path: str, rows: Iterable[dict]) -> Iterator[dict]:
+    """
+    Sets `fingerprint` on each row from scanner, test_id, normalized path and
+    a hash of the whitespace-normalized source line, so findings keep their
+    identity when unrelated edits shift line numbers. Identical findings in
+    the same file are told apart by their order of occurrence. Rows are
+    consumed lazily, one file group at a time, so scanners must report a
+    file's findings contiguously (bandit does).
+    """
+    seen: dict[str, int] = defaultdict(int)
+    for path, group in groupby(rows, key=lambda r: r["file_path"]):
+        lines = _read_lines(repo_path + path)
+        for row in sorted(group, key=lambda r: r["line_number"]):
+            context = _context_line(lines, row["line_number"])
+            key = "\0".join(
+                [
+                    row["scanner"],
+                    row["test_id"],
+                    normalize_path(path),
+                    hashlib.sha256(context.encode()).hexdigest(),
+                ]
+            )
+            seen[key] += 1
+            row["fingerprint"] = hashlib.sha256(
+                f"{key}\0{seen[key]}".encode()
+            ).hexdigest()
+            yield row
+
+
+def reconcile_findings(
+    session,
+    project_id: int,
+    scanner: str,
+    rows: Iterable[dict],
+    scope: list[str] | None = None,
+    keep: Collection[str] = (),
+) -> tuple[int, int]:
+    """
+    Reconciles freshly scanned (fingerprinted) rows against stored findings
+    for `scanner`, limited to the rescanned file paths in `scope` (None means
+    the whole project). New fingerprints are inserted, vanished ones are
+    marked resolved and matches keep their triage state. Stored findings in
+    the paths in `keep` (e.g. files the scanner failed on) are left as they
+    are. `rows` is streamed straight into the bulk insert; only fingerprints
+    are kept. Does not commit. Returns (inserted, resolved).
+    """
+    query = sqlmodel.select(
+        SecurityFinding.id,
+        SecurityFinding.fingerprint,
+        SecurityFinding.status,
+        SecurityFinding.line_number,
+        SecurityFinding.file_path,
+        SecurityFinding.test_id,
+    ).where(
+        SecurityFinding.project_id == project_id, SecurityFinding.scanner == scanner
+    )
+    if scope is None:
+        existing = session.exec(query).all()
+    else:
+        existing = []
+        for batch in chunked(scope, 500):
+            existing.extend(
+                session.exec(query.where(SecurityFinding.file_path.in_(batch))).all()
+            )
+    if keep:
+        keep = set(keep)
+        existing = [row for row in existing if row.file_path not in keep]
+    stored = {fp: (fid, status, line) for fid, fp, status, line, _, _ in existing if fp}
+    # Rows stored before fingerprints existed are matched once by location,
+    # then adopt the fingerprint, so they keep their triage state.
+    legacy: dict[tuple, list[tuple]] = defaultdict(list)
+    for fid, fp, status, line, path, test_id in existing:
+        if not fp:
+            legacy[(path, test_id, line)].append((fid, status, line))
+    seen: set[str] = set()
+    adopted: set[int] = set()
+    updates = []
+
+    def new_rows():
+        for row in rows:
+            fp = row["fingerprint"]
+            if fp in seen:
+                continue
+            seen.add(fp)
+            if fp not in stored:
+                match = legacy.get(
+                    (row["file_path"], row["test_id"], row["line_number"])
+                )
+                if not match:
+                    yield row
+                    continue
+                fid, status, line = match.pop()
+                adopted.add(fid)
+                updates.append({"id": fid, "fingerprint": fp})
+                if status == RESOLVED:
+                    updates.append({"id": fid, "status": "new"})
+                continue
+            fid, status, line = stored[fp]
+            if status == RESOLVED:
+                updates.append(
+                    {"id": fid, "status": "new", "line_number": row["line_number"]}
+                )
+            elif line != row["line_number"]:
+                updates.append({"id": fid, "line_number": row["line_number"]})
+
+    inserted = bulk_insert(session, SecurityFinding, new_rows())
+    for fid, fp, status, _, _, _ in existing:
+        if fid not in adopted and fp not in seen and status != RESOLVED:
+            updates.append({"id": fid, "status": RESOLVED})
+    resolved = sum(1 for u in updates if u.get("status") == RESOLVED)
+    for batch in chunked(updates, BATCH_SIZE):
+        session.execute(sqlmodel.update(SecurityFinding), batch)
+    logger.info(
+        f"{scanner} findings for project {project_id}: {inserted} new, "
+        f"{resolved} resolved, {len(updates) - resolved} updated"
+    )
+    return inserted, resolved
@@ -0,0 +1,173 @@
+import json
+import re
+from typing import IO, Any, Iterator
+
+CHUNK_SIZE = 1 << 16
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"\s*")
+# A string (group 1 is set once it is closed) or a structural bracket.
+_SKIP_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*(?:(")|\\?\Z)|[\[\]{}]')
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+
+class _Stream:
+    def __init__(self, fp: IO[str], chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self) -> bool:
+        """Drops the consumed prefix and reads at least as much as is pending."""
+        if self.eof:
+            return False
+        pending = len(self.buf) - self.pos
+        chunk = self.fp.read(max(self.chunk_size, pending))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A number cut at the buffer edge still decodes, so only
+                # trust it once something that can't continue it follows.
+                if self.eof or (
+                    end < len(self.buf) and self.buf[end] not in _NUMBER_CHARS
+                ):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._more()
+
+    def skip(self):
+        """Steps over one value without materializing it."""
+        if self.peek() not in ("[", "{"):
+            self.value()
+            return
+        depth = 0
+        while True:
+            match = _SKIP_TOKEN.search(self.buf, self.pos)
+            if match is None or (match.group()[0] == '"' and match.group(1) is None):
+                self.pos = len(self.buf) if match is None else match.start()
+                if not self._more():
+                    raise ValueError("Truncated JSON stream")
+                continue
+            self.pos = match.end()
+            token = match.group()
+            if token in ("[", "{"):
+                depth += 1
+            elif token in ("]", "}"):
+                depth -= 1
+                if depth == 0:
+                    return
+
+
+def iter_json_array(
+    fp: IO[str], key: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    Yields the items of the array under the top-level `key` of the JSON
+    object in `fp`, decoding one item at a time so memory stays bounded by
+    the largest item rather than the whole document. Other keys are skipped
+    without being decoded. An empty file or a missing key yields nothing.
+    """
+    stream = _Stream(fp, chunk_size)
+    if stream.peek() == "":
+        return
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        name = stream.value()
+        stream.expect(":")
+        if name == key and stream.peek() == "[":
+            stream.expect("[")
+            if stream.peek() == "]":
+                return
+            while True:
+                yield stream.value()
+                if stream.peek() == "]":
+                    return
+                stream.expect(",")
+        stream.skip()
+        if stream.peek() == "}":
+            return
+        stream.expect(",")
+
+
+def iter_json_object(
+    fp: IO[str], key: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[tuple[str, Any]]:
+    """
+    Like `iter_json_array`, for an object under the top-level `key`: yields
+    its (name, value) pairs one at a time.
+    """
+    stream = _Stream(fp, chunk_size)
+    if stream.peek() == "":
+        return
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        name = stream.value()
+        stream.expect(":")
+        if name == key and stream.peek() == "{":
+            stream.expect("{")
+            if stream.peek() == "}":
+                return
+            while True:
+                member = stream.value()
+                stream.expect(":")
+                yield member, stream.value()
+                if stream.peek() == "}":
+                    return
+                stream.expect(",")
+        stream.skip()
+        if stream.peek() == "}":
+            return
+        stream.expect(",")
+
+
+def has_key(fp: IO[str], key: str, chunk_size: int = CHUNK_SIZE) -> bool:
+    """
+    Whether the JSON object in `fp` has the top-level `key`, skipping the
+    other values without decoding them. False for an empty file.
+    """
+    stream = _Stream(fp, chunk_size)
+    if stream.peek() != "{":
+        return False
+    stream.expect("{")
+    if stream.peek() == "}":
+        return False
+    while True:
+        name = stream.value()
+        if name == key:
+            return True
+        stream.expect(":")
+        stream.skip()
+        if stream.peek() == "}":
+            return False
+        stream.expect(",")
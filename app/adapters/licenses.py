@@ -0,0 +1,244 @@
+import logging
+import re
+from collections import defaultdict
+from functools import lru_cache
+import sqlmodel
+from license_expression import (
+    AND,
+    OR,
+    ExpressionError,
+    LicenseWithExceptionSymbol,
+    get_spdx_licensing,
+)
+from app.adapters.file_index import chunked
+from app.core.models import ProjectComponent, ProjectPolicy, SBOMComponent
+
+logger = logging.getLogger(__name__)
+ALLOWED = "allowed"
+REVIEW = "review"
+UNKNOWN = "unknown"
+DENIED = "denied"
+# OR takes the best operand, AND the worst.
+_RANK = {DENIED: 0, UNKNOWN: 1, REVIEW: 2, ALLOWED: 3}
+_NON_IDSTRING = re.compile(r"[^A-Za-z0-9.-]+")
+
+
+@lru_cache(maxsize=1)
+def licensing():
+    """The SPDX license index, built once per process."""
+    return get_spdx_licensing()
+
+
+def license_ref(name: str) -> str:
+    """Turns a free-text license name into an SPDX LicenseRef identifier."""
+    return "LicenseRef-" + _NON_IDSTRING.sub("-", name.strip()).strip("-")
+
+
+def declared_license(comp_data: dict) -> str | None:
+    """
+    The SPDX expression for a CycloneDX component's `licenses`: an explicit
+    expression, SPDX ids, or free-text names as LicenseRefs. Several entries
+    all apply, so they are ANDed.
+    """
+    parts = []
+    for entry in comp_data.get("licenses") or []:
+        if entry.get("expression"):
+            parts.append(entry["expression"])
+            continue
+        license_data = entry.get("license") or {}
+        if license_data.get("id"):
+            parts.append(license_data["id"])
+        elif license_data.get("name"):
+            parts.append(license_ref(license_data["name"]))
+    if len(parts) > 1:
+        return " AND ".join(f"({part})" for part in parts)
+    return parts[0] if parts else None
+
+
+# Trove license classifiers by SPDX id, for releases without a License field.
+CLASSIFIER_LICENSES = {
+    "License :: OSI Approved :: MIT License": "MIT",
+    "License :: OSI Approved :: MIT No Attribution License (MIT-0)": "MIT-0",
+    "License :: OSI Approved :: BSD License": "BSD-3-Clause",
+    "License :: OSI Approved :: Apache Software License": "Apache-2.0",
+    "License :: OSI Approved :: ISC License (ISCL)": "ISC",
+    "License :: OSI Approved :: Python Software Foundation License": "PSF-2.0",
+    "License :: OSI Approved :: Mozilla Public License 2.0 (MPL 2.0)": "MPL-2.0",
+    "License :: OSI Approved :: GNU General Public License v2 (GPLv2)": "GPL-2.0-only",
+    "License :: OSI Approved :: GNU General Public License v2 or later (GPLv2+)": (
+        "GPL-2.0-or-later"
+    ),
+    "License :: OSI Approved :: GNU General Public License v3 (GPLv3)": "GPL-3.0-only",
+    "License :: OSI Approved :: GNU General Public License v3 or later (GPLv3+)": (
+        "GPL-3.0-or-later"
+    ),
+    "License :: OSI Approved :: GNU Lesser General Public License v2 (LGPLv2)": (
+        "LGPL-2.0-only"
+    ),
+    "License :: OSI Approved :: GNU Lesser General Public License v2 or later (LGPLv2+)": (
+        "LGPL-2.0-or-later"
+    ),
+    "License :: OSI Approved :: GNU Lesser General Public License v3 (LGPLv3)": (
+        "LGPL-3.0-only"
+    ),
+    "License :: OSI Approved :: GNU Lesser General Public License v3 or later (LGPLv3+)": (
+        "LGPL-3.0-or-later"
+    ),
+    "License :: OSI Approved :: GNU Affero General Public License v3": "AGPL-3.0-only",
+    "License :: OSI Approved :: GNU Affero General Public License v3 or later (AGPLv3+)": (
+        "AGPL-3.0-or-later"
+    ),
+    "License :: OSI Approved :: Eclipse Public License 2.0 (EPL-2.0)": "EPL-2.0",
+    "License :: OSI Approved :: The Unlicense (Unlicense)": "Unlicense",
+    "License :: OSI Approved :: zlib/libpng License": "Zlib",
+    "License :: OSI Approved :: Historical Permission Notice and Disclaimer (HPND)": (
+        "HPND"
+    ),
+    "License :: OSI Approved :: Academic Free License (AFL)": "AFL-3.0",
+    "License :: CC0 1.0 Universal (CC0 1.0) Public Domain Dedication": "CC0-1.0",
+}
+# Longer License fields are the license text itself, not a name.
+MAX_LICENSE_NAME = 100
+
+
+@lru_cache(maxsize=4096)
+def parse_expression(expression: str):
+    """
+    Parsed and simplified `expression`, or None if it is not valid SPDX.
+    Cached process-wide: thousands of components share a handful of licenses.
+    """
+    try:
+        return licensing().parse(expression, simple=True).simplify()
+    except ExpressionError as e:
+        logger.debug(f"Unparseable license expression {expression!r}: {e}")
+        return None
+
+
+def metadata_license(
+    expression: str | None, license: str | None, classifiers: tuple[str, ...]
+) -> str | None:
+    """
+    The SPDX expression for a release's core metadata: License-Expression,
+    else a License field that is valid SPDX, else its license classifiers
+    (several meaning a choice, so ORed), else a short License field as a
+    LicenseRef. None when nothing usable was declared.
+    """
+    if expression:
+        return expression
+    name = (license or "").strip()
+    if "\n" in name or len(name) > MAX_LICENSE_NAME or name.upper() == "UNKNOWN":
+        name = ""
+    if name:
+        parsed = parse_expression(name)
+        if parsed is not None and not licensing().unknown_license_keys(parsed):
+            return str(parsed)
+    ids = [CLASSIFIER_LICENSES[c] for c in classifiers if c in CLASSIFIER_LICENSES]
+    if ids:
+        return " OR ".join(dict.fromkeys(ids))
+    return license_ref(name) if name else None
+
+
+@lru_cache(maxsize=1024)
+def _policy_key(entry: str) -> str:
+    parsed = parse_expression(entry)
+    if parsed is not None and parsed.isliteral:
+        return _symbol_key(parsed)
+    return license_ref(entry).lower()
+
+
+def policy_keys(entries: str) -> frozenset[str]:
+    """Normalized license keys of a comma-separated policy list."""
+    return frozenset(
+        _policy_key(entry.strip()) for entry in entries.split(",") if entry.strip()
+    )
+
+
+def _symbol_key(symbol) -> str:
+    # Exceptions narrow a license, the policy applies to the license itself.
+    if isinstance(symbol, LicenseWithExceptionSymbol):
+        symbol = symbol.license_symbol
+    return symbol.key.lower()
+
+
+def _verdict(node, allow: frozenset[str], deny: frozenset[str]) -> str:
+    if isinstance(node, (AND, OR)):
+        verdicts = [_verdict(arg, allow, deny) for arg in node.args]
+        pick = max if isinstance(node, OR) else min
+        return pick(verdicts, key=_RANK.get)
+    key = _symbol_key(node)
+    if key in deny:
+        return DENIED
+    if key in allow:
+        return ALLOWED
+    if licensing().unknown_license_keys(node):
+        return UNKNOWN
+    return REVIEW if allow else ALLOWED
+
+
+@lru_cache(maxsize=16384)
+def evaluate(
+    expression: str | None, allow: frozenset[str], deny: frozenset[str]
+) -> str:
+    """
+    The policy verdict on `expression`: denied if any mandatory license is
+    denied, allowed if every mandatory license is allowed (or, with an empty
+    allow list, known and not denied), review if a known license is simply
+    not on the allow list, unknown when nothing usable was declared.
+    """
+    if not expression:
+        return UNKNOWN
+    parsed = parse_expression(expression)
+    if parsed is None:
+        return UNKNOWN
+    return _verdict(parsed, allow, deny)
+
+
+def evaluate_project_licenses(session, project_id: int) -> dict[str, int]:
+    """
+    Evaluates every component linked to the project in one pass: one query
+    for the links, one evaluation per distinct expression, and one UPDATE
+    per verdict for the links whose status changed. Does not commit.
+    Returns the number of components per verdict.
+    """
+    policy = session.exec(
+        sqlmodel.select(ProjectPolicy.license_allow, ProjectPolicy.license_deny).where(
+            ProjectPolicy.project_id == project_id
+        )
+    ).first()
+    allow = policy_keys(policy[0]) if policy else frozenset()
+    deny = policy_keys(policy[1]) if policy else frozenset()
+    links = session.exec(
+        sqlmodel.select(
+            ProjectComponent.component_id,
+            ProjectComponent.license_status,
+            SBOMComponent.license_expression,
+        )
+        .join(SBOMComponent, SBOMComponent.id == ProjectComponent.component_id)
+        .where(ProjectComponent.project_id == project_id)
+    ).all()
+    verdicts = {
+        expression: evaluate(expression, allow, deny)
+        for expression in {expression for _, _, expression in links}
+    }
+    counts: dict[str, int] = defaultdict(int)
+    changed: dict[str, list[int]] = defaultdict(list)
+    for component_id, status, expression in links:
+        verdict = verdicts[expression]
+        counts[verdict] += 1
+        if verdict != status:
+            changed[verdict].append(component_id)
+    for verdict, component_ids in changed.items():
+        for batch in chunked(component_ids, 900):
+            session.exec(
+                sqlmodel.update(ProjectComponent)
+                .where(
+                    ProjectComponent.project_id == project_id,
+                    ProjectComponent.component_id.in_(batch),
+                )
+                .values(license_status=verdict)
+            )
+    logger.info(
+        f"Licenses for project {project_id}: "
+        + ", ".join(f"{count} {verdict}" for verdict, count in sorted(counts.items()))
+    )
+    return dict(counts)
@@ -0,0 +1,129 @@
+"""
+Line-level coverage as bitmaps: bit n of a little-endian packed uint8 array
+is line n. Stored blobs are a one-byte codec tag followed by the packed
+bytes, zlib-compressed when that is smaller.
+"""
+
+import zlib
+from typing import Iterable, Sequence
+import numpy as np
+
+RAW = 0
+ZLIB = 1
+EMPTY = np.zeros(0, dtype=np.uint8)
+
+
+def pack(lines: Iterable[int]) -> np.ndarray:
+    """Bitmap of the given (positive) line numbers."""
+    numbers = np.fromiter(lines, dtype=np.int64)
+    if not numbers.size:
+        return EMPTY
+    bits = np.zeros(int(numbers.max()) + 1, dtype=bool)
+    bits[numbers] = True
+    return np.packbits(bits, bitorder="little")
+
+
+def unpack(bitmap: np.ndarray) -> np.ndarray:
+    """Line numbers set in `bitmap`, ascending."""
+    return np.flatnonzero(np.unpackbits(bitmap, bitorder="little"))
+
+
+def count(bitmap: np.ndarray) -> int:
+    return int(np.bitwise_count(bitmap).sum())
+
+
+def _aligned(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    if len(a) < len(b):
+        a = np.pad(a, (0, len(b) - len(a)))
+    elif len(b) < len(a):
+        b = np.pad(b, (0, len(a) - len(b)))
+    return a, b
+
+
+def union(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a, b = _aligned(a, b)
+    return a | b
+
+
+def intersection(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a, b = _aligned(a, b)
+    return a & b
+
+
+def difference(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Lines in `a` but not in `b`."""
+    a, b = _aligned(a, b)
+    return a & ~b
+
+
+def encode(bitmap: np.ndarray) -> bytes:
+    """Compact blob for `bitmap`; trailing zero bytes are dropped."""
+    nonzero = np.flatnonzero(bitmap)
+    raw = bitmap[: nonzero[-1] + 1].tobytes() if nonzero.size else b""
+    packed = zlib.compress(raw, 6)
+    if len(packed) < len(raw):
+        return bytes((ZLIB,)) + packed
+    return bytes((RAW,)) + raw
+
+
+def decode(blob: bytes | None) -> np.ndarray:
+    if not blob:
+        return EMPTY
+    payload = blob[1:]
+    if blob[0] == ZLIB:
+        payload = zlib.decompress(payload)
+    elif blob[0] != RAW:
+        raise ValueError(f"Unknown line bitmap codec {blob[0]}")
+    return np.frombuffer(payload, dtype=np.uint8)
+
+
+class BitmapPairs:
+    """
+    Two aligned sequences of bitmaps (e.g. one file per position, in a base
+    and a head run) laid out in flat padded buffers, so set operations over
+    every pair are single vectorized expressions.
+    """
+
+    def __init__(self, left: Sequence[np.ndarray], right: Sequence[np.ndarray]):
+        if len(left) != len(right):
+            raise ValueError("Bitmap sequences must be aligned")
+        widths = np.fromiter(
+            (max(len(a), len(b)) for a, b in zip(left, right)),
+            dtype=np.int64,
+            count=len(left),
+        )
+        self.offsets = np.zeros(len(widths) + 1, dtype=np.int64)
+        np.cumsum(widths, out=self.offsets[1:])
+        self.left = self.flatten(left)
+        self.right = self.flatten(right)
+
+    def flatten(self, bitmaps: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        Lays out another aligned sequence like these. Lines past both
+        bitmaps of a pair are dropped, which intersections never need.
+        """
+        flat = np.zeros(int(self.offsets[-1]), dtype=np.uint8)
+        offsets = self.offsets.tolist()
+        for start, end, bitmap in zip(offsets, offsets[1:], bitmaps):
+            width = min(len(bitmap), end - start)
+            flat[start : start + width] = bitmap[:width]
+        return flat
+
+    def counts(self, flat: np.ndarray) -> np.ndarray:
+        """Set lines per pair position in a flat buffer shaped like these."""
+        totals = np.zeros(len(flat) + 1, dtype=np.int64)
+        np.cumsum(np.bitwise_count(flat), out=totals[1:])
+        return totals[self.offsets[1:]] - totals[self.offsets[:-1]]
+
+    def split(self, flat: np.ndarray) -> list[np.ndarray]:
+        return np.split(flat, self.offsets[1:-1])
+
+    def union(self) -> np.ndarray:
+        return self.left | self.right
+
+    def intersection(self) -> np.ndarray:
+        return self.left & self.right
+
+    def difference(self) -> np.ndarray:
+        """Lines set on the left but not the right, per position."""
+        return self.left & ~self.right
@@ -0,0 +1,28 @@
+import logging
+from app.core.http import gather_chunks, request_json
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+# api.osv.dev rejects querybatch requests with more than 1000 queries.
+OSV_BATCH_LIMIT = 1000
+
+
+async def _query_chunk(queries: list[dict]) -> list[dict]:
+    data = await request_json(
+        "POST",
+        f"{settings.OSV_API_URL.rstrip('/')}/v1/querybatch",
+        json={"queries": queries},
+    )
+    results = data.get("results", [])
+    if len(results) != len(queries):
+        raise ValueError(
+            f"OSV returned {len(results)} results for {len(queries)} queries"
+        )
+    return results
+
+
+async def query_batch(queries: list[dict]) -> list[dict]:
+    """querybatch over any number of queries; results stay aligned with input."""
+    return await gather_chunks(
+        queries, OSV_BATCH_LIMIT, _query_chunk, settings.OSV_MAX_CONCURRENCY
+    )
@@ -0,0 +1,170 @@
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable
+import redis
+from cachetools import TTLCache
+from app.adapters.osv_mirror import normalize_package
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+CacheKey = tuple[str, str, str]
+
+
+def cache_key(query: dict) -> CacheKey:
+    package = query.get("package", {})
+    ecosystem = package.get("ecosystem", "")
+    return (
+        ecosystem,
+        normalize_package(ecosystem, package.get("name", "")),
+        query.get("version", ""),
+    )
+
+
+class OSVCache(ABC):
+    """
+    Vulnerability lookup cache keyed by (ecosystem, package, version). Clean
+    packages are cached too (as an empty list) with a shorter TTL, so new
+    advisories for them are picked up sooner.
+    """
+
+    def __init__(self, ttl: int, negative_ttl: int):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    @abstractmethod
+    def get_many(self, keys: list[CacheKey]) -> dict[CacheKey, list[dict]]:
+        """Cached results for the keys present; absent keys are misses."""
+
+    @abstractmethod
+    def set_many(self, values: dict[CacheKey, list[dict]]):
+        """Stores results; empty lists are cached with the negative TTL."""
+
+    def record(self, hits: int, misses: int):
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class LocalOSVCache(OSVCache):
+    """In-process LRU with TTL expiry; one per worker process."""
+
+    def __init__(self, ttl: int, negative_ttl: int, maxsize: int = 100_000):
+        super().__init__(ttl, negative_ttl)
+        self._positive = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._negative = TTLCache(maxsize=maxsize, ttl=negative_ttl)
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[CacheKey]) -> dict[CacheKey, list[dict]]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._negative:
+                    found[key] = []
+                elif (vulns := self._positive.get(key)) is not None:
+                    found[key] = vulns
+        return found
+
+    def set_many(self, values: dict[CacheKey, list[dict]]):
+        with self._lock:
+            for key, vulns in values.items():
+                if vulns:
+                    self._positive[key] = vulns
+                else:
+                    self._negative[key] = True
+
+
+class RedisOSVCache(OSVCache):
+    """Shared across processes and nodes; entries expire via Redis TTLs."""
+
+    prefix = "osv:v1:"
+
+    def __init__(self, connection, ttl: int, negative_ttl: int):
+        super().__init__(ttl, negative_ttl)
+        self.connection = connection
+
+    def _name(self, key: CacheKey) -> str:
+        return self.prefix + "\x1f".join(key)
+
+    def get_many(self, keys: list[CacheKey]) -> dict[CacheKey, list[dict]]:
+        if not keys:
+            return {}
+        try:
+            raw = self.connection.mget([self._name(k) for k in keys])
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"OSV cache read failed, treating as misses: {e}")
+            return {}
+        return {k: json.loads(v) for k, v in zip(keys, raw) if v is not None}
+
+    def set_many(self, values: dict[CacheKey, list[dict]]):
+        try:
+            pipe = self.connection.pipeline(transaction=False)
+            for key, vulns in values.items():
+                ttl = self.ttl if vulns else self.negative_ttl
+                pipe.set(self._name(key), json.dumps(vulns), ex=ttl)
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"OSV cache write failed: {e}")
+
+
+_cache: OSVCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_osv_cache() -> OSVCache:
+    """Process-wide cache; Redis when configured and reachable, else local LRU."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            ttl = settings.OSV_CACHE_TTL
+            negative_ttl = settings.OSV_CACHE_NEGATIVE_TTL
+            if settings.OSV_CACHE_BACKEND == "redis":
+                try:
+                    connection = redis.from_url(settings.REDIS_URL)
+                    connection.ping()
+                    _cache = RedisOSVCache(connection, ttl, negative_ttl)
+                except redis.exceptions.RedisError as e:
+                    logger.warning(f"Redis unavailable for OSV cache, using LRU: {e}")
+            if _cache is None:
+                _cache = LocalOSVCache(ttl, negative_ttl)
+        return _cache
+
+
+def cached_osv_query(
+    queries: list[dict], fetch: Callable[[list[dict]], list[dict] | None]
+) -> list[dict] | None:
+    """
+    Answers a querybatch-shaped request from the cache and sends only the
+    misses to `fetch`. Returns results in query order, or None if the fetch
+    for the misses failed.
+    """
+    cache = get_osv_cache()
+    keys = [cache_key(q) for q in queries]
+    cached = cache.get_many(list(set(keys)))
+    missing = {}
+    for key, query in zip(keys, queries):
+        if key not in cached and key not in missing:
+            missing[key] = query
+    cache.record(hits=len(keys) - len(missing), misses=len(missing))
+    if missing:
+        fetched = fetch(list(missing.values()))
+        if fetched is None:
+            return None
+        fresh = {key: result.get("vulns", []) for key, result in zip(missing, fetched)}
+        cache.set_many(fresh)
+        cached.update(fresh)
+    logger.info(f"OSV cache: {len(missing)} of {len(keys)} lookups missed")
+    return [{"vulns": cached[k]} if cached[k] else {} for k in keys]
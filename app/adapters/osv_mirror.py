@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import re
+import threading
+import zipfile
+from collections import defaultdict
+from typing import Any, Iterable, Iterator
+from packaging.version import InvalidVersion, Version
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+OSV_DUMP_URL = "https://osv-vulnerabilities.storage.googleapis.com/{ecosystem}/all.zip"
+
+
+def normalize_package(ecosystem: str, name: str) -> str:
+    if ecosystem == "PyPI":
+        return re.sub(r"[-_.]+", "-", name).lower()
+    return name
+
+
+def _loose_version(value: str) -> tuple:
+    """Orders semver-like strings; a pre-release sorts before its release."""
+    main, _, pre = value.lstrip("v").partition("-")
+    numbers = tuple(int(p) for p in re.findall(r"\d+", main))
+    pre_key = tuple((0, int(p)) if p.isdigit() else (1, p) for p in pre.split("."))
+    return (numbers, 0 if pre else 1, pre_key if pre else ())
+
+
+def parse_version(ecosystem: str, value: str):
+    if ecosystem == "PyPI":
+        return Version(value)
+    return _loose_version(value)
+
+
+class RangeMatcher:
+    """Affected intervals of one OSV range, parsed once at load time."""
+
+    __slots__ = ("intervals",)
+
+    def __init__(self, intervals: list[tuple[Any, Any, bool]]):
+        self.intervals = intervals
+
+    @classmethod
+    def from_events(cls, ecosystem: str, events: list[dict]) -> "RangeMatcher":
+        parsed = []
+        for event in events:
+            kind, raw = next(iter(event.items()))
+            if kind == "limit":
+                continue
+            value = None if raw == "0" else parse_version(ecosystem, raw)
+            parsed.append((kind, value))
+        parsed.sort(key=lambda e: (e[1] is not None, e[1] if e[1] is not None else 0))
+        intervals = []
+        start = None
+        opened = False
+        for kind, value in parsed:
+            if kind == "introduced":
+                start, opened = value, True
+            elif opened and kind in ("fixed", "last_affected"):
+                intervals.append((start, value, kind == "last_affected"))
+                opened = False
+        if opened:
+            intervals.append((start, None, False))
+        return cls(intervals)
+
+    def matches(self, version) -> bool:
+        for low, high, inclusive in self.intervals:
+            if low is not None and version < low:
+                continue
+            if high is None or version < high or (inclusive and version == high):
+                return True
+        return False
+
+
+class _Affected:
+    __slots__ = ("vuln_id", "versions", "ranges")
+
+    def __init__(self, vuln_id: str, versions: frozenset, ranges: list[RangeMatcher]):
+        self.vuln_id = vuln_id
+        self.versions = versions
+        self.ranges = ranges
+
+
+class OSVMirror:
+    """
+    In-process OSV database loaded from the ecosystem dumps OSV publishes
+    (`<ecosystem>/all.zip`). Advisories are indexed by (ecosystem, package)
+    with their version ranges precompiled, so SBOM matching needs no network.
+    """
+
+    def __init__(self):
+        self.vulns: dict[str, dict] = {}
+        self.index: dict[tuple[str, str], list[_Affected]] = defaultdict(list)
+
+    @classmethod
+    def load(cls, path: str) -> "OSVMirror":
+        """Loads a dump zip, a directory of zips, or a directory of OSV JSON files."""
+        mirror = cls()
+        for record in _iter_records(path):
+            mirror.add(record)
+        logger.info(
+            f"Loaded OSV mirror from {path}: {len(mirror.vulns)} advisories, "
+            f"{len(mirror.index)} packages"
+        )
+        return mirror
+
+    def add(self, record: dict):
+        if record.get("withdrawn") or "id" not in record:
+            return
+        self.vulns[record["id"]] = record
+        for affected in record.get("affected", []):
+            package = affected.get("package", {})
+            ecosystem = package.get("ecosystem", "").split(":")[0]
+            name = package.get("name")
+            if not ecosystem or not name:
+                continue
+            ranges = []
+            for r in affected.get("ranges", []):
+                if r.get("type") not in ("ECOSYSTEM", "SEMVER"):
+                    continue
+                try:
+                    ranges.append(RangeMatcher.from_events(ecosystem, r["events"]))
+                except (InvalidVersion, KeyError, StopIteration, TypeError):
+                    logger.debug(f"Skipping unparseable range in {record['id']}")
+            self.index[(ecosystem, normalize_package(ecosystem, name))].append(
+                _Affected(record["id"], frozenset(affected.get("versions", [])), ranges)
+            )
+
+    def query(self, ecosystem: str, name: str, version: str) -> list[dict]:
+        entries = self.index.get((ecosystem, normalize_package(ecosystem, name)))
+        if not entries:
+            return []
+        try:
+            parsed = parse_version(ecosystem, version)
+        except InvalidVersion:
+            parsed = None
+        found = {}
+        for entry in entries:
+            if entry.vuln_id in found:
+                continue
+            if version in entry.versions or (
+                parsed is not None and any(r.matches(parsed) for r in entry.ranges)
+            ):
+                found[entry.vuln_id] = self.vulns[entry.vuln_id]
+        return list(found.values())
+
+    def query_batch(self, queries: list[dict]) -> list[dict]:
+        """Same request/response shape as OSV's /v1/querybatch `results`."""
+        results = []
+        for q in queries:
+            package = q.get("package", {})
+            vulns = self.query(
+                package.get("ecosystem", ""),
+                package.get("name", ""),
+                q.get("version", ""),
+            )
+            results.append({"vulns": vulns} if vulns else {})
+        return results
+
+
+def _iter_zip(path: str) -> Iterator[dict]:
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            if name.endswith(".json"):
+                yield json.loads(archive.read(name))
+
+
+def _iter_records(path: str) -> Iterable[dict]:
+    if os.path.isfile(path):
+        yield from _iter_zip(path)
+        return
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            if name.endswith(".zip"):
+                yield from _iter_zip(full)
+            elif name.endswith(".json"):
+                with open(full, "r") as f:
+                    yield json.load(f)
+
+
+_mirror: OSVMirror | None = None
+_mirror_key: tuple | None = None
+_mirror_lock = threading.Lock()
+
+
+def _mtime_key(path: str) -> tuple:
+    if os.path.isfile(path):
+        return (path, os.path.getmtime(path))
+    return (
+        path,
+        max(
+            (
+                os.path.getmtime(os.path.join(r, f))
+                for r, _, fs in os.walk(path)
+                for f in fs
+            ),
+            default=0,
+        ),
+    )
+
+
+def get_osv_mirror() -> OSVMirror | None:
+    """Process-wide mirror from OSV_MIRROR_PATH, reloaded when the dump changes."""
+    global _mirror, _mirror_key
+    path = settings.OSV_MIRROR_PATH
+    if not path or not os.path.exists(path):
+        return None
+    with _mirror_lock:
+        key = _mtime_key(path)
+        if _mirror is None or key != _mirror_key:
+            try:
+                _mirror = OSVMirror.load(path)
+                _mirror_key = key
+            except Exception as e:
+                logger.exception(f"Failed to load OSV mirror from {path}: {e}")
+                return None
+        return _mirror
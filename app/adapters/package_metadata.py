@@ -0,0 +1,147 @@
+"""
+Metadata of pinned PyPI releases (license fields, requirements): from this
+environment when it has exactly that version installed, else from the PyPI
+JSON API unless PYPI_METADATA_ENABLED is off. Releases are immutable, so
+lookups are cached per process; failed ones for PYPI_METADATA_NEGATIVE_TTL.
+"""
+
+import asyncio
+import logging
+import threading
+from importlib import metadata
+from typing import Iterable, NamedTuple
+import httpx
+from cachetools import LRUCache, TTLCache
+from app.adapters.osv_mirror import normalize_package
+from app.core import http
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+# (normalized package name, version)
+ReleaseKey = tuple[str, str]
+# Lookups are cheap to repeat and slow to fail, so give up quickly.
+METADATA_RETRIES = 1
+
+
+class ReleaseMetadata(NamedTuple):
+    license_expression: str | None
+    license: str | None
+    classifiers: tuple[str, ...]
+    requires_dist: tuple[str, ...]
+
+
+_releases: LRUCache = LRUCache(maxsize=50_000)
+_failures: TTLCache = TTLCache(maxsize=50_000, ttl=settings.PYPI_METADATA_NEGATIVE_TTL)
+_releases_lock = threading.Lock()
+
+
+def release_key(name: str, version: str) -> ReleaseKey:
+    return normalize_package("PyPI", name), version
+
+
+def _installed(name: str, version: str) -> ReleaseMetadata | None:
+    try:
+        dist = metadata.distribution(name)
+    except metadata.PackageNotFoundError:
+        return None
+    if dist.version != version:
+        return None
+    return ReleaseMetadata(
+        license_expression=dist.metadata.get("License-Expression"),
+        license=dist.metadata.get("License"),
+        classifiers=tuple(dist.metadata.get_all("Classifier") or ()),
+        requires_dist=tuple(dist.requires or ()),
+    )
+
+
+async def _fetch(name: str, version: str) -> tuple[ReleaseMetadata | None, bool]:
+    """(metadata, definitive): 404s are definitive, transport failures not."""
+    try:
+        data = await http.request_json(
+            "GET",
+            f"{settings.PYPI_API_URL.rstrip('/')}/{name}/{version}/json",
+            retries=METADATA_RETRIES,
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return None, True
+        logger.warning(f"PyPI metadata for {name}=={version} failed: {e}")
+        return None, False
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning(f"PyPI metadata for {name}=={version} failed: {e!r}")
+        return None, False
+    info = data.get("info") or {}
+    return (
+        ReleaseMetadata(
+            license_expression=info.get("license_expression"),
+            license=info.get("license"),
+            classifiers=tuple(info.get("classifiers") or ()),
+            requires_dist=tuple(info.get("requires_dist") or ()),
+        ),
+        True,
+    )
+
+
+async def _fetch_all(
+    keys: list[ReleaseKey],
+) -> list[tuple[ReleaseMetadata | None, bool]]:
+    gate = asyncio.Semaphore(settings.PYPI_MAX_CONCURRENCY)
+
+    async def fetch(key: ReleaseKey):
+        async with gate:
+            return await _fetch(*key)
+
+    return await asyncio.gather(*(fetch(key) for key in keys))
+
+
+def release_metadata(
+    releases: Iterable[tuple[str, str]],
+) -> dict[ReleaseKey, ReleaseMetadata]:
+    """
+    Metadata of each (name, version) that could be resolved, keyed by
+    `release_key`. Unknown releases are left out; so are releases PyPI could
+    not be reached for, which are tried again once their failure expires.
+    """
+    keys = {release_key(name, version) for name, version in releases}
+    found: dict[ReleaseKey, ReleaseMetadata] = {}
+    missing = []
+    with _releases_lock:
+        for key in keys:
+            if key in _releases:
+                if _releases[key] is not None:
+                    found[key] = _releases[key]
+            else:
+                missing.append(key)
+    remote, skipped = [], 0
+    for key in missing:
+        local = _installed(*key)
+        if local is not None:
+            found[key] = local
+            with _releases_lock:
+                _releases[key] = local
+        elif not settings.PYPI_METADATA_ENABLED or key in _failures:
+            skipped += 1
+        else:
+            remote.append(key)
+    if not remote:
+        if skipped:
+            logger.info(f"Release metadata: {skipped} releases not looked up")
+        return found
+    fetched = http.call(_fetch_all(remote))
+    unresolved = 0
+    with _releases_lock:
+        for key, (meta, definitive) in zip(remote, fetched):
+            if definitive:
+                _releases[key] = meta
+            else:
+                _failures[key] = True
+            if meta is not None:
+                found[key] = meta
+            else:
+                unresolved += 1
+    logger.info(
+        f"Release metadata: {len(keys) - len(remote) - skipped} cached or "
+        f"installed, {len(remote) - unresolved} fetched, {unresolved} "
+        f"unresolved, {skipped} not looked up"
+    )
+    return found
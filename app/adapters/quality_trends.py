@@ -0,0 +1,239 @@
+import datetime
+import logging
+import numpy as np
+import sqlmodel
+from sqlalchemy import bindparam
+from app.adapters.file_index import chunked
+from app.core.bulk import bulk_insert, upsert
+from app.core.models import QualityRollup, QualityScore, Run
+from app.core.scoring import SUB_SCORES, composite_scores
+
+logger = logging.getLogger(__name__)
+ROLLUP_SCORES = (*SUB_SCORES, "composite_score")
+DAILY = QualityRollup.__table__.c.run_id.is_(None)
+DEFAULT_TREND_DAYS = 90
+
+
+def _day(completed_at, started_at, created_at) -> datetime.date:
+    return (completed_at or started_at or created_at).date()
+
+
+def run_day(run: Run) -> datetime.date:
+    """The day a run counts towards: when it completed, else started."""
+    return _day(run.completed_at, run.started_at, run.created_at)
+
+
+def refresh_day(session, test_plan_id: int, day: datetime.date):
+    """
+    Recomputes a plan's daily row from that day's run rows, so the cost is
+    the day's runs, not the plan's history. Does not commit.
+    """
+    columns = [getattr(QualityRollup, name) for name in ROLLUP_SCORES]
+    runs, *averages, low, high = session.exec(
+        sqlmodel.select(
+            sqlmodel.func.count(QualityRollup.id),
+            *[sqlmodel.func.avg(column) for column in columns],
+            sqlmodel.func.min(QualityRollup.composite_score),
+            sqlmodel.func.max(QualityRollup.composite_score),
+        ).where(
+            QualityRollup.test_plan_id == test_plan_id,
+            QualityRollup.day == day,
+            QualityRollup.run_id.is_not(None),
+        )
+    ).one()
+    if not runs:
+        session.exec(
+            sqlmodel.delete(QualityRollup).where(
+                QualityRollup.test_plan_id == test_plan_id,
+                QualityRollup.day == day,
+                DAILY,
+            )
+        )
+        return
+    row = {
+        "test_plan_id": test_plan_id,
+        "day": day,
+        "run_id": None,
+        "runs": runs,
+        **dict(zip(ROLLUP_SCORES, averages)),
+        "composite_min": low,
+        "composite_max": high,
+        "updated_at": datetime.datetime.now(),
+    }
+    upsert(
+        session,
+        QualityRollup,
+        [row],
+        conflict=("test_plan_id", "day"),
+        update=("runs", *ROLLUP_SCORES, "composite_min", "composite_max", "updated_at"),
+        index_where=DAILY,
+    )
+
+
+def record_quality_score(session, score: QualityScore):
+    """
+    Brings the rollups up to date after `score` is written: its run's row,
+    then the daily row of its plan (and of the run's previous day, if the
+    run moved). Does not commit.
+    """
+    run = session.get(Run, score.run_id)
+    day = run_day(run)
+    previous = session.exec(
+        sqlmodel.select(QualityRollup.test_plan_id, QualityRollup.day).where(
+            QualityRollup.run_id == run.id
+        )
+    ).first()
+    upsert(
+        session,
+        QualityRollup,
+        [
+            {
+                "test_plan_id": run.test_plan_id,
+                "day": day,
+                "run_id": run.id,
+                "runs": 1,
+                **{name: getattr(score, name) for name in ROLLUP_SCORES},
+                "composite_min": score.composite_score,
+                "composite_max": score.composite_score,
+                "updated_at": datetime.datetime.now(),
+            }
+        ],
+        conflict=("run_id",),
+        update=(
+            "test_plan_id",
+            "day",
+            *ROLLUP_SCORES,
+            "composite_min",
+            "composite_max",
+            "updated_at",
+        ),
+    )
+    refresh_day(session, run.test_plan_id, day)
+    if previous is not None and tuple(previous) != (run.test_plan_id, day):
+        refresh_day(session, *previous)
+
+
+def quality_trend(
+    session, test_plan_id: int, days: int = DEFAULT_TREND_DAYS
+) -> list[QualityRollup]:
+    """The plan's daily rows for the last `days` days, oldest first."""
+    since = datetime.date.today() - datetime.timedelta(days=days)
+    return session.exec(
+        sqlmodel.select(QualityRollup)
+        .where(
+            QualityRollup.test_plan_id == test_plan_id,
+            QualityRollup.day >= since,
+            DAILY,
+        )
+        .order_by(QualityRollup.day)
+    ).all()
+
+
+def backfill_quality_rollups(
+    session, test_plan_id: int | None = None
+) -> tuple[int, int]:
+    """
+    Rebuilds the rollups of one plan (or all) from every stored score.
+    Composites are rescored with the current weights in one vectorized
+    pass, and stale QualityScore composites are corrected. Does not commit.
+    Returns (runs, days).
+    """
+    score_table = QualityScore.__table__
+    run_table = Run.__table__
+    query = sqlmodel.select(
+        score_table.c.id,
+        run_table.c.id,
+        run_table.c.test_plan_id,
+        run_table.c.completed_at,
+        run_table.c.started_at,
+        run_table.c.created_at,
+        *[score_table.c[name] for name in ROLLUP_SCORES],
+    ).join(run_table, run_table.c.id == score_table.c.run_id)
+    if test_plan_id is not None:
+        query = query.where(run_table.c.test_plan_id == test_plan_id)
+    rows = session.connection().execute(query).all()
+    scope = [] if test_plan_id is None else [QualityRollup.test_plan_id == test_plan_id]
+    session.exec(sqlmodel.delete(QualityRollup).where(*scope))
+    if not rows:
+        return 0, 0
+    stored = np.array([r[6:] for r in rows], dtype=np.float64)
+    composite = composite_scores(stored[:, : len(SUB_SCORES)])
+    stale = np.flatnonzero(~np.isclose(composite, stored[:, -1]))
+    statement = (
+        score_table.update()
+        .where(score_table.c.id == bindparam("score_id"))
+        .values(composite_score=bindparam("composite"))
+    )
+    for batch in chunked(stale.tolist(), 5000):
+        session.connection().execute(
+            statement,
+            [{"score_id": rows[i][0], "composite": float(composite[i])} for i in batch],
+        )
+    stored[:, -1] = composite
+    days = [_day(*r[3:6]) for r in rows]
+    plans = np.array([r[2] for r in rows], dtype=np.int64)
+    now = datetime.datetime.now()
+    bulk_insert(
+        session,
+        QualityRollup,
+        (
+            {
+                "test_plan_id": r[2],
+                "day": day,
+                "run_id": r[1],
+                "runs": 1,
+                **dict(zip(ROLLUP_SCORES, values)),
+                "composite_min": values[-1],
+                "composite_max": values[-1],
+                "updated_at": now,
+            }
+            for r, day, values in zip(rows, days, stored.tolist())
+        ),
+    )
+    # Daily rows: group runs by (plan, day) and aggregate every column at once.
+    ordinals = np.array([day.toordinal() for day in days], dtype=np.int64)
+    keys, group = np.unique(
+        np.stack([plans, ordinals], axis=1), axis=0, return_inverse=True
+    )
+    group = group.ravel()
+    counts = np.bincount(group, minlength=len(keys))
+    sums = np.stack(
+        [
+            np.bincount(group, weights=stored[:, i], minlength=len(keys))
+            for i in range(stored.shape[1])
+        ],
+        axis=1,
+    )
+    low = np.full(len(keys), np.inf)
+    high = np.full(len(keys), -np.inf)
+    np.minimum.at(low, group, stored[:, -1])
+    np.maximum.at(high, group, stored[:, -1])
+    averages = sums / counts[:, None]
+    bulk_insert(
+        session,
+        QualityRollup,
+        (
+            {
+                "test_plan_id": plan,
+                "day": datetime.date.fromordinal(ordinal),
+                "run_id": None,
+                "runs": runs,
+                **dict(zip(ROLLUP_SCORES, values)),
+                "composite_min": minimum,
+                "composite_max": maximum,
+                "updated_at": now,
+            }
+            for (plan, ordinal), runs, values, minimum, maximum in zip(
+                keys.tolist(),
+                counts.tolist(),
+                averages.tolist(),
+                low.tolist(),
+                high.tolist(),
+            )
+        ),
+    )
+    logger.info(
+        f"Backfilled quality rollups: {len(rows)} runs, {len(keys)} days, "
+        f"{len(stale)} composites rescored"
+    )
+    return len(rows), len(keys)
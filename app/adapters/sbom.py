@@ -0,0 +1,150 @@
+import logging
+from typing import IO
+import sqlmodel
+from app.adapters.file_index import chunked
+from app.adapters.json_stream import iter_json_array
+from app.adapters.licenses import declared_license, metadata_license
+from app.adapters.package_metadata import release_key, release_metadata
+from app.core.bulk import bulk_insert, upsert
+from app.core.models import ProjectComponent, SBOMComponent
+
+logger = logging.getLogger(__name__)
+
+
+def purl_key(purl: str) -> str:
+    """The package identity of a purl: everything but version, qualifiers and subpath."""
+    base = purl.split("#", 1)[0].split("?", 1)[0]
+    return base.rsplit("@", 1)[0]
+
+
+def component_rows(fp: IO[str]) -> dict[str, dict]:
+    """Streams a CycloneDX JSON document into catalog rows keyed by `purl_key`."""
+    rows = {}
+    for comp_data in iter_json_array(fp, "components"):
+        name = comp_data.get("name", "Unknown Library")
+        version = comp_data.get("version", "0.0.0")
+        purl = comp_data.get("purl") or f"pkg:generic/{name}@{version}"
+        rows[purl_key(purl)] = {
+            "name": name,
+            "version": version,
+            "purl": purl,
+            "license_expression": declared_license(comp_data),
+        }
+    return rows
+
+
+def resolve_licenses(session, rows: list[dict]) -> list[dict]:
+    """
+    Fills in the licenses the SBOM left out (`cyclonedx-py requirements`
+    declares none): from the catalog entry when it already has one, else
+    from the pinned PyPI release's metadata. Updates `rows` in place and
+    returns those resolved from metadata, which the catalog lacks.
+    """
+    pending = {row["purl"]: row for row in rows if not row["license_expression"]}
+    for batch in chunked(list(pending), 900):
+        for purl, expression in session.exec(
+            sqlmodel.select(SBOMComponent.purl, SBOMComponent.license_expression).where(
+                SBOMComponent.purl.in_(batch),
+                SBOMComponent.license_expression.is_not(None),
+            )
+        ).all():
+            pending.pop(purl)["license_expression"] = expression
+    lookups = [row for row in pending.values() if row["purl"].startswith("pkg:pypi/")]
+    releases = release_metadata((row["name"], row["version"]) for row in lookups)
+    resolved = []
+    for row in lookups:
+        meta = releases.get(release_key(row["name"], row["version"]))
+        if meta is None:
+            continue
+        row["license_expression"] = metadata_license(
+            meta.license_expression, meta.license, meta.classifiers
+        )
+        if row["license_expression"]:
+            resolved.append(row)
+    logger.info(
+        f"Licenses: {len(pending)} not in the SBOM or catalog, "
+        f"{len(resolved)} resolved from release metadata"
+    )
+    return resolved
+
+
+def catalog_ids(session, rows: list[dict]) -> dict[str, int]:
+    """
+    Ensures a catalog entry exists for every row, filling in its license
+    where the row has one; returns {purl: id}.
+    """
+    upsert(
+        session,
+        SBOMComponent,
+        rows,
+        conflict=("purl",),
+        update=("license_expression",),
+    )
+    ids = {}
+    for batch in chunked([row["purl"] for row in rows], 900):
+        ids.update(
+            session.exec(
+                sqlmodel.select(SBOMComponent.purl, SBOMComponent.id).where(
+                    SBOMComponent.purl.in_(batch)
+                )
+            ).all()
+        )
+    return ids
+
+
+def sync_components(
+    session, project_id: int, fresh: dict[str, dict]
+) -> tuple[int, int, int]:
+    """
+    Points the project's component links at `fresh` (from `component_rows`):
+    new packages and version bumps are linked to their catalog entries
+    (created if no project used that purl before), vanished packages and
+    superseded versions are unlinked, unchanged links are not touched.
+    Catalog entries and their advisories are shared, so only purls new to
+    the whole catalog are left pending for the OSV step. Licenses missing
+    from the SBOM are resolved from release metadata. Does not commit.
+    Returns (added, bumped, removed).
+    """
+    linked = session.exec(
+        sqlmodel.select(SBOMComponent.id, SBOMComponent.purl)
+        .join(ProjectComponent, ProjectComponent.component_id == SBOMComponent.id)
+        .where(ProjectComponent.project_id == project_id)
+    ).all()
+    linked_keys = set()
+    unchanged = set()
+    unlink = []
+    for component_id, purl in linked:
+        key = purl_key(purl)
+        linked_keys.add(key)
+        if key in fresh and fresh[key]["purl"] == purl and key not in unchanged:
+            unchanged.add(key)
+        else:
+            unlink.append(component_id)
+    resolved = resolve_licenses(session, list(fresh.values()))
+    to_link = [row for key, row in fresh.items() if key not in unchanged]
+    # Entries linked earlier but stored without a license get it now too.
+    backfill = [row for row in resolved if purl_key(row["purl"]) in unchanged]
+    ids = catalog_ids(session, to_link + backfill) if to_link or backfill else {}
+    for batch in chunked(unlink, 900):
+        session.exec(
+            sqlmodel.delete(ProjectComponent).where(
+                ProjectComponent.project_id == project_id,
+                ProjectComponent.component_id.in_(batch),
+            )
+        )
+    bulk_insert(
+        session,
+        ProjectComponent,
+        (
+            {"project_id": project_id, "component_id": ids[row["purl"]]}
+            for row in to_link
+        ),
+    )
+    bumped = sum(1 for key in fresh if key in linked_keys and key not in unchanged)
+    added = len(to_link) - bumped
+    removed = len(linked_keys - set(fresh))
+    logger.info(
+        f"SBOM for project {project_id}: {added} added, {bumped} bumped, "
+        f"{removed} removed, {len(unchanged)} unchanged"
+    )
+    return added, bumped, removed
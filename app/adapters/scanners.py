@@ -0,0 +1,399 @@
+import reflex as rx
+import sqlmodel
+import datetime
+import os
+import tempfile
+import logging
+from typing import Callable
+from app.core.models import ProjectComponent, SBOMComponent
+from app.core import http
+from app.core.settings import settings
+from app.core.taxonomy import owasp_category
+from app.adapters.file_index import (
+    chunked,
+    config_hash,
+    diff_index,
+    diff_paths,
+    hash_file,
+    hash_paths,
+    hash_tree,
+    load_costs,
+    load_hashes,
+    relative_key,
+    scanner_version,
+    update_index,
+)
+from app.adapters import osv_api
+from app.adapters.osv_mirror import get_osv_mirror
+from app.adapters.osv_cache import cached_osv_query, get_osv_cache
+from app.adapters.vulnerabilities import persist_vulnerabilities, vulnerability_rows
+from app.adapters.sbom import component_rows, sync_components
+from app.adapters.licenses import evaluate_project_licenses
+from app.adapters.dependency_graph import (
+    GRAPH_REVISION,
+    build_graph,
+    imported_packages,
+    linked_packages,
+    load_graph,
+    reachability,
+    repo_imports,
+    save_graph,
+    sbom_edges,
+    update_reachability,
+)
+from app.adapters.findings import fingerprint_findings, reconcile_findings
+from app.orchestrator.process_runner import run_process
+from app.adapters.bandit_scanner import (
+    BANDIT_ARGS,
+    BANDIT_CONFIG_FILES,
+    run_bandit_sharded,
+)
+from app.adapters.secrets_scanner import (
+    SECRETS_CONFIG_FILES,
+    SECRETS_EXCLUDES,
+    candidate_files,
+    is_candidate,
+    run_secrets_parallel,
+)
+
+logger = logging.getLogger(__name__)
+CYCLONEDX_ARGS = ["requirements"]
+# Part of the cyclonedx index key: bumped when what is derived from the SBOM
+# changes, so lockfiles indexed before are processed again.
+SBOM_REVISION = "licenses-from-release-metadata"
+SECRETS_SCANNER = "detect-secrets"
+# CWE-798: Use of Hard-coded Credentials.
+SECRETS_CWE = 798
+
+
+def bandit_row(repo_path: str, project_id: int, finding_data: dict) -> dict:
+    cwe_id = finding_data.get("cwe", {}).get("id")
+    return {
+        "project_id": project_id,
+        "scanner": "bandit",
+        "test_id": finding_data["test_id"],
+        "description": finding_data["issue_text"],
+        "severity": finding_data["issue_severity"],
+        "file_path": relative_key(repo_path, finding_data["filename"]),
+        "line_number": finding_data["line_number"],
+        "cwe": str(cwe_id) if cwe_id is not None else None,
+        "owasp_category": owasp_category(cwe_id),
+    }
+
+
+def _diff_files(
+    session,
+    repo_path: str,
+    project_id: int,
+    scanner: str,
+    version: str,
+    cfg_hash: str,
+    paths: list[str] | None,
+    include: Callable[[str], bool],
+    tree: Callable[[], dict[str, str]],
+) -> tuple[dict[str, str], list[str], list[str], bool]:
+    """
+    Diffs the file index against the whole tree, or only against `paths`
+    (absolute, e.g. from a watcher) when given and the index allows it.
+    Returns (current, changed, removed, full_rescan).
+    """
+    if paths is not None:
+        wanted = [path for path in paths if include(path)]
+        current = hash_paths(repo_path, [p for p in wanted if os.path.isfile(p)])
+        missing = [relative_key(repo_path, p) for p in wanted if not os.path.exists(p)]
+        diff = diff_paths(
+            session, project_id, scanner, current, missing, version, cfg_hash
+        )
+        if diff is not None:
+            return (current, *diff)
+    current = tree()
+    return (
+        current,
+        *diff_index(session, project_id, scanner, current, version, cfg_hash),
+    )
+
+
+def run_bandit_scan(repo_path: str, project_id: int, paths: list[str] | None = None):
+    version = scanner_version("bandit")
+    cfg_hash = config_hash(repo_path, BANDIT_CONFIG_FILES, BANDIT_ARGS)
+    with rx.session() as session:
+        current, changed, removed, full_rescan = _diff_files(
+            session,
+            repo_path,
+            project_id,
+            "bandit",
+            version,
+            cfg_hash,
+            paths,
+            lambda path: path.endswith(".py"),
+            lambda: hash_tree(repo_path),
+        )
+        history = load_costs(session, project_id, "bandit")
+    if not changed and not removed:
+        return
+    scan = run_bandit_sharded(repo_path, changed, history)
+    if scan is None:
+        # Findings and the index stay as they were, so the files are retried.
+        raise RuntimeError("Bandit failed on at least one shard")
+    results, costs = scan
+    rows = fingerprint_findings(
+        repo_path, (bandit_row(repo_path, project_id, r) for r in results)
+    )
+    with rx.session() as session:
+        reconcile_findings(
+            session,
+            project_id,
+            "bandit",
+            rows,
+            None if full_rescan else changed + removed,
+        )
+        update_index(
+            session,
+            project_id,
+            "bandit",
+            {path: current[path] for path in changed},
+            removed,
+            version,
+            cfg_hash,
+            full_rescan=full_rescan,
+            costs=costs,
+        )
+        session.commit()
+
+
+def secrets_row(repo_path: str, project_id: int, result: dict) -> dict:
+    return {
+        "project_id": project_id,
+        "scanner": SECRETS_SCANNER,
+        "test_id": result["type"],
+        "description": f"Potential hard-coded secret: {result['type']}",
+        "severity": "HIGH",
+        "file_path": relative_key(repo_path, result["filename"]),
+        "line_number": result["line_number"],
+        "cwe": str(SECRETS_CWE),
+        "owasp_category": owasp_category(SECRETS_CWE),
+    }
+
+
+def run_secrets_scan(repo_path: str, project_id: int, paths: list[str] | None = None):
+    version = scanner_version(SECRETS_SCANNER)
+    cfg_hash = config_hash(repo_path, SECRETS_CONFIG_FILES, SECRETS_EXCLUDES)
+    with rx.session() as session:
+        current, changed, removed, full_rescan = _diff_files(
+            session,
+            repo_path,
+            project_id,
+            SECRETS_SCANNER,
+            version,
+            cfg_hash,
+            paths,
+            lambda path: is_candidate(repo_path, path),
+            lambda: hash_paths(repo_path, candidate_files(repo_path)),
+        )
+    if not changed and not removed:
+        return
+    results, failed = run_secrets_parallel([repo_path + path for path in changed])
+    # Files detect-secrets failed on keep their findings and stay out of the
+    # index, so the next scan retries them.
+    failed = {relative_key(repo_path, path) for path in failed}
+    rows = fingerprint_findings(
+        repo_path, (secrets_row(repo_path, project_id, r) for r in results)
+    )
+    with rx.session() as session:
+        reconcile_findings(
+            session,
+            project_id,
+            SECRETS_SCANNER,
+            rows,
+            None if full_rescan else changed + removed,
+            keep=failed,
+        )
+        update_index(
+            session,
+            project_id,
+            SECRETS_SCANNER,
+            {path: current[path] for path in changed if path not in failed},
+            removed,
+            version,
+            cfg_hash,
+            full_rescan=full_rescan,
+        )
+        session.commit()
+
+
+def run_cyclonedx_scan(repo_path: str, project_id: int):
+    req_file = os.path.join(repo_path, "requirements.txt")
+    if not os.path.exists(req_file):
+        return
+    version = scanner_version("cyclonedx-bom")
+    cfg_hash = config_hash(repo_path, [], [*CYCLONEDX_ARGS, SBOM_REVISION])
+    current = {relative_key(repo_path, req_file): hash_file(req_file)}
+    with rx.session() as session:
+        changed, _, _ = diff_index(
+            session, project_id, "cyclonedx", current, version, cfg_hash
+        )
+    if not changed:
+        return
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as outf:
+        output_file = outf.name
+    try:
+        result = run_process(
+            ["cyclonedx-py", *CYCLONEDX_ARGS, req_file, "-o", output_file],
+            label="cyclonedx",
+            capture_output=True,
+        )
+        if not result.ok:
+            raise RuntimeError(f"cyclonedx-py failed: {result.stderr.strip()[-2000:]}")
+        with open(output_file, "r") as f:
+            rows = component_rows(f)
+            edges = sbom_edges(f)
+        with rx.session() as session:
+            sync_components(session, project_id, rows)
+            previous_sha = load_hashes(session, project_id, "cyclonedx").get(
+                relative_key(repo_path, req_file)
+            )
+            previous = load_graph(session, previous_sha) if previous_sha else None
+            save_graph(
+                session,
+                current[relative_key(repo_path, req_file)],
+                build_graph(rows.values(), edges, previous),
+            )
+            update_index(
+                session,
+                project_id,
+                "cyclonedx",
+                current,
+                [],
+                version,
+                cfg_hash,
+                full_rescan=True,
+            )
+            session.commit()
+    finally:
+        if os.path.exists(output_file):
+            os.unlink(output_file)
+
+
+def check_osv(project_id: int):
+    """
+    Looks up the project's catalog entries that no project has checked
+    within OSV_RECHECK_INTERVAL, so advisories published later for an
+    unchanged dependency are still found; they land on the shared entry.
+    """
+    stale = datetime.datetime.now() - datetime.timedelta(
+        seconds=settings.OSV_RECHECK_INTERVAL
+    )
+    with rx.session() as session:
+        components = session.exec(
+            sqlmodel.select(SBOMComponent)
+            .join(ProjectComponent, ProjectComponent.component_id == SBOMComponent.id)
+            .where(
+                ProjectComponent.project_id == project_id,
+                sqlmodel.or_(
+                    SBOMComponent.osv_checked_at.is_(None),
+                    SBOMComponent.osv_checked_at < stale,
+                ),
+            )
+        ).all()
+        queries = []
+        for comp in components:
+            queries.append(
+                {
+                    "package": {"name": comp.name, "ecosystem": "PyPI"},
+                    "version": comp.version,
+                }
+            )
+        if not queries:
+            return
+        results = query_osv(queries)
+        stats = get_osv_cache().stats()
+        logger.info(
+            f"OSV cache ({stats['backend']}) after project {project_id}: "
+            f"{stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['hit_rate']:.0%} hit rate this process"
+        )
+        if results is not None:
+            component_ids = [c.id for c in components]
+            rows = vulnerability_rows(component_ids, results)
+            persist_vulnerabilities(session, rows)
+            checked_at = datetime.datetime.now()
+            for batch in chunked(component_ids, 900):
+                session.exec(
+                    sqlmodel.update(SBOMComponent)
+                    .where(SBOMComponent.id.in_(batch))
+                    .values(osv_checked_at=checked_at)
+                )
+            session.commit()
+
+
+def analyze_reachability(
+    repo_path: str, project_id: int, paths: list[str] | None = None
+):
+    """
+    Flags the project's components its code can reach: packages it imports
+    and, transitively, their dependencies. The lockfile's graph and each
+    file's imports are cached by content hash, and the file hashes are
+    indexed like a scanner's, so a watcher's rescan only hashes `paths`.
+    """
+    req_file = os.path.join(repo_path, "requirements.txt")
+    if not os.path.exists(req_file):
+        return
+    lockfile_sha = hash_file(req_file)
+    cfg_hash = config_hash(repo_path, [], [])
+    with rx.session() as session:
+        current, changed, removed, full_rescan = _diff_files(
+            session,
+            repo_path,
+            project_id,
+            "reachability",
+            GRAPH_REVISION,
+            cfg_hash,
+            paths,
+            lambda path: path.endswith(".py"),
+            lambda: hash_tree(repo_path),
+        )
+        hashes = {} if full_rescan else load_hashes(session, project_id, "reachability")
+        for path in removed:
+            hashes.pop(path, None)
+        hashes.update((path, current[path]) for path in changed)
+        graph = load_graph(session, lockfile_sha)
+        if graph is None:
+            graph = build_graph(linked_packages(session, project_id))
+            save_graph(session, lockfile_sha, graph)
+        modules = repo_imports(session, repo_path, hashes)
+        depths = reachability(graph, imported_packages(modules, graph))
+        update_reachability(session, project_id, depths)
+        if changed or removed:
+            update_index(
+                session,
+                project_id,
+                "reachability",
+                {path: current[path] for path in changed},
+                removed,
+                GRAPH_REVISION,
+                cfg_hash,
+                full_rescan=full_rescan,
+            )
+        session.commit()
+
+
+def check_licenses(project_id: int):
+    """Applies the project's license policy to its current SBOM."""
+    with rx.session() as session:
+        evaluate_project_licenses(session, project_id)
+        session.commit()
+
+
+def query_osv(queries: list[dict]) -> list[dict] | None:
+    return cached_osv_query(queries, fetch_osv)
+
+
+def fetch_osv(queries: list[dict]) -> list[dict] | None:
+    mirror = get_osv_mirror()
+    if mirror:
+        return mirror.query_batch(queries)
+    try:
+        return http.call(osv_api.query_batch(queries))
+    except Exception as e:
+        logger.exception(f"OSV lookup failed: {e}")
+        return None
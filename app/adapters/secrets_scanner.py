@@ -0,0 +1,176 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterator
+import pathspec
+from app.adapters.file_index import chunked, iter_source_files
+from app.orchestrator.process_runner import limit_current_process, node_slots_held
+
+logger = logging.getLogger(__name__)
+# Paths never worth scanning for secrets: vendored code, build output,
+# lockfiles full of hashes and formats that are binary anyway.
+SECRETS_EXCLUDES = [
+    "vendor/",
+    "vendored/",
+    "third_party/",
+    "site-packages/",
+    "bower_components/",
+    "dist/",
+    "build/",
+    ".next/",
+    "coverage/",
+    "htmlcov/",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*.lock",
+    "package-lock.json",
+    "*.egg",
+    "*.whl",
+    "*.pyc",
+    "*.so",
+    "*.dll",
+    "*.dylib",
+    "*.exe",
+    "*.bin",
+    "*.db",
+    "*.sqlite",
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.ico",
+    "*.webp",
+    "*.pdf",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.eot",
+    "*.zip",
+    "*.gz",
+    "*.tar",
+    "*.tgz",
+    "*.jar",
+    "*.mp3",
+    "*.mp4",
+]
+SECRETS_EXCLUDE_SPEC = pathspec.PathSpec.from_lines("gitwildmatch", SECRETS_EXCLUDES)
+SECRETS_CONFIG_FILES = [".secrets.baseline"]
+SECRETS_BATCH_FILES = 200
+# Files larger than this are data dumps rather than source or config.
+MAX_FILE_BYTES = 1 << 20
+BINARY_SNIFF_BYTES = 8192
+
+
+def is_candidate(repo_path: str, path: str) -> bool:
+    """Whether `path` is scanned for secrets; deleted files count if not excluded."""
+    if SECRETS_EXCLUDE_SPEC.match_file(os.path.relpath(path, repo_path)):
+        return False
+    try:
+        return os.path.getsize(path) <= MAX_FILE_BYTES
+    except OSError:
+        return not os.path.exists(path)
+
+
+def candidate_files(repo_path: str) -> Iterator[str]:
+    """Every file in the repository except excluded and oversized ones."""
+    for path in iter_source_files(repo_path, None):
+        if is_candidate(repo_path, path):
+            yield path
+
+
+def _is_binary(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return b"\0" in f.read(BINARY_SNIFF_BYTES)
+    except OSError:
+        return True
+
+
+@lru_cache(maxsize=1)
+def _init_worker():
+    # Runs once per process: enable every plugin and the default filters.
+    from detect_secrets.core.plugins.util import get_mapping_from_secret_type_to_class
+    from detect_secrets.settings import configure_settings_from_baseline
+
+    configure_settings_from_baseline(
+        {
+            "plugins_used": [
+                {"name": plugin.__name__}
+                for plugin in get_mapping_from_secret_type_to_class().values()
+            ]
+        }
+    )
+
+
+def _scan_batch(paths: list[str]) -> tuple[list[dict], list[str]]:
+    """
+    Scans a batch of absolute paths in a pool process. No secret values
+    leave it. Returns (results, paths detect-secrets failed on).
+    """
+    from detect_secrets.core.scan import scan_file
+
+    results, failed = [], []
+    for path in paths:
+        if _is_binary(path):
+            continue
+        try:
+            secrets = sorted(scan_file(path), key=lambda s: s.line_number or 0)
+        except Exception as e:
+            logger.warning(f"detect-secrets failed on {path}: {e}")
+            failed.append(path)
+            continue
+        results.extend(
+            {
+                "filename": path,
+                "line_number": secret.line_number or 0,
+                "type": secret.type,
+            }
+            for secret in secrets
+        )
+    return results, failed
+
+
+def _init_pool_worker():
+    limit_current_process()
+    _init_worker()
+
+
+def run_secrets_parallel(
+    paths: list[str], workers: int | None = None
+) -> tuple[list[dict], list[str]]:
+    """
+    Scans `paths` in batches across a process pool (detect-secrets is pure
+    Python, so threads would serialize on the GIL). Returns the results in
+    submission order, so each file's findings are contiguous, and the paths
+    that could not be scanned, whose previous findings must be left alone.
+    Raises if any batch fails. A single batch, e.g. a watcher's edit, is
+    scanned in-process to skip the pool start-up.
+
+    Like every governed subprocess, the pool runs within the node's slots:
+    it gets one worker per slot it could take (at least one) and each
+    worker runs under the process rlimits.
+    """
+    if not paths:
+        return [], []
+    if len(paths) <= SECRETS_BATCH_FILES:
+        with node_slots_held(1):
+            _init_worker()
+            return _scan_batch(paths)
+    results, failed = [], []
+    batches = -(-len(paths) // SECRETS_BATCH_FILES)
+    with node_slots_held(min(workers or os.cpu_count() or 1, batches)) as slots:
+        # spawn rather than fork: the scan runs inside a threaded worker.
+        with ProcessPoolExecutor(
+            max_workers=slots,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_pool_worker,
+        ) as pool:
+            for batch_results, batch_failed in pool.map(
+                _scan_batch, chunked(paths, SECRETS_BATCH_FILES), chunksize=1
+            ):
+                results.extend(batch_results)
+                failed.extend(batch_failed)
+    return results, failed
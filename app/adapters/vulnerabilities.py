@@ -0,0 +1,75 @@
+import json
+import logging
+import sqlmodel
+from app.adapters.file_index import chunked
+from app.core.bulk import bulk_insert
+from app.core.models import ComponentVulnerability
+
+logger = logging.getLogger(__name__)
+
+
+def _severity(vuln_data: dict) -> tuple[str, float | None]:
+    for sev in vuln_data.get("severity") or []:
+        if sev.get("type") == "CVSS_V3":
+            severity = sev.get("database_specific", {}).get("severity", "UNKNOWN")
+            try:
+                cvss_score = float(sev.get("score")) if sev.get("score") else None
+            except ValueError:
+                # OSV usually carries the CVSS vector here rather than a number.
+                cvss_score = None
+            return severity, cvss_score
+    return "UNKNOWN", None
+
+
+def vulnerability_rows(
+    component_ids: list[int], results: list[dict]
+) -> dict[tuple[int, str], dict]:
+    """
+    Turns querybatch `results` (aligned with `component_ids`) into
+    ComponentVulnerability rows keyed by (component id, OSV id).
+    """
+    rows = {}
+    for component_id, res in zip(component_ids, results):
+        for vuln_data in res.get("vulns", []):
+            key = (component_id, vuln_data["id"])
+            if key in rows:
+                continue
+            severity, cvss_score = _severity(vuln_data)
+            rows[key] = {
+                "component_id": component_id,
+                "osv_id": vuln_data["id"],
+                "summary": vuln_data.get("summary", "No summary available."),
+                "severity": severity,
+                "cvss_score": cvss_score,
+                "details": json.dumps(vuln_data),
+            }
+    return rows
+
+
+def existing_vulnerabilities(session, component_ids: list[int]) -> set[tuple[int, str]]:
+    found = set()
+    for batch in chunked(component_ids, 900):
+        found.update(
+            session.exec(
+                sqlmodel.select(
+                    ComponentVulnerability.component_id, ComponentVulnerability.osv_id
+                ).where(ComponentVulnerability.component_id.in_(batch))
+            ).all()
+        )
+    return found
+
+
+def persist_vulnerabilities(session, rows: dict[tuple[int, str], dict]) -> int:
+    """
+    Inserts the advisories not yet stored for their component: one IN lookup
+    per 900 components, then a single bulk insert. Does not commit. Returns
+    the number inserted.
+    """
+    known = existing_vulnerabilities(session, sorted({cid for cid, _ in rows}))
+    inserted = bulk_insert(
+        session,
+        ComponentVulnerability,
+        (row for key, row in rows.items() if key not in known),
+    )
+    logger.info(f"Stored {inserted} new advisories ({len(known)} already known)")
+    return inserted
@@ -72,7 +72,8 @@ app.add_page(
 app.add_page(
     security_page,
     route="/security",
-    on_load=sidebar_load_events + [SecurityState.load_security_data],
+    on_load=sidebar_load_events
+    + [SecurityState.load_security_data, SecurityState.follow_scan_updates],
 )
 app.add_page(
     quality_page,
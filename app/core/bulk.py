@@ -0,0 +1,177 @@
+import datetime
+import io
+import logging
+from enum import Enum
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable
+from pydantic_core import PydanticUndefined
+from sqlmodel import SQLModel
+
+logger = logging.getLogger(__name__)
+BATCH_SIZE = 5000
+
+
+@lru_cache(maxsize=None)
+def _insert_columns(model: type[SQLModel]) -> tuple[str, ...]:
+    serial = model.__table__.autoincrement_column
+    return tuple(c.name for c in model.__table__.columns if c is not serial)
+
+
+@lru_cache(maxsize=None)
+def _field_defaults(model: type[SQLModel]) -> tuple[tuple[str, Any, bool], ...]:
+    """(name, default, is_factory) for every column field with a default."""
+    # reflex imports sqlmodel under its pydantic v1 shim, so models may expose
+    # either pydantic v2 `model_fields` or v1 `__fields__`.
+    fields = getattr(model, "model_fields", None) or model.__fields__
+    defaults = []
+    for name, field in fields.items():
+        if field.default_factory is not None:
+            defaults.append((name, field.default_factory, True))
+        elif field.default is not PydanticUndefined:
+            defaults.append((name, field.default, False))
+    return tuple(defaults)
+
+
+def _complete(model: type[SQLModel], row: dict) -> dict:
+    for name, default, is_factory in _field_defaults(model):
+        if name not in row:
+            row[name] = default() if is_factory else default
+    return row
+
+
+def _batches(rows: Iterable[dict], size: int):
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _copy_value(value) -> str:
+    """Encodes a value for COPY ... FROM STDIN in PostgreSQL text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, (bytes, memoryview)):
+        # bytea hex input, with its backslash escaped for COPY.
+        return "\\\\x" + bytes(value).hex()
+    if isinstance(value, Enum):
+        value = value.name
+    elif isinstance(value, bool):
+        value = "t" if value else "f"
+    elif isinstance(value, (datetime.date, datetime.datetime)):
+        value = value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_batch(cursor, table: str, columns: tuple[str, ...], batch: list[dict]):
+    copy_sql = f'COPY "{table}" ({", ".join(columns)}) FROM STDIN'
+    lines = "".join(
+        "\t".join(_copy_value(row.get(c)) for c in columns) + "\n" for row in batch
+    )
+    if hasattr(cursor, "copy"):
+        # psycopg 3
+        with cursor.copy(copy_sql) as copy:
+            copy.write(lines)
+    else:
+        # psycopg2
+        cursor.copy_expert(copy_sql, io.StringIO(lines))
+
+
+def bulk_insert(
+    session,
+    model: type[SQLModel],
+    rows: Iterable[dict],
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Set-based INSERT of plain dict rows into `model`'s table, bypassing the ORM
+    unit of work. Uses COPY on PostgreSQL and executemany elsewhere. Model
+    defaults are filled in for missing keys. Runs inside the session's
+    transaction; the caller commits. Returns the number of rows written.
+    """
+    table = model.__table__
+    columns = _insert_columns(model)
+    connection = session.connection()
+    use_copy = connection.dialect.name == "postgresql"
+    count = 0
+    for batch in _batches((_complete(model, dict(r)) for r in rows), batch_size):
+        if use_copy:
+            cursor = connection.connection.driver_connection.cursor()
+            try:
+                _copy_batch(cursor, table.name, columns, batch)
+            finally:
+                cursor.close()
+        else:
+            connection.execute(
+                table.insert(), [{c: row.get(c) for c in columns} for row in batch]
+            )
+        count += len(batch)
+    return count
+
+
+def insert_ignore(
+    session,
+    model: type[SQLModel],
+    rows: Iterable[dict],
+    conflict: tuple[str, ...],
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Inserts dict rows into `model`'s table, silently skipping rows that
+    collide on the unique `conflict` columns, so concurrent writers of shared
+    rows don't fail each other. Does not commit. Returns the number of rows
+    submitted (not necessarily inserted).
+    """
+    statement = _dialect_insert(session)(model.__table__).on_conflict_do_nothing(
+        index_elements=list(conflict)
+    )
+    return _execute_batches(session, model, statement, rows, batch_size)
+
+
+def upsert(
+    session,
+    model: type[SQLModel],
+    rows: Iterable[dict],
+    conflict: tuple[str, ...],
+    update: tuple[str, ...],
+    index_where=None,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Inserts dict rows into `model`'s table; rows that collide on the unique
+    `conflict` columns (of a partial index when `index_where` is given)
+    overwrite the `update` columns instead. Does not commit. Returns the
+    number of rows submitted.
+    """
+    statement = _dialect_insert(session)(model.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(conflict),
+        index_where=index_where,
+        set_={column: statement.excluded[column] for column in update},
+    )
+    return _execute_batches(session, model, statement, rows, batch_size)
+
+
+def _dialect_insert(session):
+    dialect = session.connection().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Conflict handling does not support {dialect}")
+    return insert
+
+
+def _execute_batches(session, model, statement, rows, batch_size: int) -> int:
+    columns = _insert_columns(model)
+    count = 0
+    for batch in _batches((_complete(model, dict(r)) for r in rows), batch_size):
+        session.execute(statement, [{c: row.get(c) for c in columns} for row in batch])
+        count += len(batch)
+    return count
@@ -53,5 +53,34 @@ def initialize_db():
             add_column("subscription", "stripe_subscription_id", "VARCHAR")
             add_column("invoice", "stripe_payment_intent_id", "VARCHAR")
             add_column("invoice", "stripe_invoice_id", "VARCHAR")
+            add_column("scannedfile", "scan_cost", "FLOAT NOT NULL DEFAULT 0")
+            add_column(
+                "securityfinding",
+                "fingerprint",
+                "VARCHAR",
+                "CREATE INDEX IF NOT EXISTS ix_securityfinding_fingerprint ON securityfinding (fingerprint)",
+            )
+            add_column("sbomcomponent", "osv_checked_at", "TIMESTAMP")
+            add_column("sbomcomponent", "license_expression", "VARCHAR")
+            add_column("projectcomponent", "license_status", "VARCHAR")
+            add_column("projectpolicy", "license_allow", "VARCHAR NOT NULL DEFAULT ''")
+            add_column("projectpolicy", "license_deny", "VARCHAR NOT NULL DEFAULT ''")
+            add_column("projectcomponent", "reachable", "BOOLEAN")
+            add_column("projectcomponent", "reachability_depth", "INTEGER")
+            add_column("coverage", "executed_bitmap", "BYTEA")
+            add_column("coverage", "statement_bitmap", "BYTEA")
+            add_column("coverage", "coverage_delta", "FLOAT")
+            add_column("coverage", "lines_gained", "INTEGER NOT NULL DEFAULT 0")
+            add_column("coverage", "lines_lost", "INTEGER NOT NULL DEFAULT 0")
+            add_column(
+                "repository", "default_branch", "VARCHAR NOT NULL DEFAULT 'main'"
+            )
+            add_column("run", "branch", "VARCHAR")
+            add_column(
+                "run",
+                "baseline_run_id",
+                "INTEGER REFERENCES run (id) ON DELETE SET NULL",
+                "CREATE INDEX IF NOT EXISTS ix_run_baseline ON run (test_plan_id, status, id)",
+            )
     except Exception as e:
-        logger.exception(f"Database initialization error: {e}")
\ No newline at end of file
+        logger.exception(f"Database initialization error: {e}")
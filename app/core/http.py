@@ -0,0 +1,132 @@
+"""
+Shared outbound HTTP layer: one pooled, keep-alive httpx.AsyncClient living
+on a dedicated event loop thread, so synchronous pipeline steps (via `call`)
+and async handlers (via `acall`) share the same connections.
+"""
+
+import asyncio
+import atexit
+import logging
+import random
+import threading
+from typing import Any, Awaitable, Callable, Coroutine, Sequence, TypeVar
+import httpx
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 10.0
+_loop: asyncio.AbstractEventLoop | None = None
+_client: httpx.AsyncClient | None = None
+_lock = threading.Lock()
+
+
+def _http_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="http-client", daemon=True
+            ).start()
+        return _loop
+
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client; only use it from coroutines run through call/acall."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+def call(coro: Coroutine[Any, Any, T]) -> T:
+    """Runs `coro` on the HTTP loop from synchronous code and waits for it."""
+    return asyncio.run_coroutine_threadsafe(coro, _http_loop()).result()
+
+
+async def acall(coro: Coroutine[Any, Any, T]) -> T:
+    """Awaits `coro` on the HTTP loop from any other event loop."""
+    return await asyncio.wrap_future(
+        asyncio.run_coroutine_threadsafe(coro, _http_loop())
+    )
+
+
+def _retry_delay(attempt: int, response: httpx.Response | None) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+    # Full jitter: spreads retries from many workers instead of syncing them.
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt))
+
+
+async def request_json(
+    method: str, url: str, retries: int | None = None, **kwargs
+) -> Any:
+    """
+    Sends a request with the shared client and returns the decoded JSON body.
+    Transport errors and 408/425/429/5xx responses are retried with jittered
+    exponential backoff (honouring Retry-After); other statuses raise
+    httpx.HTTPStatusError immediately.
+    """
+    retries = settings.HTTP_RETRIES if retries is None else retries
+    client = get_client()
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            response = await client.request(method, url, **kwargs)
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                return response.json()
+            if attempt == retries:
+                response.raise_for_status()
+        except httpx.TransportError as e:
+            if attempt == retries:
+                raise
+            logger.warning(f"{method} {url} failed ({e!r}), retrying")
+        await asyncio.sleep(_retry_delay(attempt, response))
+
+
+async def gather_chunks(
+    items: Sequence,
+    chunk_size: int,
+    fetch: Callable[[list], Awaitable[list]],
+    max_concurrency: int,
+) -> list:
+    """
+    Splits `items` into chunks, runs `fetch` on them at most `max_concurrency`
+    at a time and concatenates the per-chunk results in input order.
+    """
+    gate = asyncio.Semaphore(max_concurrency)
+
+    async def run(chunk: list) -> list:
+        async with gate:
+            return await fetch(chunk)
+
+    chunks = [list(items[i : i + chunk_size]) for i in range(0, len(items), chunk_size)]
+    results = await asyncio.gather(*(run(chunk) for chunk in chunks))
+    return [item for chunk in results for item in chunk]
+
+
+async def _close():
+    if _client is not None:
+        await _client.aclose()
+
+
+@atexit.register
+def _shutdown():
+    if _loop is not None and _loop.is_running():
+        try:
+            asyncio.run_coroutine_threadsafe(_close(), _loop).result(timeout=5)
+        except Exception as e:
+            logger.debug(f"HTTP client shutdown skipped: {e}")
+        _loop.call_soon_threadsafe(_loop.stop)
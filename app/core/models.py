@@ -1,7 +1,8 @@
 import reflex as rx
 import datetime
 from typing import Optional
-from sqlmodel import Field, Relationship, SQLModel
+from sqlalchemy import Index, text
+from sqlmodel import Field, Relationship, SQLModel, UniqueConstraint
 from enum import Enum
 
 
@@ -54,6 +55,7 @@ class Repository(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     url: str
     project_id: int = Field(foreign_key="project.id")
+    default_branch: str = "main"
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
 
 
@@ -67,9 +69,15 @@ class TestPlan(SQLModel, table=True):
 
 
 class Run(SQLModel, table=True):
+    __table_args__ = (Index("ix_run_baseline", "test_plan_id", "status", "id"),)
     id: Optional[int] = Field(default=None, primary_key=True)
     test_plan_id: int = Field(foreign_key="testplan.id")
     status: str
+    # None for runs recorded before branches were tracked (default branch).
+    branch: Optional[str] = None
+    baseline_run_id: Optional[int] = Field(
+        default=None, foreign_key="run.id", ondelete="SET NULL"
+    )
     started_at: Optional[datetime.datetime] = None
     completed_at: Optional[datetime.datetime] = None
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
@@ -117,6 +125,10 @@ class ProjectPolicy(SQLModel, table=True):
     sla_high: int = Field(default=72)
     sla_medium: int = Field(default=168)
     sla_low: int = Field(default=720)
+    # Comma-separated SPDX license ids; an empty allow list allows anything
+    # that is not denied.
+    license_allow: str = Field(default="")
+    license_deny: str = Field(default="")
     project: "Project" = Relationship(back_populates="policy")
 
 
@@ -133,26 +145,61 @@ class SecurityFinding(SQLModel, table=True):
     cwe: Optional[str] = None
     status: str = Field(default="new")
     waiver_expiry: Optional[datetime.datetime] = None
+    fingerprint: Optional[str] = Field(default=None, index=True)
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
     project: "Project" = Relationship()
 
 
+class ScannedFile(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    project_id: int = Field(foreign_key="project.id", index=True)
+    scanner: str
+    file_path: str
+    sha256: str
+    scanner_version: str
+    config_hash: str
+    scan_cost: float = Field(default=0.0)
+    scanned_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+
+
+class ProjectComponent(SQLModel, table=True):
+    project_id: int = Field(foreign_key="project.id", primary_key=True)
+    component_id: int = Field(
+        foreign_key="sbomcomponent.id", primary_key=True, index=True
+    )
+    # Verdict of the project's license policy on the component's license.
+    license_status: Optional[str] = None
+    # Whether the project's code can reach the package through its imports,
+    # and how many dependency hops away (1 = imported directly).
+    reachable: Optional[bool] = None
+    reachability_depth: Optional[int] = None
+
+
 class SBOMComponent(SQLModel, table=True):
+    """Catalog entry shared by every project that depends on this purl."""
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    project_id: int = Field(foreign_key="project.id")
     name: str
     version: str
     purl: str = Field(unique=True)
+    # SPDX expression as declared in the SBOM, if any.
+    license_expression: Optional[str] = None
+    # None until this version has been checked against OSV.
+    osv_checked_at: Optional[datetime.datetime] = None
     vulnerabilities: list["ComponentVulnerability"] = Relationship(
         back_populates="component"
     )
-    project: "Project" = Relationship()
 
 
 class ComponentVulnerability(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint(
+            "component_id", "osv_id", name="uq_componentvulnerability_component_osv"
+        ),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     component_id: int = Field(foreign_key="sbomcomponent.id")
-    osv_id: str = Field(unique=True)
+    osv_id: str = Field(index=True)
     summary: str
     severity: str
     cvss_score: Optional[float] = None
@@ -160,13 +207,53 @@ class ComponentVulnerability(SQLModel, table=True):
     component: "SBOMComponent" = Relationship(back_populates="vulnerabilities")
 
 
+class DependencyGraph(SQLModel, table=True):
+    """Package dependency graph of one lockfile, shared by identical lockfiles."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    lockfile_sha: str = Field(unique=True)
+    # networkx node-link JSON.
+    graph: str
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+
+
+class FileImports(SQLModel, table=True):
+    """Top-level modules imported by a source file, keyed by its content hash."""
+
+    sha256: str = Field(primary_key=True)
+    # Space-separated module names.
+    modules: str = ""
+
+
+class ProcessRun(SQLModel, table=True):
+    """Resource usage of one scanner/adapter subprocess, for capacity planning."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    label: str = Field(index=True)
+    command: str
+    exit_code: Optional[int] = None
+    timed_out: bool = False
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_kb: int = 0
+    started_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+
+
 class Coverage(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    run_id: int = Field(foreign_key="run.id")
+    run_id: int = Field(foreign_key="run.id", index=True)
     file_path: str
     covered_lines: int
     total_lines: int
     coverage_percentage: float
+    # Encoded app.adapters.line_bitmap bitmaps of covered (executed
+    # statement) lines and of statement lines.
+    executed_bitmap: Optional[bytes] = None
+    statement_bitmap: Optional[bytes] = None
+    # Percentage points against the baseline run's file; None if it had none.
+    coverage_delta: Optional[float] = None
+    lines_gained: int = 0
+    lines_lost: int = 0
     run: "Run" = Relationship(back_populates="coverage_data")
 
 
@@ -183,6 +270,42 @@ class QualityScore(SQLModel, table=True):
     run: "Run" = Relationship(back_populates="quality_score")
 
 
+class QualityRollup(SQLModel, table=True):
+    """
+    Materialized quality trend per test plan: one row per scored run and
+    one daily row (run_id None) averaging that day's runs.
+    """
+
+    __table_args__ = (
+        Index("ix_qualityrollup_plan_day", "test_plan_id", "day"),
+        Index(
+            "uq_qualityrollup_plan_day_daily",
+            "test_plan_id",
+            "day",
+            unique=True,
+            sqlite_where=text("run_id IS NULL"),
+            postgresql_where=text("run_id IS NULL"),
+        ),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    test_plan_id: int = Field(foreign_key="testplan.id")
+    day: datetime.date
+    run_id: Optional[int] = Field(
+        default=None, foreign_key="run.id", unique=True, ondelete="CASCADE"
+    )
+    runs: int = 1
+    static_issues_score: float
+    test_pass_rate: float
+    coverage_delta: float
+    performance_score: float
+    accessibility_score: float
+    security_score: float
+    composite_score: float
+    composite_min: float
+    composite_max: float
+    updated_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+
+
 class Artifact(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     run_id: int = Field(foreign_key="run.id")
@@ -273,4 +396,4 @@ class Invoice(SQLModel, table=True):
     due_date: Optional[datetime.date] = None
     paid_at: Optional[datetime.datetime] = None
     download_url: Optional[str] = None
-    created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
\ No newline at end of file
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
@@ -0,0 +1,37 @@
+from typing import Any
+import numpy as np
+
+# Composite quality score weights by QualityScore sub-score (sum to 1).
+QUALITY_WEIGHTS = {
+    "static_issues_score": 0.2,
+    "test_pass_rate": 0.3,
+    "coverage_delta": 0.1,
+    "performance_score": 0.1,
+    "accessibility_score": 0.1,
+    "security_score": 0.2,
+}
+SUB_SCORES = tuple(QUALITY_WEIGHTS)
+_WEIGHTS = np.array([QUALITY_WEIGHTS[name] for name in SUB_SCORES])
+_DELTA = SUB_SCORES.index("coverage_delta")
+
+
+def coverage_delta_score(delta):
+    """Maps a coverage delta in percentage points onto 0-100 (0 -> 50)."""
+    return 50 + delta * 5
+
+
+def composite_score(score: Any) -> float:
+    """Composite of an object with the sub-score attributes, e.g. QualityScore."""
+    return float(
+        composite_scores(np.array([[getattr(score, n) for n in SUB_SCORES]]))[0]
+    )
+
+
+def composite_scores(sub_scores: np.ndarray) -> np.ndarray:
+    """
+    Composites of many runs at once, e.g. for backfills: one row per run,
+    columns in SUB_SCORES order.
+    """
+    normalized = np.array(sub_scores, dtype=np.float64)
+    normalized[:, _DELTA] = coverage_delta_score(normalized[:, _DELTA])
+    return normalized @ _WEIGHTS
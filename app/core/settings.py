@@ -22,7 +22,45 @@ class Settings:
         "STRIPE_SECRET_KEY"
     ) or os.environ.get("STRIPE_API_KEY")
     STRIPE_WEBHOOK_SECRET: str | None = os.environ.get("STRIPE_WEBHOOK_SECRET")
+    # Checkout the runs test: coverage reports are mapped onto it.
+    REPO_PATH: str = os.path.abspath(os.environ.get("REPO_PATH", "."))
+    OSV_MIRROR_PATH: str | None = os.environ.get("OSV_MIRROR_PATH")
+    OSV_CACHE_BACKEND: str = os.environ.get("OSV_CACHE_BACKEND", "redis")
+    OSV_CACHE_TTL: int = int(os.environ.get("OSV_CACHE_TTL", 6 * 3600))
+    OSV_CACHE_NEGATIVE_TTL: int = int(os.environ.get("OSV_CACHE_NEGATIVE_TTL", 3600))
+    # Checked components are looked up again once their check is this old.
+    OSV_RECHECK_INTERVAL: int = int(os.environ.get("OSV_RECHECK_INTERVAL", 6 * 3600))
+    OSV_API_URL: str = os.environ.get("OSV_API_URL", "https://api.osv.dev")
+    OSV_MAX_CONCURRENCY: int = int(os.environ.get("OSV_MAX_CONCURRENCY", 4))
+    PYPI_API_URL: str = os.environ.get("PYPI_API_URL", "https://pypi.org/pypi")
+    PYPI_MAX_CONCURRENCY: int = int(os.environ.get("PYPI_MAX_CONCURRENCY", 8))
+    # Off for offline deployments: release metadata then only comes from
+    # installed packages.
+    PYPI_METADATA_ENABLED: bool = os.environ.get(
+        "PYPI_METADATA_ENABLED", "true"
+    ).lower() in ("1", "true", "yes")
+    # Releases PyPI could not be reached for are not asked for again sooner.
+    PYPI_METADATA_NEGATIVE_TTL: int = int(
+        os.environ.get("PYPI_METADATA_NEGATIVE_TTL", 300)
+    )
+    # Reachability falls back to this environment's installed requirements
+    # for releases whose own metadata cannot be resolved.
+    REACHABILITY_HOST_FALLBACK: bool = os.environ.get(
+        "REACHABILITY_HOST_FALLBACK", "true"
+    ).lower() in ("1", "true", "yes")
+    HTTP_TIMEOUT: float = float(os.environ.get("HTTP_TIMEOUT", 30))
+    HTTP_MAX_CONNECTIONS: int = int(os.environ.get("HTTP_MAX_CONNECTIONS", 20))
+    HTTP_RETRIES: int = int(os.environ.get("HTTP_RETRIES", 4))
+    PROCESS_TIMEOUT: float = float(os.environ.get("PROCESS_TIMEOUT", 1800))
+    PROCESS_CPU_LIMIT: int = int(os.environ.get("PROCESS_CPU_LIMIT", 3600))
+    PROCESS_MEMORY_LIMIT_MB: int = int(os.environ.get("PROCESS_MEMORY_LIMIT_MB", 2048))
+    # 0 sizes the node-wide slot count from cores and available memory.
+    PROCESS_SLOTS: int = int(os.environ.get("PROCESS_SLOTS", 0))
+    # A burst of saves is grouped until it has been quiet for WATCH_STEP_MS,
+    # for at most WATCH_DEBOUNCE_MS.
+    WATCH_DEBOUNCE_MS: int = int(os.environ.get("WATCH_DEBOUNCE_MS", 400))
+    WATCH_STEP_MS: int = int(os.environ.get("WATCH_STEP_MS", 50))
     DOMAIN: str = os.environ.get("DOMAIN", "http://localhost:3000")
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,586 @@
+"""
+CWE taxonomy index: OWASP Top 10 (2021) category, CWE parent chain and
+CWE/SANS Top 25 rank per CWE id, built once at import and shared by every
+scanner. Entries are immutable; look them up with `lookup` or `map_many`.
+"""
+
+from types import MappingProxyType
+from typing import Iterable, Mapping, NamedTuple
+
+# Category -> (name, member CWEs). When a CWE is listed under several
+# categories the first one wins, matching the order of the OWASP list.
+OWASP_2021: dict[str, tuple[str, tuple[int, ...]]] = {
+    "A01:2021": (
+        "Broken Access Control",
+        (
+            22,
+            23,
+            35,
+            59,
+            200,
+            201,
+            219,
+            264,
+            275,
+            276,
+            284,
+            285,
+            352,
+            359,
+            377,
+            402,
+            425,
+            441,
+            497,
+            538,
+            540,
+            548,
+            552,
+            566,
+            601,
+            639,
+            651,
+            668,
+            706,
+            862,
+            863,
+            913,
+            922,
+            1275,
+        ),
+    ),
+    "A02:2021": (
+        "Cryptographic Failures",
+        (
+            259,
+            261,
+            296,
+            310,
+            311,
+            312,
+            313,
+            316,
+            319,
+            321,
+            322,
+            323,
+            324,
+            325,
+            326,
+            327,
+            328,
+            329,
+            330,
+            331,
+            335,
+            336,
+            337,
+            338,
+            340,
+            347,
+            523,
+            720,
+            757,
+            759,
+            760,
+            780,
+        ),
+    ),
+    "A03:2021": (
+        "Injection",
+        (
+            20,
+            74,
+            75,
+            77,
+            78,
+            79,
+            80,
+            83,
+            87,
+            88,
+            89,
+            90,
+            91,
+            93,
+            94,
+            95,
+            96,
+            97,
+            98,
+            99,
+            100,
+            113,
+            116,
+            138,
+            184,
+            470,
+            471,
+            564,
+            610,
+            643,
+            644,
+            652,
+            917,
+        ),
+    ),
+    "A04:2021": (
+        "Insecure Design",
+        (
+            73,
+            183,
+            209,
+            213,
+            235,
+            250,
+            256,
+            257,
+            266,
+            269,
+            280,
+            311,
+            312,
+            313,
+            316,
+            419,
+            430,
+            434,
+            444,
+            451,
+            472,
+            501,
+            522,
+            525,
+            539,
+            579,
+            598,
+            602,
+            642,
+            646,
+            650,
+            653,
+            656,
+            657,
+            799,
+            807,
+            840,
+            841,
+            927,
+            1021,
+            1173,
+        ),
+    ),
+    "A05:2021": (
+        "Security Misconfiguration",
+        (
+            2,
+            11,
+            13,
+            15,
+            16,
+            260,
+            315,
+            520,
+            526,
+            537,
+            541,
+            547,
+            611,
+            614,
+            756,
+            776,
+            942,
+            1004,
+            1032,
+            1174,
+        ),
+    ),
+    "A06:2021": (
+        "Vulnerable and Outdated Components",
+        (
+            937,
+            1035,
+            1104,
+        ),
+    ),
+    "A07:2021": (
+        "Identification and Authentication Failures",
+        (
+            255,
+            259,
+            287,
+            288,
+            290,
+            294,
+            295,
+            297,
+            300,
+            302,
+            303,
+            304,
+            306,
+            307,
+            346,
+            384,
+            521,
+            613,
+            620,
+            640,
+            798,
+            804,
+            836,
+            916,
+        ),
+    ),
+    "A08:2021": (
+        "Software and Data Integrity Failures",
+        (
+            345,
+            353,
+            426,
+            494,
+            502,
+            565,
+            784,
+            829,
+            830,
+            915,
+        ),
+    ),
+    "A09:2021": (
+        "Security Logging and Monitoring Failures",
+        (
+            117,
+            223,
+            532,
+            778,
+        ),
+    ),
+    "A10:2021": (
+        "Server-Side Request Forgery",
+        (918,),
+    ),
+}
+
+# ChildOf relationships in the CWE research view (CWE-1000), primary parent
+# only, for the CWEs referenced above and by bandit's checks. Pillars have no
+# parent.
+CWE_PARENTS: dict[int, int] = {
+    20: 707,
+    22: 706,
+    23: 22,
+    35: 23,
+    59: 706,
+    73: 642,
+    74: 707,
+    75: 74,
+    77: 74,
+    78: 77,
+    79: 74,
+    80: 79,
+    83: 79,
+    87: 83,
+    88: 77,
+    89: 943,
+    90: 943,
+    91: 74,
+    93: 74,
+    94: 74,
+    95: 94,
+    96: 94,
+    97: 96,
+    98: 706,
+    99: 74,
+    113: 93,
+    116: 707,
+    117: 116,
+    118: 664,
+    119: 118,
+    125: 119,
+    138: 707,
+    155: 138,
+    183: 697,
+    184: 1023,
+    190: 682,
+    200: 668,
+    201: 200,
+    209: 200,
+    211: 200,
+    213: 200,
+    219: 552,
+    221: 664,
+    223: 221,
+    228: 703,
+    233: 228,
+    235: 233,
+    250: 269,
+    256: 522,
+    257: 522,
+    259: 798,
+    260: 522,
+    261: 522,
+    266: 269,
+    269: 284,
+    276: 732,
+    280: 755,
+    285: 284,
+    287: 284,
+    288: 287,
+    290: 1390,
+    294: 1390,
+    295: 287,
+    296: 295,
+    297: 295,
+    300: 923,
+    302: 1390,
+    303: 1390,
+    304: 303,
+    306: 287,
+    307: 1390,
+    311: 693,
+    312: 922,
+    313: 312,
+    315: 312,
+    316: 312,
+    319: 311,
+    321: 798,
+    322: 306,
+    323: 344,
+    324: 672,
+    325: 573,
+    326: 693,
+    327: 693,
+    328: 326,
+    329: 1204,
+    330: 693,
+    331: 330,
+    335: 330,
+    336: 335,
+    337: 335,
+    338: 330,
+    340: 330,
+    344: 330,
+    345: 693,
+    346: 345,
+    347: 345,
+    352: 345,
+    353: 345,
+    358: 573,
+    359: 200,
+    377: 668,
+    384: 610,
+    400: 664,
+    402: 668,
+    416: 825,
+    419: 923,
+    425: 862,
+    426: 642,
+    430: 691,
+    434: 669,
+    436: 435,
+    441: 610,
+    444: 436,
+    451: 684,
+    470: 913,
+    471: 664,
+    472: 642,
+    476: 754,
+    494: 345,
+    497: 200,
+    501: 664,
+    502: 913,
+    520: 266,
+    521: 1391,
+    522: 1390,
+    523: 522,
+    524: 200,
+    525: 524,
+    526: 312,
+    532: 538,
+    537: 211,
+    538: 200,
+    539: 552,
+    540: 538,
+    541: 540,
+    547: 1078,
+    548: 497,
+    552: 668,
+    564: 89,
+    565: 642,
+    566: 639,
+    573: 710,
+    598: 201,
+    601: 610,
+    602: 693,
+    605: 675,
+    610: 664,
+    611: 610,
+    613: 672,
+    614: 319,
+    620: 1390,
+    639: 863,
+    640: 287,
+    642: 668,
+    643: 943,
+    644: 116,
+    646: 345,
+    650: 436,
+    651: 538,
+    652: 943,
+    653: 657,
+    656: 657,
+    657: 710,
+    666: 664,
+    668: 664,
+    669: 664,
+    672: 666,
+    674: 834,
+    675: 573,
+    684: 710,
+    706: 664,
+    732: 285,
+    754: 703,
+    755: 703,
+    756: 755,
+    757: 693,
+    759: 916,
+    760: 916,
+    776: 674,
+    778: 223,
+    780: 327,
+    784: 565,
+    787: 119,
+    798: 1391,
+    799: 691,
+    804: 1390,
+    807: 693,
+    825: 119,
+    829: 669,
+    830: 829,
+    834: 691,
+    836: 1390,
+    838: 116,
+    841: 691,
+    862: 285,
+    863: 285,
+    913: 664,
+    915: 913,
+    916: 328,
+    917: 77,
+    918: 441,
+    922: 664,
+    923: 284,
+    927: 285,
+    942: 863,
+    943: 74,
+    1004: 732,
+    1021: 441,
+    1023: 697,
+    1078: 710,
+    1104: 1357,
+    1173: 20,
+    1174: 1173,
+    1204: 330,
+    1275: 923,
+    1357: 710,
+    1390: 287,
+    1391: 1390,
+}
+
+# CWE Top 25 Most Dangerous Software Weaknesses (2024), in rank order.
+SANS_TOP_25: tuple[int, ...] = (
+    79,
+    787,
+    89,
+    352,
+    22,
+    125,
+    78,
+    416,
+    862,
+    434,
+    94,
+    20,
+    77,
+    287,
+    269,
+    502,
+    200,
+    863,
+    918,
+    119,
+    476,
+    798,
+    190,
+    400,
+    306,
+)
+
+
+class CweEntry(NamedTuple):
+    cwe_id: int
+    owasp: str | None
+    owasp_name: str | None
+    parents: tuple[int, ...]
+    sans_rank: int | None
+
+    @property
+    def label(self) -> str:
+        return f"CWE-{self.cwe_id}"
+
+
+def _parent_chain(cwe_id: int) -> tuple[int, ...]:
+    chain = []
+    while cwe_id in CWE_PARENTS:
+        cwe_id = CWE_PARENTS[cwe_id]
+        chain.append(cwe_id)
+    return tuple(chain)
+
+
+def _build_index() -> Mapping[int, CweEntry]:
+    owasp: dict[int, str] = {}
+    for category, (_, members) in OWASP_2021.items():
+        for cwe_id in members:
+            owasp.setdefault(cwe_id, category)
+    ranks = {cwe_id: rank for rank, cwe_id in enumerate(SANS_TOP_25, 1)}
+    index = {}
+    for cwe_id in (
+        set(owasp) | set(CWE_PARENTS) | set(CWE_PARENTS.values()) | set(ranks)
+    ):
+        category = owasp.get(cwe_id)
+        index[cwe_id] = CweEntry(
+            cwe_id,
+            category,
+            OWASP_2021[category][0] if category else None,
+            _parent_chain(cwe_id),
+            ranks.get(cwe_id),
+        )
+    return MappingProxyType(index)
+
+
+CWE_INDEX: Mapping[int, CweEntry] = _build_index()
+
+
+def parse_cwe(value) -> int | None:
+    """Accepts 79, "79" or "CWE-79"; anything else (including bandit's 0) is None."""
+    if isinstance(value, int):
+        return value or None
+    if not value:
+        return None
+    value = str(value).strip().upper().removeprefix("CWE-")
+    return (int(value) or None) if value.isdigit() else None
+
+
+def lookup(cwe) -> CweEntry | None:
+    return CWE_INDEX.get(cwe if isinstance(cwe, int) else parse_cwe(cwe))
+
+
+def owasp_category(cwe) -> str | None:
+    entry = lookup(cwe)
+    return entry.owasp if entry else None
+
+
+def map_many(cwes: Iterable) -> list[CweEntry | None]:
+    """Bulk `lookup`, aligned with the input."""
+    get = CWE_INDEX.get
+    return [get(cwe) if isinstance(cwe, int) else get(parse_cwe(cwe)) for cwe in cwes]
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import threading
+import time
+from graphlib import TopologicalSorter
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+_limits: dict[str, threading.BoundedSemaphore] = {}
+_limits_lock = threading.Lock()
+
+
+def _node_limit(name: str, limit: int) -> threading.BoundedSemaphore:
+    with _limits_lock:
+        if name not in _limits:
+            _limits[name] = threading.BoundedSemaphore(limit)
+        return _limits[name]
+
+
+class Step:
+    """
+    A blocking pipeline step. `deps` name the steps that must succeed first;
+    `limit` caps how many instances of this step run at once in the process,
+    across all concurrently executing pipelines.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        *args,
+        deps: tuple[str, ...] = (),
+        limit: int | None = None,
+    ):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.deps = deps
+        self.limit = limit
+
+    def call(self) -> Any:
+        if not self.limit:
+            return self.func(*self.args)
+        with _node_limit(self.name, self.limit):
+            return self.func(*self.args)
+
+
+class StepResult:
+    def __init__(
+        self,
+        name: str,
+        status: str,
+        value: Any = None,
+        seconds: float = 0.0,
+        error: str | None = None,
+    ):
+        self.name = name
+        self.status = status
+        self.value = value
+        self.seconds = seconds
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"StepResult({self.name!r}, {self.status!r}, {self.seconds:.2f}s)"
+
+
+async def _run_step(
+    step: Step, gate: asyncio.Semaphore, on_event: Callable | None
+) -> StepResult:
+    async with gate:
+        if on_event:
+            on_event(StepResult(step.name, "running"))
+        started = time.perf_counter()
+        try:
+            value = await asyncio.to_thread(step.call)
+        except Exception as e:
+            logger.exception(f"Pipeline step {step.name} failed: {e}")
+            return StepResult(
+                step.name, "failed", seconds=time.perf_counter() - started, error=str(e)
+            )
+        return StepResult(step.name, "done", value, time.perf_counter() - started)
+
+
+async def run_dag(
+    steps: list[Step],
+    max_parallel: int | None = None,
+    on_event: Callable[[StepResult], None] | None = None,
+) -> dict[str, StepResult]:
+    """
+    Runs each step in a worker thread as soon as all of its dependencies have
+    succeeded, so wall-clock time follows the critical path. Dependents of a
+    failed step are skipped; independent branches keep going. `on_event` is
+    called on the event loop when a step starts and when it settles.
+    """
+    by_name = {step.name: step for step in steps}
+    sorter = TopologicalSorter({step.name: step.deps for step in steps})
+    sorter.prepare()
+    gate = asyncio.Semaphore(max_parallel or len(steps) or 1)
+    results: dict[str, StepResult] = {}
+    running: dict[asyncio.Task, str] = {}
+    while sorter.is_active():
+        for name in sorter.get_ready():
+            step = by_name[name]
+            if any(results[d].status != "done" for d in step.deps):
+                results[name] = StepResult(name, "skipped")
+                if on_event:
+                    on_event(results[name])
+                sorter.done(name)
+                continue
+            running[asyncio.create_task(_run_step(step, gate, on_event))] = name
+        if not running:
+            continue
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            name = running.pop(task)
+            results[name] = task.result()
+            if on_event:
+                on_event(results[name])
+            sorter.done(name)
+    return results
@@ -0,0 +1,269 @@
+"""
+Every scanner and adapter subprocess goes through `run_process`: a node-wide
+slot limit shared by all worker processes on the host, a wall-clock timeout,
+RLIMIT_AS/RLIMIT_CPU caps, and a ProcessRun record of what it cost.
+"""
+
+import contextlib
+import datetime
+import fcntl
+import logging
+import os
+import resource
+import shlex
+import signal
+import subprocess
+import tempfile
+import time
+import psutil
+import reflex as rx
+from app.core.models import ProcessRun
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+SLOT_DIR = os.path.join(tempfile.gettempdir(), "colabe-process-slots")
+SLOT_POLL_SECONDS = 0.2
+# Hard CPU limit sits a little above the soft one so SIGXCPU lands first.
+CPU_HARD_GRACE = 5
+_slot_count: int | None = None
+
+
+def node_slots() -> int:
+    """How many governed processes this node runs at once: cores, capped by RAM."""
+    if settings.PROCESS_SLOTS:
+        return settings.PROCESS_SLOTS
+    per_process = settings.PROCESS_MEMORY_LIMIT_MB * 2**20
+    by_memory = psutil.virtual_memory().available // per_process
+    return max(1, min(os.cpu_count() or 1, by_memory))
+
+
+def _try_slot(i: int) -> int | None:
+    """Open, flock'ed descriptor of slot `i`, or None if it is taken."""
+    fd = os.open(os.path.join(SLOT_DIR, f"slot-{i}.lock"), os.O_RDWR | os.O_CREAT)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+@contextlib.contextmanager
+def node_slots_held(wanted: int):
+    """
+    Holds between one and `wanted` of `node_slots()` flock'ed slot files
+    until exit: waits for the first, then takes whichever others are free
+    right now. Yields how many are held, so in-process pools can size
+    themselves to the node's budget. Locks are per open file, so the limit
+    holds across threads and worker processes alike, and the kernel frees a
+    slot if its holder dies.
+    """
+    global _slot_count
+    if _slot_count is None:
+        _slot_count = node_slots()
+    os.makedirs(SLOT_DIR, exist_ok=True)
+    held: list[int] = []
+    try:
+        while not held:
+            for i in range(_slot_count):
+                if len(held) == wanted:
+                    break
+                fd = _try_slot(i)
+                if fd is not None:
+                    held.append(fd)
+            if not held:
+                time.sleep(SLOT_POLL_SECONDS)
+        yield len(held)
+    finally:
+        for fd in held:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+@contextlib.contextmanager
+def node_slot():
+    """Holds one node slot until exit, waiting for it if all are taken."""
+    with node_slots_held(1):
+        yield
+
+
+def limit_current_process(memory_mb: int | None = None, cpu_seconds: int | None = None):
+    """
+    Applies the configured (or given) RLIMIT_AS/RLIMIT_CPU caps to this
+    process, e.g. from a pool worker's initializer.
+    """
+    _apply_limits(
+        os.getpid(),
+        settings.PROCESS_MEMORY_LIMIT_MB if memory_mb is None else memory_mb,
+        settings.PROCESS_CPU_LIMIT if cpu_seconds is None else cpu_seconds,
+    )
+
+
+class ProcessResult:
+    def __init__(
+        self,
+        label: str,
+        args: list[str],
+        returncode: int,
+        timed_out: bool,
+        wall_seconds: float,
+        cpu_seconds: float,
+        peak_rss_kb: int,
+        stdout: str = "",
+        stderr: str = "",
+    ):
+        self.label = label
+        self.args = args
+        self.returncode = returncode
+        self.timed_out = timed_out
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+        self.peak_rss_kb = peak_rss_kb
+        self.stdout = stdout
+        self.stderr = stderr
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+    @property
+    def killed(self) -> bool:
+        """
+        Ended by a signal: the timeout, RLIMIT_CPU or the kernel OOM killer.
+        Running out of RLIMIT_AS is not a signal: allocations fail inside the
+        process, which usually exits with an ordinary status (Python's
+        MemoryError exits with 1). So this is no proof of success; check
+        `ok` or the tool's own set of successful return codes.
+        """
+        return self.timed_out or self.returncode < 0
+
+    def __repr__(self) -> str:
+        return (
+            f"ProcessResult({self.label!r}, rc={self.returncode}, "
+            f"{self.wall_seconds:.1f}s wall, {self.cpu_seconds:.1f}s cpu, "
+            f"{self.peak_rss_kb // 1024}MB rss)"
+        )
+
+
+def _apply_limits(pid: int, memory_mb: int, cpu_seconds: int):
+    # prlimit on the running child instead of preexec_fn, which is unsafe
+    # from the threads the scan steps run in.
+    if not hasattr(resource, "prlimit"):
+        logger.warning(f"Cannot limit process {pid}: prlimit is unavailable here")
+        return
+    try:
+        if memory_mb:
+            limit = memory_mb * 2**20
+            resource.prlimit(pid, resource.RLIMIT_AS, (limit, limit))
+        if cpu_seconds:
+            resource.prlimit(
+                pid, resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + CPU_HARD_GRACE)
+            )
+    except ProcessLookupError:
+        # Already exited: there is nothing left to limit.
+        pass
+    except (PermissionError, ValueError) as e:
+        logger.warning(f"Could not limit process {pid}: {e}")
+
+
+def _wait(proc: subprocess.Popen, timeout: float):
+    """Reaps `proc` with wait4 so its rusage is kept; kills the group on timeout."""
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            return status, usage, False
+        if time.monotonic() >= deadline:
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(proc.pid, signal.SIGKILL)
+            _, status, usage = os.wait4(proc.pid, 0)
+            return status, usage, True
+        time.sleep(delay)
+        delay = min(delay * 2, 0.1)
+
+
+def _read(stream) -> str:
+    if not hasattr(stream, "seek"):
+        return ""
+    stream.seek(0)
+    return stream.read().decode(errors="replace")
+
+
+def record_process_run(result: ProcessResult, started_at: datetime.datetime):
+    logger.info(f"{result!r}")
+    try:
+        with rx.session() as session:
+            session.add(
+                ProcessRun(
+                    label=result.label,
+                    command=shlex.join(result.args)[:2000],
+                    exit_code=result.returncode,
+                    timed_out=result.timed_out,
+                    wall_seconds=result.wall_seconds,
+                    cpu_seconds=result.cpu_seconds,
+                    peak_rss_kb=result.peak_rss_kb,
+                    started_at=started_at,
+                )
+            )
+            session.commit()
+    except Exception as e:
+        logger.warning(f"Could not record process run for {result.label}: {e}")
+
+
+def run_process(
+    args: list[str],
+    label: str | None = None,
+    timeout: float | None = None,
+    memory_mb: int | None = None,
+    cpu_seconds: int | None = None,
+    cwd: str | None = None,
+    capture_output: bool = False,
+    record: bool = True,
+) -> ProcessResult:
+    """
+    Runs `args` once a node slot is free, under the configured (or given)
+    wall-clock timeout, address-space and CPU-time limits. Output is spooled
+    to temporary files rather than pipes when captured, and discarded
+    otherwise. Never raises for a non-zero exit; check `ok`, or the
+    return codes the tool documents as success.
+    """
+    label = label or os.path.basename(args[0])
+    timeout = timeout or settings.PROCESS_TIMEOUT
+    memory_mb = settings.PROCESS_MEMORY_LIMIT_MB if memory_mb is None else memory_mb
+    cpu_seconds = settings.PROCESS_CPU_LIMIT if cpu_seconds is None else cpu_seconds
+    with contextlib.ExitStack() as stack:
+        out = err = subprocess.DEVNULL
+        if capture_output:
+            out = stack.enter_context(tempfile.TemporaryFile())
+            err = stack.enter_context(tempfile.TemporaryFile())
+        stack.enter_context(node_slot())
+        started_at = datetime.datetime.now()
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            args,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=out,
+            stderr=err,
+            start_new_session=True,
+        )
+        _apply_limits(proc.pid, memory_mb, cpu_seconds)
+        status, usage, timed_out = _wait(proc, timeout)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        result = ProcessResult(
+            label,
+            list(args),
+            proc.returncode,
+            timed_out,
+            time.perf_counter() - started,
+            usage.ru_utime + usage.ru_stime,
+            usage.ru_maxrss,
+            _read(out),
+            _read(err),
+        )
+    if timed_out:
+        logger.warning(f"{label} timed out after {timeout:g}s and was killed")
+    if record:
+        record_process_run(result, started_at)
+    return result
@@ -0,0 +1,71 @@
+import json
+import logging
+import time
+from app.orchestrator.pipeline import StepResult
+
+logger = logging.getLogger(__name__)
+PROGRESS_TTL = 24 * 3600
+# Pseudo-stage marking the whole job; its settled status ends a subscription.
+SCAN_STAGE = "scan"
+FINAL_STATUSES = ("finished", "failed")
+
+
+def progress_channel(project_id: int) -> str:
+    return f"scan-progress:{project_id}"
+
+
+def progress_key(project_id: int) -> str:
+    return f"scan-progress:{project_id}:latest"
+
+
+def progress_event(job_id: str | None, result: StepResult) -> dict:
+    return {
+        "job_id": job_id,
+        "stage": result.name,
+        "status": result.status,
+        "seconds": round(result.seconds, 2),
+        "error": result.error,
+        "at": time.time(),
+    }
+
+
+def publish_progress(connection, project_id: int, event: dict):
+    """
+    Publishes `event` on the project's channel and keeps the latest status of
+    each stage in a hash, so a page opened mid-scan can catch up. Progress is
+    best effort: a Redis hiccup must not fail the scan itself.
+    """
+    if connection is None:
+        return
+    payload = json.dumps(event)
+    try:
+        pipe = connection.pipeline()
+        pipe.hset(progress_key(project_id), event["stage"], payload)
+        pipe.expire(progress_key(project_id), PROGRESS_TTL)
+        pipe.publish(progress_channel(project_id), payload)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not publish scan progress: {e}")
+
+
+def reset_progress(connection, project_id: int):
+    if connection is None:
+        return
+    try:
+        connection.delete(progress_key(project_id))
+    except Exception as e:
+        logger.warning(f"Could not reset scan progress: {e}")
+
+
+def latest_progress(connection, project_id: int) -> dict[str, dict]:
+    if connection is None:
+        return {}
+    try:
+        stored = connection.hgetall(progress_key(project_id))
+    except Exception as e:
+        logger.warning(f"Could not read scan progress: {e}")
+        return {}
+    return {
+        (k.decode() if isinstance(k, bytes) else k): json.loads(v)
+        for k, v in stored.items()
+    }
@@ -0,0 +1,122 @@
+import logging
+import os
+from typing import Callable
+from app.adapters.scanners import (
+    analyze_reachability,
+    check_licenses,
+    check_osv,
+    run_bandit_scan,
+    run_cyclonedx_scan,
+    run_secrets_scan,
+)
+from app.adapters.secrets_scanner import is_candidate
+from app.orchestrator.pipeline import Step, StepResult, run_dag
+
+logger = logging.getLogger(__name__)
+# bandit already shards across every core, so one instance per node is enough;
+# the same goes for the secrets scan and its process pool.
+STEP_LIMITS = {
+    "bandit": 1,
+    "secrets": 1,
+    "cyclonedx": 2,
+    "osv": 4,
+    "licenses": 4,
+    "reachability": 2,
+}
+
+
+LOCKFILE = "requirements.txt"
+SBOM_STEPS = ("cyclonedx", "osv", "licenses", "reachability")
+
+
+def affected_steps(repo_path: str, paths: list[str]) -> set[str]:
+    """The steps whose input includes any of the changed `paths`."""
+    names = set()
+    for path in paths:
+        if path == os.path.join(repo_path, LOCKFILE):
+            names.update(SBOM_STEPS)
+        if path.endswith(".py"):
+            # An edit can add or drop imports.
+            names.update(("bandit", "reachability"))
+        if is_candidate(repo_path, path):
+            names.add("secrets")
+    return names
+
+
+def security_scan_steps(
+    repo_path: str, project_id: int, paths: list[str] | None = None
+) -> list[Step]:
+    """
+    All scan steps, or with `paths` only the ones those changes affect, with
+    file scanners limited to the changed files.
+    """
+    steps = [
+        Step(
+            "bandit",
+            run_bandit_scan,
+            repo_path,
+            project_id,
+            paths,
+            limit=STEP_LIMITS["bandit"],
+        ),
+        Step(
+            "secrets",
+            run_secrets_scan,
+            repo_path,
+            project_id,
+            paths,
+            limit=STEP_LIMITS["secrets"],
+        ),
+        Step(
+            "cyclonedx",
+            run_cyclonedx_scan,
+            repo_path,
+            project_id,
+            limit=STEP_LIMITS["cyclonedx"],
+        ),
+        Step(
+            "osv",
+            check_osv,
+            project_id,
+            deps=("cyclonedx",),
+            limit=STEP_LIMITS["osv"],
+        ),
+        Step(
+            "licenses",
+            check_licenses,
+            project_id,
+            deps=("cyclonedx",),
+            limit=STEP_LIMITS["licenses"],
+        ),
+        Step(
+            "reachability",
+            analyze_reachability,
+            repo_path,
+            project_id,
+            paths,
+            deps=("cyclonedx",),
+            limit=STEP_LIMITS["reachability"],
+        ),
+    ]
+    if paths is None:
+        return steps
+    names = affected_steps(repo_path, paths)
+    for step in steps:
+        step.deps = tuple(dep for dep in step.deps if dep in names)
+    return [step for step in steps if step.name in names]
+
+
+async def run_security_scan(
+    repo_path: str,
+    project_id: int,
+    on_event: Callable[[StepResult], None] | None = None,
+    paths: list[str] | None = None,
+) -> dict[str, StepResult]:
+    results = await run_dag(
+        security_scan_steps(repo_path, project_id, paths), on_event=on_event
+    )
+    logger.info(
+        f"Security scan for project {project_id}: "
+        + ", ".join(f"{r.name}={r.status} ({r.seconds:.1f}s)" for r in results.values())
+    )
+    return results
@@ -0,0 +1,129 @@
+import asyncio
+import contextlib
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+def acquire_lock(connection, key: str, token: str, ttl: int) -> str | None:
+    """
+    Takes `key` for `token` unless someone else holds it. Returns None when
+    acquired, otherwise the current holder's token. The TTL bounds how long a
+    crashed holder can block others.
+    """
+    for _ in range(2):
+        if connection.set(key, token, nx=True, ex=ttl):
+            return None
+        holder = connection.get(key)
+        # None means it expired between SET and GET, so try once more.
+        if holder is not None:
+            return holder.decode() if isinstance(holder, bytes) else holder
+    return ""
+
+
+def release_lock(connection, key: str, token: str) -> bool:
+    """Deletes `key` only while it is still held by `token`."""
+    with connection.pipeline() as pipe:
+        try:
+            pipe.watch(key)
+            holder = pipe.get(key)
+            if (
+                holder is None
+                or (holder.decode() if isinstance(holder, bytes) else holder) != token
+            ):
+                pipe.unwatch()
+                return False
+            pipe.multi()
+            pipe.delete(key)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Could not release lock {key}: {e}")
+            return False
+
+
+def extend_lock(connection, key: str, token: str, ttl: int) -> bool:
+    """Resets `key`'s TTL only while it is still held by `token`."""
+    with connection.pipeline() as pipe:
+        try:
+            pipe.watch(key)
+            holder = pipe.get(key)
+            if (
+                holder is None
+                or (holder.decode() if isinstance(holder, bytes) else holder) != token
+            ):
+                pipe.unwatch()
+                return False
+            pipe.multi()
+            pipe.expire(key, ttl)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Could not extend lock {key}: {e}")
+            return False
+
+
+@contextlib.contextmanager
+def lock_heartbeat(connection, key: str, token: str, ttl: int):
+    """
+    Keeps extending `key` for `token` every third of `ttl` until exit, so a
+    lock can carry a short TTL: a holder that dies without releasing it
+    (SIGKILL, OOM) blocks others for at most `ttl` seconds.
+    """
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(ttl / 3):
+            if not extend_lock(connection, key, token, ttl):
+                logger.warning(f"Lost lock {key} held by {token}")
+                return
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{key}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+class _Flight:
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+        self.events: list = []
+        self.listeners: list[asyncio.Queue] = []
+
+    def emit(self, event: Any):
+        self.events.append(event)
+        for queue in self.listeners:
+            queue.put_nowait(event)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one in-flight task in
+    this process. Every caller gets the shared task plus a queue replaying the
+    events emitted so far and receiving the rest.
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+
+    def join(
+        self, key: Hashable, start: Callable[[Callable[[Any], None]], Awaitable]
+    ) -> tuple[asyncio.Task, asyncio.Queue]:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(start(flight.emit))
+            flight.task.add_done_callback(lambda _: self._flights.pop(key, None))
+        else:
+            logger.info(f"Attaching to in-flight run for {key!r}")
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in flight.events:
+            queue.put_nowait(event)
+        flight.listeners.append(queue)
+        return flight.task, queue
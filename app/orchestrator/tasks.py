@@ -1,10 +1,42 @@
+import asyncio
+import time
+import uuid
 import reflex as rx
 from app.core.settings import settings
 import redis
-from rq import Queue
+from rq import Queue, Worker, get_current_job
+from rq.exceptions import NoSuchJobError
+from rq.job import Job, JobStatus
 import logging
+from app.orchestrator.pipeline import StepResult
+from app.orchestrator.progress import (
+    SCAN_STAGE,
+    progress_event,
+    publish_progress,
+    reset_progress,
+)
+from app.orchestrator.security_scan import run_security_scan
+from app.orchestrator.single_flight import acquire_lock, release_lock
 
 logger = logging.getLogger(__name__)
+# Scans hold CPU for minutes, so they get their own queue and workers:
+#   rq worker scans --url $REDIS_URL
+SCAN_QUEUE = "scans"
+SCAN_JOB_TIMEOUT = 3600
+# Outlives the job timeout so only a crashed worker ever leaves it behind.
+SCAN_LOCK_TTL = SCAN_JOB_TIMEOUT + 300
+# Lock tokens of scans run outside RQ (watch mode). Their holders keep a
+# short TTL alive while scanning, so a killed watcher frees the lock soon.
+LOCAL_SCAN_PREFIX = "local-"
+LOCAL_SCAN_LOCK_TTL = 60
+# How long a queued scan may wait with no worker on the scan queue.
+NO_WORKER_GRACE = 30
+# How long a created job may wait to be enqueued before its lock is stale.
+ENQUEUE_GRACE = 60
+
+
+def scan_lock_key(project_id: int) -> str:
+    return f"scan-lock:{project_id}"
 
 
 def health_check_task():
@@ -14,10 +46,12 @@ def health_check_task():
 try:
     redis_conn = redis.from_url(settings.REDIS_URL)
     task_queue = Queue("default", connection=redis_conn)
+    scan_queue = Queue(SCAN_QUEUE, connection=redis_conn)
 except Exception as e:
     logger.exception(f"Redis/Queue initialization failed: {e}")
     redis_conn = None
     task_queue = None
+    scan_queue = None
 
 
 def enqueue_health_check():
@@ -32,4 +66,147 @@ def enqueue_health_check():
         return None
     except Exception as e:
         logger.exception(f"Failed to enqueue health check: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def security_scan_task(repo_path: str, project_id: int) -> dict[str, str]:
+    """RQ job: runs the security scan DAG and streams each stage's status."""
+    job = get_current_job()
+    job_id = job.id if job else None
+
+    def report(result: StepResult):
+        publish_progress(redis_conn, project_id, progress_event(job_id, result))
+
+    report(StepResult(SCAN_STAGE, "running"))
+    try:
+        results = asyncio.run(run_security_scan(repo_path, project_id, report))
+        failed = any(r.status != "done" for r in results.values())
+        report(
+            StepResult(
+                SCAN_STAGE,
+                "failed" if failed else "finished",
+                seconds=sum(r.seconds for r in results.values()),
+            )
+        )
+    except Exception as e:
+        report(StepResult(SCAN_STAGE, "failed", error=str(e)))
+        raise
+    finally:
+        if job_id:
+            release_lock(redis_conn, scan_lock_key(project_id), job_id)
+    return {name: r.status for name, r in results.items()}
+
+
+def _holder_is_live(job_id: str) -> bool:
+    if not job_id or job_id.startswith(LOCAL_SCAN_PREFIX):
+        return True
+    try:
+        job = Job.fetch(job_id, connection=redis_conn)
+        status = job.get_status()
+    except NoSuchJobError:
+        return False
+    if status == JobStatus.CREATED:
+        # Saved but not enqueued yet; stale only if its enqueuer died.
+        return time.time() - job.created_at.timestamp() < ENQUEUE_GRACE
+    return status not in (
+        JobStatus.FINISHED,
+        JobStatus.FAILED,
+        JobStatus.STOPPED,
+        JobStatus.CANCELED,
+    )
+
+
+def settled_scan_status(project_id: int, job_id: str) -> str | None:
+    """
+    Final status of a scan whose final progress event may never come: its
+    job failed, was stopped or vanished (e.g. a killed work horse), or it
+    sat queued with no worker on the scan queue, in which case it is
+    cancelled. Failures are published like any other outcome. None while
+    the scan is still in flight.
+    """
+    if job_id.startswith(LOCAL_SCAN_PREFIX):
+        if redis_conn.get(scan_lock_key(project_id)) is not None:
+            return None
+        error = "Scan ended without reporting"
+    else:
+        try:
+            job = Job.fetch(job_id, connection=redis_conn)
+            status = job.get_status()
+        except NoSuchJobError:
+            job, status = None, None
+        if status == JobStatus.FINISHED:
+            return "finished"
+        if status in (None, JobStatus.FAILED, JobStatus.STOPPED, JobStatus.CANCELED):
+            error = f"Scan job {status.value if status else 'vanished'}"
+        elif status == JobStatus.CREATED and not _holder_is_live(job_id):
+            error = "Scan job was never enqueued"
+        elif (
+            status == JobStatus.QUEUED
+            and job.enqueued_at is not None
+            and time.time() - job.enqueued_at.timestamp() > NO_WORKER_GRACE
+            and not Worker.count(queue=scan_queue)
+        ):
+            job.cancel()
+            release_lock(redis_conn, scan_lock_key(project_id), job_id)
+            error = f"No worker is serving the {SCAN_QUEUE!r} queue"
+        else:
+            return None
+    logger.warning(f"Scan {job_id} for project {project_id} failed: {error}")
+    publish_progress(
+        redis_conn,
+        project_id,
+        progress_event(job_id, StepResult(SCAN_STAGE, "failed", error=error)),
+    )
+    return "failed"
+
+
+def _acquire_scan_lock(project_id: int, job_id: str) -> str | None:
+    key = scan_lock_key(project_id)
+    holder = acquire_lock(redis_conn, key, job_id, SCAN_LOCK_TTL)
+    if holder is not None and not _holder_is_live(holder):
+        # The holder died without releasing (e.g. a killed work horse).
+        logger.warning(f"Clearing stale scan lock for project {project_id}")
+        release_lock(redis_conn, key, holder)
+        holder = acquire_lock(redis_conn, key, job_id, SCAN_LOCK_TTL)
+    return holder
+
+
+def enqueue_security_scan(repo_path: str, project_id: int):
+    """
+    Enqueues a scan unless one is already in flight for the project, in which
+    case the caller is attached to it and gets its job id back. Either way the
+    outcome arrives on the project's progress channel.
+    """
+    if not scan_queue:
+        logger.warning("Scan queue is not available.")
+        return None
+    try:
+        # The job exists before it holds the lock, so a concurrent request
+        # never finds a lock whose job it cannot fetch.
+        job = scan_queue.create_job(
+            security_scan_task,
+            args=(repo_path, project_id),
+            job_id=uuid.uuid4().hex,
+            timeout=SCAN_JOB_TIMEOUT,
+            status=JobStatus.CREATED,
+        )
+        job.save()
+        holder = _acquire_scan_lock(project_id, job.id)
+        if holder is not None:
+            job.delete()
+            logger.info(f"Scan for project {project_id} already running: {holder}")
+            return holder
+        reset_progress(redis_conn, project_id)
+        scan_queue.enqueue_job(job)
+        publish_progress(
+            redis_conn,
+            project_id,
+            progress_event(job.id, StepResult(SCAN_STAGE, "queued")),
+        )
+        return job.id
+    except (redis.exceptions.ConnectionError, redis.exceptions.RedisError) as e:
+        logger.exception(f"Redis connection failed: {e}")
+        return None
+    except Exception as e:
+        logger.exception(f"Failed to enqueue security scan: {e}")
+        return None
@@ -0,0 +1,121 @@
+"""
+Watch mode: rescans a working copy as files change. Each debounced burst of
+changes reruns only the affected scan steps, limited to the changed files,
+and publishes progress on the project's channel so open security pages
+refresh their findings.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+import uuid
+import watchfiles
+from app.adapters.file_index import EXCLUDED_DIRS
+from app.core.settings import settings
+from app.orchestrator.pipeline import StepResult
+from app.orchestrator.progress import SCAN_STAGE, progress_event, publish_progress
+from app.orchestrator.security_scan import run_security_scan
+from app.orchestrator.single_flight import acquire_lock, lock_heartbeat, release_lock
+from app.orchestrator.tasks import (
+    LOCAL_SCAN_LOCK_TTL,
+    LOCAL_SCAN_PREFIX,
+    redis_conn,
+    scan_lock_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def scan_changes(
+    repo_path: str,
+    project_id: int,
+    paths: list[str] | None = None,
+    connection=redis_conn,
+) -> dict[str, StepResult] | None:
+    """
+    Runs one incremental pass, all steps when `paths` is None, under the
+    project's scan lock. Returns None without scanning if a queued scan
+    holds the lock; the caller retries later. Without a Redis `connection`
+    the pass runs unlocked and unpublished.
+    """
+    token = f"{LOCAL_SCAN_PREFIX}{uuid.uuid4().hex}"
+    lock = scan_lock_key(project_id)
+    heartbeat = contextlib.nullcontext()
+    if connection is not None:
+        holder = acquire_lock(connection, lock, token, LOCAL_SCAN_LOCK_TTL)
+        if holder is not None:
+            logger.info(f"Scan for project {project_id} in progress ({holder})")
+            return None
+        heartbeat = lock_heartbeat(connection, lock, token, LOCAL_SCAN_LOCK_TTL)
+
+    def report(result: StepResult):
+        publish_progress(connection, project_id, progress_event(token, result))
+
+    report(StepResult(SCAN_STAGE, "running"))
+    try:
+        with heartbeat:
+            results = asyncio.run(
+                run_security_scan(repo_path, project_id, report, paths)
+            )
+    except Exception as e:
+        report(StepResult(SCAN_STAGE, "failed", error=str(e)))
+        raise
+    finally:
+        if connection is not None:
+            release_lock(connection, lock, token)
+    failed = any(r.status != "done" for r in results.values())
+    report(
+        StepResult(
+            SCAN_STAGE,
+            "failed" if failed else "finished",
+            seconds=sum(r.seconds for r in results.values()),
+        )
+    )
+    return results
+
+
+def watch_repo(
+    repo_path: str, project_id: int, stop_event: threading.Event | None = None
+):
+    """
+    Brings the index up to date, then rescans each debounced burst of
+    changes until `stop_event` is set (or Ctrl-C). Changes that arrive while
+    another scan holds the project lock are kept and retried.
+    """
+    repo_path = os.path.abspath(repo_path)
+    connection = redis_conn
+    try:
+        connection.ping()
+    except Exception as e:
+        logger.warning(f"Redis unavailable, pages will not refresh live: {e}")
+        connection = None
+    pending: set[str] = set()
+    full = scan_changes(repo_path, project_id, None, connection) is None
+    for changes in watchfiles.watch(
+        repo_path,
+        watch_filter=watchfiles.DefaultFilter(ignore_dirs=sorted(EXCLUDED_DIRS)),
+        debounce=settings.WATCH_DEBOUNCE_MS,
+        step=settings.WATCH_STEP_MS,
+        stop_event=stop_event,
+        # Wakes up every few seconds so a blocked pass gets retried.
+        yield_on_timeout=True,
+    ):
+        pending.update(path for _, path in changes)
+        if not pending and not full:
+            continue
+        paths = None if full else sorted(pending)
+        logger.info(
+            "Rescanning everything"
+            if full
+            else f"Rescanning {len(paths)} changed file(s): {', '.join(paths[:5])}"
+        )
+        try:
+            if scan_changes(repo_path, project_id, paths, connection) is None:
+                continue
+        except Exception as e:
+            logger.exception(f"Watch rescan failed, will retry: {e}")
+            continue
+        pending.clear()
+        full = False
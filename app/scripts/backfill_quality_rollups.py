@@ -0,0 +1,30 @@
+"""
+Rebuilds the quality trend rollups from every stored QualityScore, e.g.
+after changing the weights in app.core.scoring.
+Run with: python -m app.scripts.backfill_quality_rollups [--test-plan-id ID]
+"""
+
+import argparse
+import logging
+import time
+import reflex as rx
+from app.adapters.quality_trends import backfill_quality_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--test-plan-id", type=int)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    with rx.session() as session:
+        runs, days = backfill_quality_rollups(session, args.test_plan_id)
+        session.commit()
+    print(
+        f"Rolled up {runs} runs into {days} plan-days "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark per-row ORM inserts against app.core.bulk.bulk_insert.
+Run with: python -m app.scripts.bench_bulk_insert [--rows 5000] [--url URL ...]
+
+Without --url, a temporary SQLite file and DATABASE_URL (if reachable) are used.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+import uuid
+import sqlmodel
+from sqlmodel import SQLModel, create_engine
+from app.core.bulk import bulk_insert
+from app.core.models import Project, SecurityFinding, Tenant
+from app.core.settings import settings
+
+
+def _finding_rows(project_id: int, count: int) -> list[dict]:
+    return [
+        {
+            "project_id": project_id,
+            "scanner": "bandit",
+            "test_id": f"B{100 + i % 600}",
+            "description": "Benchmark finding\twith tab and \\ backslash",
+            "severity": ("LOW", "MEDIUM", "HIGH")[i % 3],
+            "file_path": f"/app/module_{i % 500}.py",
+            "line_number": i % 900 + 1,
+            "cwe": str(i % 1000),
+            "owasp_category": None,
+        }
+        for i in range(count)
+    ]
+
+
+def _timed(engine, project_id: int, rows: list[dict], bulk: bool) -> float:
+    with sqlmodel.Session(engine) as session:
+        started = time.perf_counter()
+        if bulk:
+            bulk_insert(session, SecurityFinding, rows)
+        else:
+            for row in rows:
+                session.add(SecurityFinding(**row))
+        session.commit()
+        elapsed = time.perf_counter() - started
+        session.exec(
+            sqlmodel.delete(SecurityFinding).where(
+                SecurityFinding.project_id == project_id
+            )
+        )
+        session.commit()
+    return elapsed
+
+
+def benchmark(url: str, count: int):
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(
+        engine,
+        tables=[Tenant.__table__, Project.__table__, SecurityFinding.__table__],
+    )
+    with sqlmodel.Session(engine) as session:
+        tenant = Tenant(name=f"bench-{uuid.uuid4().hex}")
+        session.add(tenant)
+        session.commit()
+        project = Project(name="bench", tenant_id=tenant.id)
+        session.add(project)
+        session.commit()
+        tenant_id, project_id = tenant.id, project.id
+    rows = _finding_rows(project_id, count)
+    try:
+        before = _timed(engine, project_id, rows, bulk=False)
+        after = _timed(engine, project_id, rows, bulk=True)
+    finally:
+        with sqlmodel.Session(engine) as session:
+            session.exec(sqlmodel.delete(Project).where(Project.id == project_id))
+            session.exec(sqlmodel.delete(Tenant).where(Tenant.id == tenant_id))
+            session.commit()
+        engine.dispose()
+    print(f"\n{engine.dialect.name} ({count} rows)")
+    print("-" * 50)
+    print(f"  session.add():  {count / before:12,.0f} rows/sec  ({before:.3f}s)")
+    print(f"  bulk_insert():  {count / after:12,.0f} rows/sec  ({after:.3f}s)")
+    print(f"  speedup:        {before / after:12.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--url", action="append", dest="urls")
+    args = parser.parse_args()
+    if args.urls:
+        urls = args.urls
+    else:
+        sqlite_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+        urls = [f"sqlite:///{sqlite_file}", settings.DATABASE_URL]
+    for url in urls:
+        try:
+            benchmark(url, args.rows)
+        except Exception as e:
+            logging.exception(f"Benchmark against {url} failed: {e}")
+            print(f"\nSkipped {url.split('@')[-1]}: {e}")
+
+
+if __name__ == "__main__":
+    main()
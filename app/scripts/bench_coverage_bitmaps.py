@@ -0,0 +1,67 @@
+"""
+Benchmark line coverage bitmaps: encoded size per file and the cost of
+diffing two runs.
+Run with: python -m app.scripts.bench_coverage_bitmaps [--files 50000] [--lines 400]
+
+The head run differs from the base in a few lines of one file in twenty.
+"""
+
+import argparse
+import time
+import numpy as np
+from app.adapters import line_bitmap
+
+
+def _runs(files: int, lines: int, rng: np.random.Generator):
+    base, head = [], []
+    for i in range(files):
+        width = int(rng.integers(lines // 4, lines * 2))
+        # Coverage comes in runs of lines (blocks), not independent bits.
+        blocks = np.repeat(rng.random(width // 8 + 1) < 0.8, 8)[:width]
+        statements = np.flatnonzero(rng.random(width) < 0.7) + 1
+        executed = statements[blocks[statements - 1]]
+        base.append(
+            (
+                line_bitmap.encode(line_bitmap.pack(executed)),
+                line_bitmap.pack(statements),
+            )
+        )
+        if i % 20 == 0:
+            executed = np.setxor1d(executed, rng.choice(statements, 5))
+        head.append(line_bitmap.encode(line_bitmap.pack(executed)))
+    return base, head
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--lines", type=int, default=400)
+    args = parser.parse_args()
+    base, head = _runs(args.files, args.lines, np.random.default_rng(0))
+    statement_blobs = [line_bitmap.encode(s) for _, s in base]
+    sizes = np.array([len(b) + len(s) for (b, _), s in zip(base, statement_blobs)])
+    print(f"\n{args.files} files, ~{args.lines} lines each")
+    print("-" * 60)
+    print(
+        f"  stored per file (executed + statements): mean {sizes.mean():.0f} B, "
+        f"p99 {np.percentile(sizes, 99):.0f} B"
+    )
+    started = time.perf_counter()
+    pairs = line_bitmap.BitmapPairs(
+        [line_bitmap.decode(b) for b, _ in base],
+        [line_bitmap.decode(h) for h in head],
+    )
+    decoded = time.perf_counter()
+    lost = pairs.counts(pairs.difference())
+    gained = pairs.counts(pairs.right & ~pairs.left)
+    done = time.perf_counter()
+    print(f"  decode + align:  {decoded - started:.3f}s")
+    print(f"  vectorized diff: {done - decoded:.3f}s")
+    print(
+        f"  {int((lost + gained > 0).sum())} files changed, "
+        f"{int(gained.sum())} lines gained, {int(lost.sum())} lost"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark coverage report ingestion on a synthetic report.
+Run with: python -m app.scripts.bench_coverage_ingest [--files 50000] [--lines 120]
+
+Writes Cobertura XML and coverage.py JSON reports of the same project to a
+temporary directory and ingests each into a temporary SQLite database,
+reporting time and the growth of peak memory.
+"""
+
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+import sqlmodel
+from sqlmodel import SQLModel, create_engine
+from app.adapters.coverage_report import ingest_coverage
+from app.core.models import Coverage
+
+
+def _hit(file_index: int, line: int) -> bool:
+    return (file_index * 7 + line * 13) % 10 < 8
+
+
+def write_cobertura(path: str, files: int, lines: int):
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0" ?>\n<coverage version="7.0">\n')
+        f.write("<sources><source>/src</source></sources>\n<packages>\n")
+        for i in range(files):
+            if i % 100 == 0:
+                if i:
+                    f.write("</classes></package>\n")
+                f.write(f'<package name="pkg{i // 100}"><classes>\n')
+            filename = f"pkg{i // 100}/module_{i}.py"
+            f.write(f'<class name="module_{i}.py" filename="{filename}"><methods/>')
+            f.write("<lines>")
+            f.write(
+                "".join(
+                    f'<line number="{n}" hits="{int(_hit(i, n))}"/>'
+                    for n in range(1, lines + 1)
+                )
+            )
+            f.write("</lines></class>\n")
+        f.write("</classes></package>\n</packages>\n</coverage>\n")
+
+
+def write_coverage_json(path: str, files: int, lines: int):
+    with open(path, "w") as f:
+        f.write('{"meta": {"format": 3}, "files": {')
+        for i in range(files):
+            executed = [n for n in range(1, lines + 1) if _hit(i, n)]
+            missing = [n for n in range(1, lines + 1) if not _hit(i, n)]
+            entry = {
+                "executed_lines": executed,
+                "missing_lines": missing,
+                "summary": {
+                    "covered_lines": len(executed),
+                    "num_statements": lines,
+                },
+            }
+            f.write(("," if i else "") + json.dumps(f"pkg{i // 100}/module_{i}.py"))
+            f.write(":" + json.dumps(entry))
+        f.write("}}")
+
+
+def _peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--lines", type=int, default=120)
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    SQLModel.metadata.create_all(engine, tables=[Coverage.__table__])
+    reports = {
+        "cobertura": (os.path.join(directory, "coverage.xml"), write_cobertura),
+        "coverage.py json": (
+            os.path.join(directory, "coverage.json"),
+            write_coverage_json,
+        ),
+    }
+    print(f"\nIngesting {args.files} files x {args.lines} lines")
+    print("-" * 60)
+    for name, (path, write) in reports.items():
+        write(path, args.files, args.lines)
+        size = os.path.getsize(path) / 1e6
+        before = _peak_mb()
+        with sqlmodel.Session(engine) as session:
+            started = time.perf_counter()
+            count = ingest_coverage(session, 1, path)
+            session.commit()
+            elapsed = time.perf_counter() - started
+        print(
+            f"  {name:<17} {size:7.1f} MB  {count:>7} rows  {elapsed:6.2f}s  "
+            f"peak +{_peak_mb() - before:.0f} MB"
+        )
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
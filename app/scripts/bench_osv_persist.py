@@ -0,0 +1,114 @@
+"""
+Benchmark persisting a synthetic OSV querybatch response: one SELECT per
+advisory (previous behaviour) against batched existence checks.
+Run with: python -m app.scripts.bench_osv_persist [--advisories 10000] [--url URL]
+
+Half of the advisories are pre-seeded so both paths see realistic conflicts.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+import sqlmodel
+from sqlmodel import SQLModel, create_engine
+from app.adapters.vulnerabilities import persist_vulnerabilities, vulnerability_rows
+from app.core.bulk import bulk_insert
+from app.core.models import ComponentVulnerability, SBOMComponent
+
+COMPONENTS = 300
+
+
+def _response(prefix: str, count: int) -> list[dict]:
+    results = [{"vulns": []} for _ in range(COMPONENTS)]
+    for i in range(count):
+        results[i % COMPONENTS]["vulns"].append(
+            {
+                "id": f"{prefix}-{i}",
+                "summary": f"Synthetic advisory {i}",
+                "severity": [{"type": "CVSS_V3", "score": "CVSS:3.1/AV:N/AC:L"}],
+            }
+        )
+    return results
+
+
+def _per_row(session, rows: dict[tuple[int, str], dict]):
+    for row in rows.values():
+        if not session.exec(
+            sqlmodel.select(ComponentVulnerability).where(
+                ComponentVulnerability.component_id == row["component_id"],
+                ComponentVulnerability.osv_id == row["osv_id"],
+            )
+        ).first():
+            session.add(ComponentVulnerability(**row))
+
+
+def _timed(engine, component_ids, results, batched: bool) -> float:
+    rows = vulnerability_rows(component_ids, results)
+    seeded = dict(list(rows.items())[: len(rows) // 2])
+    with sqlmodel.Session(engine) as session:
+        bulk_insert(session, ComponentVulnerability, seeded.values())
+        session.commit()
+        started = time.perf_counter()
+        if batched:
+            persist_vulnerabilities(session, rows)
+        else:
+            _per_row(session, rows)
+        session.commit()
+        elapsed = time.perf_counter() - started
+        session.exec(
+            sqlmodel.delete(ComponentVulnerability).where(
+                ComponentVulnerability.component_id.in_(component_ids)
+            )
+        )
+        session.commit()
+    return elapsed
+
+
+def benchmark(url: str, count: int):
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(
+        engine, tables=[SBOMComponent.__table__, ComponentVulnerability.__table__]
+    )
+    run_id = uuid.uuid4().hex
+    with sqlmodel.Session(engine) as session:
+        components = [
+            SBOMComponent(
+                name=f"pkg{i}", version="1.0", purl=f"pkg:pypi/bench-{run_id}-{i}@1.0"
+            )
+            for i in range(COMPONENTS)
+        ]
+        session.add_all(components)
+        session.commit()
+        component_ids = [c.id for c in components]
+    try:
+        before = _timed(engine, component_ids, _response(f"A{run_id}", count), False)
+        after = _timed(engine, component_ids, _response(f"B{run_id}", count), True)
+    finally:
+        with sqlmodel.Session(engine) as session:
+            session.exec(
+                sqlmodel.delete(SBOMComponent).where(
+                    SBOMComponent.id.in_(component_ids)
+                )
+            )
+            session.commit()
+        engine.dispose()
+    print(f"\n{engine.dialect.name} ({count} advisories, {COMPONENTS} components)")
+    print("-" * 50)
+    print(f"  per-advisory SELECT:  {before:8.3f}s")
+    print(f"  batched IN + bulk:    {after:8.3f}s")
+    print(f"  speedup:              {before / after:8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--advisories", type=int, default=10_000)
+    parser.add_argument("--url")
+    args = parser.parse_args()
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    benchmark(url, args.advisories)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark CWE -> OWASP lookups: the old per-call dict-of-lists scan against
+the precomputed app.core.taxonomy index.
+Run with: python -m app.scripts.bench_taxonomy [--lookups 100000]
+"""
+
+import argparse
+import random
+import time
+from app.core.taxonomy import OWASP_2021, SANS_TOP_25, lookup, map_many
+
+
+def _legacy_map_cwe_to_owasp(cwe_id: int | None) -> str | None:
+    # Mirrors the previous implementation: rebuild the mapping, then scan it.
+    if cwe_id is None:
+        return None
+    owasp_mapping = {
+        f"{category}-{name}": list(members)
+        for category, (name, members) in OWASP_2021.items()
+    }
+    for owasp_cat, cwe_list in owasp_mapping.items():
+        if cwe_id in cwe_list:
+            return owasp_cat.split("-")[0]
+    return None
+
+
+def _timed(func, *args) -> float:
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def benchmark(count: int):
+    rng = random.Random(42)
+    known = sorted({c for _, members in OWASP_2021.values() for c in members})
+    # Mostly mapped CWEs, some Top 25 ids and some misses, as scanners report.
+    pool = known + list(SANS_TOP_25) + list(range(1500, 1600))
+    cwes = [rng.choice(pool) for _ in range(count)]
+    legacy = _timed(lambda: [_legacy_map_cwe_to_owasp(c) for c in cwes])
+    single = _timed(lambda: [lookup(c) for c in cwes])
+    bulk = _timed(map_many, cwes)
+    strings = _timed(map_many, [f"CWE-{c}" for c in cwes])
+    print(f"\n{count} lookups")
+    print("-" * 50)
+    print(f"  legacy dict-of-lists:  {legacy:8.3f}s")
+    print(f"  lookup():              {single:8.3f}s  ({legacy / single:6.0f}x)")
+    print(f"  map_many():            {bulk:8.3f}s  ({legacy / bulk:6.0f}x)")
+    print(f"  map_many('CWE-n'):     {strings:8.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+    benchmark(args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Loads a coverage report into a run, e.g. from a CI job, and computes its
+deltas against the baseline run.
+Run with: python -m app.scripts.ingest_coverage RUN_ID REPORT [--repo-path PATH]
+          [--branch NAME]
+
+REPORT is a Cobertura XML file, `coverage json` output or a `.coverage`
+data file. Reported paths, including another machine's absolute paths,
+are mapped onto the checkout at --repo-path and stored relative to it; a
+`.coverage` file's sources are read from there too. --branch records the
+branch the run tested (default: the CI's branch variable, else the
+checkout's branch), which decides whether it can serve as a baseline.
+"""
+
+import argparse
+import logging
+import os
+import time
+import reflex as rx
+from app.adapters.coverage_delta import checkout_branch, update_coverage_deltas
+from app.adapters.coverage_report import ingest_coverage
+from app.core.models import Run
+
+# Branch variables of common CI systems, most specific first.
+CI_BRANCH_VARIABLES = ("GITHUB_HEAD_REF", "GITHUB_REF_NAME", "CI_COMMIT_REF_NAME")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("run_id", type=int)
+    parser.add_argument("report")
+    parser.add_argument("--repo-path")
+    parser.add_argument("--branch")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    branch = (
+        args.branch
+        or next(filter(None, map(os.environ.get, CI_BRANCH_VARIABLES)), None)
+        or (checkout_branch(args.repo_path) if args.repo_path else None)
+    )
+    started = time.perf_counter()
+    with rx.session() as session:
+        run = session.get(Run, args.run_id)
+        if run is None:
+            parser.error(f"Run {args.run_id} not found")
+        if branch:
+            run.branch = branch
+            session.add(run)
+        count = ingest_coverage(session, args.run_id, args.report, args.repo_path)
+        delta = update_coverage_deltas(session, args.run_id)
+        session.commit()
+    print(
+        f"Ingested {count} files into run {args.run_id} "
+        f"({delta:+.2f} points) in {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Script to download OSV ecosystem dumps for the local vulnerability mirror.
+Run with: python -m app.scripts.sync_osv_mirror [PyPI npm ...]
+
+Dumps are written to OSV_MIRROR_PATH as <ecosystem>.zip. In air-gapped
+environments, copy the zips there instead of running this script.
+"""
+
+import logging
+import os
+import sys
+import requests
+from app.adapters.osv_mirror import OSV_DUMP_URL, OSVMirror
+from app.core.settings import settings
+
+
+def sync_ecosystem(ecosystem: str, dest_dir: str) -> bool:
+    url = OSV_DUMP_URL.format(ecosystem=ecosystem)
+    target = os.path.join(dest_dir, f"{ecosystem}.zip")
+    partial = target + ".part"
+    try:
+        with requests.get(url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            with open(partial, "wb") as f:
+                for block in response.iter_content(chunk_size=1 << 20):
+                    f.write(block)
+        os.replace(partial, target)
+        print(f"  ✅ {ecosystem}: {os.path.getsize(target) / 1e6:.1f} MB")
+        return True
+    except Exception as e:
+        logging.exception(f"Failed to download OSV dump for {ecosystem}: {e}")
+        print(f"  ❌ {ecosystem}: {e}")
+        if os.path.exists(partial):
+            os.unlink(partial)
+        return False
+
+
+def main(ecosystems: list[str]) -> int:
+    dest_dir = settings.OSV_MIRROR_PATH
+    if not dest_dir:
+        print("❌ OSV_MIRROR_PATH is not set.")
+        return 1
+    os.makedirs(dest_dir, exist_ok=True)
+    print(f"Syncing OSV dumps into {dest_dir}")
+    ok = all([sync_ecosystem(e, dest_dir) for e in ecosystems])
+    mirror = OSVMirror.load(dest_dir)
+    print(f"Mirror: {len(mirror.vulns)} advisories, {len(mirror.index)} packages")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:] or ["PyPI"]))
@@ -0,0 +1,30 @@
+"""
+Continuously rescans a working copy while you edit it.
+Run with: python -m app.scripts.watch [--project-id 1] [REPO_PATH]
+
+Only the scanners affected by each change run, and only on the changed
+files. Open security pages for the project refresh as findings change.
+"""
+
+import argparse
+import logging
+from app.orchestrator.watch import watch_repo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("repo_path", nargs="?", default=".")
+    parser.add_argument("--project-id", type=int, default=1)
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    print(f"Watching {args.repo_path} for project {args.project_id} (Ctrl-C to stop)")
+    try:
+        watch_repo(args.repo_path, args.project_id)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import threading
+import numpy as np
+import plotly.graph_objects as go
+import sqlmodel
+from cachetools import LRUCache
+from app.core.models import Coverage
+
+HEATMAP = "heatmap"
+TREEMAP = "treemap"
+COVERAGE_VIEWS = (TREEMAP, HEATMAP)
+# Caps on rendered cells, so large repositories stay responsive.
+MAX_HEATMAP_ROWS = 40
+MAX_HEATMAP_COLUMNS = 40
+MAX_TREEMAP_CELLS = 2000
+ROOT = "."
+# Built figures by (run_id, view, row count, max row id): a regenerated
+# report gets new row ids, so stale figures are never served.
+_figures: LRUCache = LRUCache(maxsize=32)
+_figures_lock = threading.Lock()
+
+
+def _percentages(covered: np.ndarray, total: np.ndarray) -> np.ndarray:
+    return np.divide(
+        covered * 100.0,
+        total,
+        out=np.full(len(total), 100.0),
+        where=total > 0,
+    )
+
+
+def _layout(fig: go.Figure, title: str) -> go.Figure:
+    fig.update_layout(
+        title=title,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        autosize=True,
+        margin=dict(l=10, r=10, t=40, b=10),
+        font=dict(color="#E8F0FF", size=10),
+    )
+    return fig
+
+
+def file_heatmap(
+    paths: list[str],
+    covered: np.ndarray,
+    total: np.ndarray,
+    max_rows: int = MAX_HEATMAP_ROWS,
+    max_columns: int = MAX_HEATMAP_COLUMNS,
+) -> go.Figure:
+    """
+    One row per directory, its files ordered least covered first. Only the
+    directories with the most uncovered lines and their worst files are
+    drawn, so the grid never exceeds `max_rows` x `max_columns`.
+    """
+    split = [path.rpartition("/") for path in paths]
+    directories, inverse = np.unique(
+        np.array([directory or ROOT for directory, _, _ in split]),
+        return_inverse=True,
+    )
+    names = np.array([name for _, _, name in split], dtype=object)
+    percentage = _percentages(covered, total)
+    files_per_dir = np.bincount(inverse, minlength=len(directories))
+    uncovered = np.bincount(
+        inverse, weights=total - covered, minlength=len(directories)
+    )
+    rows = np.argsort(-uncovered, kind="stable")[:max_rows]
+    row_of_dir = np.full(len(directories), -1)
+    row_of_dir[rows] = np.arange(len(rows))
+    # Files grouped by directory, least covered first; rank within group.
+    order = np.lexsort((percentage, inverse))
+    grouped = inverse[order]
+    rank = np.arange(len(order)) - np.repeat(
+        np.cumsum(files_per_dir) - files_per_dir, files_per_dir
+    )
+    columns = int(min(max_columns, files_per_dir[rows].max()))
+    keep = (row_of_dir[grouped] >= 0) & (rank < columns)
+    cells = (row_of_dir[grouped[keep]], rank[keep])
+    kept = order[keep]
+    z = np.full((len(rows), columns), np.nan)
+    z[cells] = percentage[kept]
+    text = np.full((len(rows), columns), "", dtype=object)
+    text[cells] = names[kept]
+    hover = np.full((len(rows), columns), "", dtype=object)
+    hover[cells] = [
+        f"{paths[i]}<br>Coverage: {percentage[i]:.1f}% ({covered[i]}/{total[i]} lines)"
+        for i in kept.tolist()
+    ]
+    fig = go.Figure(
+        data=go.Heatmap(
+            z=z,
+            y=directories[rows].tolist(),
+            x=[f"File {i + 1}" for i in range(columns)],
+            colorscale="RdYlGn",
+            zmin=0,
+            zmax=100,
+            hoverongaps=False,
+            text=text,
+            texttemplate="%{text}",
+            hovertext=hover,
+            hoverinfo="text",
+        )
+    )
+    title = "File Coverage Heatmap"
+    if len(rows) < len(directories) or columns < files_per_dir.max():
+        title += (
+            f" (least covered {len(rows)} of {len(directories)} directories, "
+            f"up to {columns} files each)"
+        )
+    _layout(fig, title).update_layout(yaxis=dict(autorange="reversed"))
+    fig.update_xaxes(showticklabels=False, visible=False)
+    return fig
+
+
+def directory_treemap(
+    paths: list[str],
+    covered: np.ndarray,
+    total: np.ndarray,
+    max_cells: int = MAX_TREEMAP_CELLS,
+) -> go.Figure:
+    """
+    Coverage rolled up by directory, sized by statements and colored by
+    coverage. Levels are added from the top while the cell count stays
+    within `max_cells`; the level that would exceed it shows only its
+    largest paths, and anything deeper is folded into its ancestors.
+    """
+    parts = [path.split("/") for path in paths]
+    depth = np.fromiter(map(len, parts), dtype=np.int64, count=len(parts))
+    ids, parents, labels, node_covered, node_total, node_files = (
+        [ROOT],
+        [""],
+        ["All files"],
+        [int(covered.sum())],
+        [int(total.sum())],
+        [len(paths)],
+    )
+    truncated = False
+    for level in range(1, int(depth.max()) + 1):
+        members = np.flatnonzero(depth >= level)
+        prefixes, inverse = np.unique(
+            np.array(["/".join(parts[i][:level]) for i in members.tolist()]),
+            return_inverse=True,
+        )
+        level_covered = np.bincount(inverse, weights=covered[members])
+        level_total = np.bincount(inverse, weights=total[members])
+        level_files = np.bincount(inverse)
+        shown = np.arange(len(prefixes))
+        if len(ids) + len(prefixes) > max_cells:
+            # Spend what is left of the budget on the largest paths.
+            truncated = True
+            shown = np.sort(
+                np.argsort(-level_total, kind="stable")[: max_cells - len(ids)]
+            )
+        for prefix in prefixes[shown].tolist():
+            parent, _, label = prefix.rpartition("/")
+            ids.append(prefix)
+            parents.append(parent or ROOT)
+            labels.append(label)
+        node_covered.extend(level_covered[shown].astype(np.int64).tolist())
+        node_total.extend(level_total[shown].astype(np.int64).tolist())
+        node_files.extend(level_files[shown].tolist())
+        if truncated:
+            break
+    node_covered = np.array(node_covered)
+    node_total = np.array(node_total)
+    percentage = _percentages(node_covered, node_total)
+    fig = go.Figure(
+        go.Treemap(
+            ids=ids,
+            parents=parents,
+            labels=labels,
+            values=node_total,
+            branchvalues="total",
+            marker=dict(
+                colors=percentage,
+                colorscale="RdYlGn",
+                cmin=0,
+                cmax=100,
+                showscale=True,
+            ),
+            hovertext=[
+                f"{node}<br>Coverage: {pct:.1f}% ({c}/{t} lines)<br>{files} files"
+                for node, pct, c, t, files in zip(
+                    ids, percentage.tolist(), node_covered, node_total, node_files
+                )
+            ],
+            hoverinfo="text",
+        )
+    )
+    title = "Coverage by Directory"
+    if truncated:
+        title += f" (largest {len(ids) - 1} paths of {len(paths)} files)"
+    return _layout(fig, title)
+
+
+def coverage_version(session, run_id: int) -> tuple[int, int]:
+    count, max_id = session.exec(
+        sqlmodel.select(
+            sqlmodel.func.count(Coverage.id), sqlmodel.func.max(Coverage.id)
+        ).where(Coverage.run_id == run_id)
+    ).one()
+    return count, max_id or 0
+
+
+def coverage_figure(session, run_id: int, view: str) -> go.Figure:
+    """The run's coverage figure for `view`, built once per report."""
+    key = (run_id, view, *coverage_version(session, run_id))
+    with _figures_lock:
+        fig = _figures.get(key)
+    if fig is not None:
+        return fig
+    if key[2] == 0:
+        return go.Figure()
+    table = Coverage.__table__
+    rows = (
+        session.connection()
+        .execute(
+            sqlmodel.select(
+                table.c.file_path, table.c.covered_lines, table.c.total_lines
+            ).where(table.c.run_id == run_id)
+        )
+        .all()
+    )
+    paths = [r[0] for r in rows]
+    covered = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+    total = np.fromiter((r[2] for r in rows), dtype=np.int64, count=len(rows))
+    build = directory_treemap if view == TREEMAP else file_heatmap
+    fig = build(paths, covered, total)
+    with _figures_lock:
+        _figures[key] = fig
+    return fig
@@ -93,6 +93,26 @@ def policy_form() -> rx.Component:
                 class_name="flex items-center",
             ),
         ),
+        policy_item(
+            "Allowed Licenses",
+            "Comma-separated SPDX ids. Leave empty to allow any license that is not denied.",
+            rx.el.input(
+                default_value=PolicyState.project_policy.license_allow,
+                on_blur=PolicyState.set_license_allow,
+                placeholder="MIT, Apache-2.0, BSD-3-Clause",
+                class_name="mt-1 block w-full pl-3 pr-10 py-2 text-base bg-[#0A0F14] text-[#E8F0FF] border border-white/10 rounded-md focus:outline-none focus:border-[#00E5FF] focus:shadow-[0_0_10px_-2px_#00E5FF] transition-all sm:text-sm",
+            ),
+        ),
+        policy_item(
+            "Denied Licenses",
+            "Comma-separated SPDX ids that fail the license check.",
+            rx.el.input(
+                default_value=PolicyState.project_policy.license_deny,
+                on_blur=PolicyState.set_license_deny,
+                placeholder="AGPL-3.0-only, GPL-3.0-only",
+                class_name="mt-1 block w-full pl-3 pr-10 py-2 text-base bg-[#0A0F14] text-[#E8F0FF] border border-white/10 rounded-md focus:outline-none focus:border-[#00E5FF] focus:shadow-[0_0_10px_-2px_#00E5FF] transition-all sm:text-sm",
+            ),
+        ),
         policy_item(
             "Autofix Scope",
             "Define which categories of issues are eligible for autofix.",
@@ -1,6 +1,7 @@
 import reflex as rx
 from app.ui.components.footer import footer
 from app.ui.states.quality_state import QualityState
+from app.ui.coverage_charts import HEATMAP, TREEMAP
 from app.ui.states.auth_state import AuthState
 from app.ui.components.sidebar import sidebar, user_dropdown
 from app.ui.styles import page_style, page_content_style, header_style, card_style
@@ -52,6 +53,7 @@ def quality_page_content() -> rx.Component:
             rx.el.div(
                 quality_score_card(),
                 coverage_heatmap(),
+                quality_trend_card(),
                 class_name="mt-8 grid grid-cols-1 lg:grid-cols-2 gap-8",
             ),
             class_name="p-8",
@@ -124,13 +126,33 @@ def quality_score_item(name: str, score: rx.Var[str]) -> rx.Component:
     )
 
 
+def coverage_view_button(label: str, view: str) -> rx.Component:
+    return rx.el.button(
+        label,
+        on_click=QualityState.set_coverage_view(view),
+        class_name=rx.cond(
+            QualityState.coverage_view == view,
+            "px-3 py-1 text-xs font-medium rounded-md bg-[#00E5FF]/20 text-[#00E5FF]",
+            "px-3 py-1 text-xs font-medium rounded-md text-[#A9B3C1] hover:text-[#E8F0FF]",
+        ),
+    )
+
+
 def coverage_heatmap() -> rx.Component:
     return rx.el.div(
-        rx.el.h2(
-            "Coverage Heatmap", class_name="text-xl font-semibold text-[#E8F0FF] mb-4"
+        rx.el.div(
+            rx.el.h2(
+                "Coverage Heatmap", class_name="text-xl font-semibold text-[#E8F0FF]"
+            ),
+            rx.el.div(
+                coverage_view_button("Directories", TREEMAP),
+                coverage_view_button("Files", HEATMAP),
+                class_name="flex gap-1 p-1 rounded-lg border border-[#00E5FF]/20",
+            ),
+            class_name="flex items-center justify-between mb-4",
         ),
         rx.cond(
-            QualityState.coverage_data.length() > 0,
+            QualityState.coverage_file_count > 0,
             rx.el.div(
                 rx.plotly(
                     data=QualityState.coverage_heatmap_fig,
@@ -149,4 +171,36 @@ def coverage_heatmap() -> rx.Component:
             ),
         ),
         **card_style("magenta"),
+    )
+
+
+def quality_trend_card() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h2(
+                "Quality Trend",
+                class_name="text-xl font-semibold text-[#E8F0FF] mb-4",
+            ),
+            rx.cond(
+                QualityState.quality_trend_days > 0,
+                rx.el.div(
+                    rx.plotly(
+                        data=QualityState.quality_trend_fig,
+                        style={"width": "100%", "height": "100%"},
+                        config={"responsive": True, "displayModeBar": False},
+                        use_resize_handler=True,
+                    ),
+                    class_name="w-full h-[320px] overflow-hidden relative rounded-lg",
+                ),
+                rx.el.div(
+                    rx.el.p(
+                        "No scored runs for this test plan yet.",
+                        class_name="text-[#A9B3C1]",
+                    ),
+                    class_name="flex items-center justify-center h-full min-h-[200px]",
+                ),
+            ),
+            **card_style("cyan"),
+        ),
+        class_name="lg:col-span-2",
     )
\ No newline at end of file
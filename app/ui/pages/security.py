@@ -6,7 +6,7 @@ from app.ui.states.auth_state import AuthState
 from app.core.models import SecurityFinding, SBOMComponent
 from app.ui.components.sidebar import sidebar, user_dropdown
 from app.ui.styles import page_style, page_content_style, header_style
-from app.ui.states.security_state import SBOMComponentDisplay
+from app.ui.states.security_state import SBOMComponentDisplay, ScanStageDisplay
 
 
 def security_page() -> rx.Component:
@@ -52,7 +52,9 @@ def security_page_content() -> rx.Component:
                     "Scan Now",
                     on_click=SecurityState.run_security_scans,
                     class_name="px-4 py-2 bg-[#FF3CF7] text-[#0A0F14] font-semibold rounded-lg hover:opacity-90",
-                )
+                ),
+                scan_progress(),
+                class_name="flex items-center gap-4",
             ),
             rx.el.div(
                 security_findings_table(),
@@ -65,6 +67,35 @@ def security_page_content() -> rx.Component:
     )
 
 
+def scan_progress() -> rx.Component:
+    return rx.cond(
+        SecurityState.scan_status != "",
+        rx.el.div(
+            rx.el.span(
+                "Scan: " + SecurityState.scan_status,
+                class_name="text-sm font-semibold text-[#E8F0FF]",
+            ),
+            rx.foreach(SecurityState.scan_stages, render_scan_stage),
+            class_name="flex items-center gap-2",
+        ),
+    )
+
+
+def render_scan_stage(stage: ScanStageDisplay) -> rx.Component:
+    return rx.el.span(
+        stage.name + ": " + stage.status,
+        class_name=rx.cond(
+            stage.status == "done",
+            "px-2 inline-flex text-xs leading-5 font-semibold rounded-full bg-[#00E5FF]/20 text-[#00E5FF]",
+            rx.cond(
+                stage.status == "failed",
+                "px-2 inline-flex text-xs leading-5 font-semibold rounded-full bg-[#FF3B3B]/20 text-[#FF3B3B]",
+                "px-2 inline-flex text-xs leading-5 font-semibold rounded-full bg-[#A9B3C1]/20 text-[#A9B3C1]",
+            ),
+        ),
+    )
+
+
 def security_findings_table() -> rx.Component:
     return rx.el.div(
         rx.el.h2(
@@ -173,6 +204,14 @@ def sbom_table() -> rx.Component:
                             "Version",
                             class_name="px-6 py-3 text-left text-xs font-medium text-[#A9B3C1] uppercase tracking-wider",
                         ),
+                        rx.el.th(
+                            "License",
+                            class_name="px-6 py-3 text-left text-xs font-medium text-[#A9B3C1] uppercase tracking-wider",
+                        ),
+                        rx.el.th(
+                            "Reachable",
+                            class_name="px-6 py-3 text-left text-xs font-medium text-[#A9B3C1] uppercase tracking-wider",
+                        ),
                         rx.el.th(
                             "Vulnerabilities",
                             class_name="px-6 py-3 text-left text-xs font-medium text-[#A9B3C1] uppercase tracking-wider",
@@ -200,8 +239,36 @@ def render_sbom_row(component: SBOMComponentDisplay) -> rx.Component:
             component.version,
             class_name="px-6 py-4 whitespace-nowrap text-sm text-[#00E5FF] font-mono",
         ),
+        rx.el.td(
+            rx.el.span(component.license, class_name="font-mono"),
+            rx.el.span(
+                component.license_status,
+                class_name=rx.cond(
+                    component.license_status == "allowed",
+                    "ml-2 px-2 inline-flex text-xs leading-5 font-semibold rounded-full bg-[#00E5FF]/20 text-[#00E5FF]",
+                    rx.cond(
+                        component.license_status == "denied",
+                        "ml-2 px-2 inline-flex text-xs leading-5 font-semibold rounded-full bg-[#FF3B3B]/20 text-[#FF3B3B]",
+                        "ml-2 px-2 inline-flex text-xs leading-5 font-semibold rounded-full bg-[#FFB020]/20 text-[#FFB020]",
+                    ),
+                ),
+            ),
+            class_name="px-6 py-4 whitespace-nowrap text-sm text-[#E8F0FF]",
+        ),
+        rx.el.td(
+            rx.cond(
+                component.reachable,
+                "depth " + component.reachability_depth.to_string(),
+                "no",
+            ),
+            class_name=rx.cond(
+                component.reachable,
+                "px-6 py-4 whitespace-nowrap text-sm text-[#E8F0FF]",
+                "px-6 py-4 whitespace-nowrap text-sm text-[#A9B3C1]",
+            ),
+        ),
         rx.el.td(
             component.vulnerabilities.length().to_string(),
             class_name="px-6 py-4 whitespace-nowrap text-sm text-[#FF3B3B] font-bold",
         ),
-    )
\ No newline at end of file
+    )
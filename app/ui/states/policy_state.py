@@ -91,6 +91,14 @@ class PolicyState(rx.State):
     def set_autofix_scope(self, value: str):
         self.update_policy("autofix_scope", value)
 
+    @rx.event
+    def set_license_allow(self, value: str):
+        self.update_policy("license_allow", value)
+
+    @rx.event
+    def set_license_deny(self, value: str):
+        self.update_policy("license_deny", value)
+
     @rx.var
     def is_mergeable(self) -> bool:
         if not self.project_policy:
@@ -1,11 +1,92 @@
 import reflex as rx
 import sqlmodel
 from app.ui.states.auth_state import AuthState
-from app.core.models import Coverage, QualityScore
+from app.core.models import Artifact, Coverage, QualityRollup, QualityScore, Run
+from app.core.settings import settings
+from app.core.scoring import composite_score
+from app.adapters.coverage_delta import update_coverage_deltas
+from app.adapters.quality_trends import quality_trend, record_quality_score
+from app.adapters.coverage_report import COVERAGE_ARTIFACTS, ingest_coverage
+from app.ui.coverage_charts import (
+    COVERAGE_VIEWS,
+    TREEMAP,
+    coverage_figure,
+    coverage_version,
+)
+import logging
+import os
 import random
 import plotly.graph_objects as go
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+TREND_SUB_SCORES = (
+    ("static_issues_score", "Static Issues"),
+    ("test_pass_rate", "Test Pass Rate"),
+    ("performance_score", "Performance"),
+    ("accessibility_score", "Accessibility"),
+    ("security_score", "Security"),
+)
+
+
+def coverage_artifact(session, run_id: int) -> Artifact | None:
+    """The run's most recent coverage report artifact, if it uploaded one."""
+    artifacts = session.exec(
+        sqlmodel.select(Artifact)
+        .where(Artifact.run_id == run_id)
+        .order_by(Artifact.created_at.desc())
+    ).all()
+    return next(
+        (a for a in artifacts if os.path.basename(a.name) in COVERAGE_ARTIFACTS),
+        None,
+    )
+
+
+def quality_trend_figure(trend: list[QualityRollup]) -> go.Figure:
+    """Daily composite (with its min-max band) and sub-scores, from rollups."""
+    days = [row.day for row in trend]
+    fig = go.Figure(
+        [
+            go.Scatter(
+                x=days + days[::-1],
+                y=[row.composite_max for row in trend]
+                + [row.composite_min for row in trend][::-1],
+                fill="toself",
+                fillcolor="rgba(0,229,255,0.15)",
+                line=dict(width=0),
+                hoverinfo="skip",
+                showlegend=False,
+            ),
+            go.Scatter(
+                x=days,
+                y=[row.composite_score for row in trend],
+                name="Composite",
+                line=dict(color="#00E5FF", width=3),
+                customdata=[row.runs for row in trend],
+                hovertemplate="%{x}<br>Composite: %{y:.1f} (%{customdata} runs)<extra></extra>",
+            ),
+        ]
+        + [
+            go.Scatter(
+                x=days,
+                y=[getattr(row, name) for row in trend],
+                name=label,
+                visible="legendonly",
+            )
+            for name, label in TREND_SUB_SCORES
+        ]
+    )
+    fig.update_layout(
+        title="Quality Trend (daily average)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        autosize=True,
+        margin=dict(l=10, r=10, t=40, b=10),
+        font=dict(color="#E8F0FF", size=10),
+        legend=dict(orientation="h"),
+    )
+    return fig
+
 
 class QualityScoreDisplay(rx.Base):
     static_issues_score: str
@@ -18,7 +99,11 @@ class QualityScoreDisplay(rx.Base):
 
 
 class QualityState(rx.State):
-    coverage_data: list[Coverage] = []
+    coverage_file_count: int = 0
+    coverage_view: str = TREEMAP
+    coverage_heatmap_fig: go.Figure = go.Figure()
+    quality_trend_days: int = 0
+    quality_trend_fig: go.Figure = go.Figure()
     quality_score: Optional[QualityScore] = None
     current_run_id: int | None = None
 
@@ -28,17 +113,31 @@ class QualityState(rx.State):
         if not auth_state.is_logged_in:
             return
         with rx.session() as session:
-            self.coverage_data = session.exec(
-                sqlmodel.select(Coverage).where(Coverage.run_id == run_id)
-            ).all()
+            # Only the (cached) figure goes to the page, not per-file rows.
+            self.coverage_file_count = coverage_version(session, run_id)[0]
+            self.coverage_heatmap_fig = coverage_figure(
+                session, run_id, self.coverage_view
+            )
             self.quality_score = session.exec(
                 sqlmodel.select(QualityScore).where(QualityScore.run_id == run_id)
             ).first()
+            run = session.get(Run, run_id)
+            trend = quality_trend(session, run.test_plan_id) if run else []
+            self.quality_trend_days = len(trend)
+            self.quality_trend_fig = quality_trend_figure(trend)
 
     @rx.event
     async def load_quality_data(self, run_id: int):
         await self._load_quality_data(run_id)
 
+    @rx.event
+    async def set_coverage_view(self, view: str):
+        if view not in COVERAGE_VIEWS or view == self.coverage_view:
+            return
+        self.coverage_view = view
+        if self.current_run_id is not None:
+            await self._load_quality_data(self.current_run_id)
+
     @rx.event
     async def generate_quality_report(self, run_id: int):
         with rx.session() as session:
@@ -47,46 +146,33 @@ class QualityState(rx.State):
                 sqlmodel.delete(QualityScore).where(QualityScore.run_id == run_id)
             )
             session.commit()
-            files = [
-                "app/ui/pages/index.py",
-                "app/ui/pages/auth.py",
-                "app/core/models.py",
-                "app/ui/states/auth_state.py",
-                "app/app.py",
-                "app/orchestrator/tasks.py",
-                "app/ui/pages/security.py",
-                "app/ui/states/security_state.py",
-            ]
-            for file_path in files:
-                total_lines = random.randint(50, 200)
-                covered_lines = random.randint(int(total_lines * 0.4), total_lines)
-                coverage = Coverage(
-                    run_id=run_id,
-                    file_path=file_path,
-                    total_lines=total_lines,
-                    covered_lines=covered_lines,
-                    coverage_percentage=round(covered_lines / total_lines * 100, 2),
-                )
-                session.add(coverage)
+            artifact = coverage_artifact(session, run_id)
+            coverage_delta = 0.0
+            if artifact is None:
+                logger.warning(f"Run {run_id} has no coverage report artifact")
+            else:
+                try:
+                    ingest_coverage(
+                        session, run_id, artifact.storage_path, settings.REPO_PATH
+                    )
+                    coverage_delta = update_coverage_deltas(session, run_id)
+                except Exception as e:
+                    logger.exception(f"Coverage ingestion failed for run {run_id}: {e}")
+                    session.rollback()
             qs = QualityScore(
                 run_id=run_id,
                 static_issues_score=random.uniform(70, 95),
                 test_pass_rate=random.uniform(85, 100),
-                coverage_delta=random.uniform(-5, 5),
+                coverage_delta=coverage_delta,
                 performance_score=random.uniform(75, 98),
                 accessibility_score=random.uniform(80, 99),
                 security_score=random.uniform(60, 90),
                 composite_score=0,
             )
-            qs.composite_score = (
-                qs.static_issues_score * 0.2
-                + qs.test_pass_rate * 0.3
-                + (50 + qs.coverage_delta * 5) * 0.1
-                + qs.performance_score * 0.1
-                + qs.accessibility_score * 0.1
-                + qs.security_score * 0.2
-            )
+            qs.composite_score = composite_score(qs)
             session.add(qs)
+            session.flush()
+            record_quality_score(session, qs)
             session.commit()
         await self._load_quality_data(run_id)
 
@@ -107,56 +193,3 @@ class QualityState(rx.State):
             security_score=f"{self.quality_score.security_score:.1f}",
             composite_score=f"{self.quality_score.composite_score:.1f}",
         )
-
-    @rx.var
-    def coverage_heatmap_fig(self) -> go.Figure:
-        if not self.coverage_data:
-            return go.Figure()
-        paths = [d.file_path for d in self.coverage_data]
-        percentages = [d.coverage_percentage for d in self.coverage_data]
-        dir_map = {}
-        for path, pct in zip(paths, percentages):
-            directory = "/".join(path.split("/")[:-1])
-            if directory not in dir_map:
-                dir_map[directory] = []
-            dir_map[directory].append({"file": path.split("/")[-1], "coverage": pct})
-        dirs = list(dir_map.keys())
-        max_files = max((len(files) for files in dir_map.values()))
-        z = [[None] * max_files for _ in dirs]
-        hover_text = [[None] * max_files for _ in dirs]
-        filenames = [[""] * max_files for _ in dirs]
-        for i, directory in enumerate(dirs):
-            for j, file_info in enumerate(dir_map[directory]):
-                z[i][j] = file_info["coverage"]
-                hover_text[i][j] = (
-                    f"{file_info['file']}<br>Coverage: {file_info['coverage']:.1f}%"
-                )
-                filenames[i][j] = file_info["file"]
-        fig = go.Figure(
-            data=go.Heatmap(
-                z=z,
-                y=dirs,
-                x=[f"File {i + 1}" for i in range(max_files)],
-                colorscale="RdYlGn",
-                zmin=0,
-                zmax=100,
-                hoverongaps=False,
-                text=filenames,
-                texttemplate="%{text}",
-                hovertext=hover_text,
-                hoverinfo="text",
-            )
-        )
-        fig.update_layout(
-            title="File Coverage Heatmap",
-            xaxis_title=None,
-            yaxis_title=None,
-            yaxis=dict(autorange="reversed"),
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            autosize=True,
-            margin=dict(l=10, r=10, t=40, b=10),
-            font=dict(color="#E8F0FF", size=10),
-        )
-        fig.update_xaxes(showticklabels=False, visible=False)
-        return fig
\ No newline at end of file
@@ -3,6 +3,8 @@ import sqlmodel
 from sqlalchemy.orm import selectinload
 from datetime import datetime
 from app.core.models import Run, TestPlan, Project
+from app.adapters.coverage_delta import checkout_branch
+from app.core.settings import settings
 from app.ui.states.auth_state import AuthState
 
 
@@ -59,7 +61,13 @@ class RunState(rx.State):
     @rx.event
     async def trigger_run(self, plan_id: int):
         with rx.session() as session:
-            run = Run(test_plan_id=plan_id, status="running", started_at=datetime.now())
+            run = Run(
+                test_plan_id=plan_id,
+                status="running",
+                # Runs test the checkout this app serves.
+                branch=checkout_branch(settings.REPO_PATH),
+                started_at=datetime.now(),
+            )
             session.add(run)
             session.commit()
         await self.load_data()